@@ -0,0 +1,185 @@
+"""
+Calibrate the page estimator against real WeasyPrint renders.
+
+Renders a fixed set of editions (every built-in style, several page
+profiles, font sizes and edition lengths) to PDF, and compares each real
+page count with `goosepaper.estimate.PageEstimator`'s prediction. Prints the
+error per style and how long the estimates and the layouts took. With
+`--fit`, also prints a `fill` for each style that would have made the
+estimates match on average, to copy into `estimate.CALIBRATIONS`.
+
+`--record FILE` saves the real page counts as JSON. Checked in as
+`benchmarks/page_counts.json`, the recording is what `test_estimate` holds
+the calibrations to, and `--recorded FILE` compares (or fits) against it
+without rendering anything.
+
+    python -m benchmarks.page_estimate
+    python -m benchmarks.page_estimate --fit
+    python -m benchmarks.page_estimate --record benchmarks/page_counts.json
+    python -m benchmarks.page_estimate --recorded benchmarks/page_counts.json --fit
+
+"""
+
+import argparse
+import json
+import math
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from goosepaper.edition import Edition
+from goosepaper.estimate import PageEstimator, calibration_for
+from goosepaper.goosepaper import Goosepaper
+from goosepaper.renderer import Renderer
+from goosepaper.story import Story
+from goosepaper.styles import get_page_profile, get_style
+
+PARAGRAPHS = (
+    "<p>The council met on <b>Tuesday</b> to discuss the budget, the bridges, "
+    "and the <a href='https://example.com'>library hours</a> for next year. "
+    "Residents spoke for and against the proposal late into the evening.</p>",
+    "<p>Engineers said the eastern span would need new bearings within five "
+    "years, and that closing one lane at a time would keep traffic moving.</p>",
+    "<p>“We have been patient,” one resident said. “We would like to see the "
+    "plan before the vote, not after it.”</p>",
+)
+
+RECORDING = Path(__file__).with_name("page_counts.json")
+STYLES = ("Academy", "Autumn", "FifthAvenue", "GrayMaiden")
+PAGE_PROFILES = ("remarkable2", "paper_pro_move", "letter")
+FONT_SIZES = (12, 14, 18)
+EDITION_SIZES = (4, 16)
+
+
+@dataclass(frozen=True)
+class Case:
+    style: str
+    page_profile: str
+    font_size: int
+    stories: int
+
+
+def fixture() -> List[Case]:
+    return [
+        Case(style, profile, font_size, stories)
+        for style in STYLES
+        for profile in PAGE_PROFILES
+        for font_size in FONT_SIZES
+        for stories in EDITION_SIZES
+    ]
+
+
+def _edition(size: int) -> Edition:
+    stories = []
+    for index in range(size):
+        body = "".join(
+            PARAGRAPHS[(index + n) % len(PARAGRAPHS)] for n in range(2 + index % 7)
+        )
+        stories.append(Story(f"Story {index}: the council and the bridge", body))
+    return Edition(title="Calibration", subtitle="", stories=stories)
+
+
+def estimate(case: Case) -> Tuple[float, int]:
+    """
+    The estimated page count of a case, and its column count.
+    """
+    columns = get_style(case.style).resolve_column_count("auto", case.page_profile)
+    estimated = PageEstimator(
+        get_page_profile(case.page_profile),
+        font_size=case.font_size,
+        columns=columns,
+        calibration=calibration_for(case.style),
+    ).estimate_pages(_edition(case.stories).stories)
+    return estimated, columns
+
+
+def load_recording(path: Path = RECORDING) -> List[Tuple[Case, int]]:
+    """
+    The cases of a `--record` file, with their rendered page counts.
+    """
+    return [
+        (Case(**{name: row[name] for name in Case.__dataclass_fields__}), row["pages"])
+        for row in json.loads(Path(path).read_text(encoding="utf-8"))
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--fit", action="store_true")
+    parser.add_argument("--record", metavar="FILE", help="Save the page counts.")
+    parser.add_argument(
+        "--recorded", metavar="FILE", help="Use saved page counts; render nothing."
+    )
+    args = parser.parse_args()
+
+    recorded: Optional[Dict[Case, int]] = None
+    if args.recorded:
+        recorded = dict(load_recording(Path(args.recorded)))
+    paper = Goosepaper([])
+    renderer = Renderer()
+    ratios: Dict[str, List[float]] = {style: [] for style in STYLES}
+    errors: Dict[str, List[int]] = {style: [] for style in STYLES}
+    rows = []
+    estimating = layout = 0.0
+
+    for case in recorded or fixture():
+        started = time.perf_counter()
+        estimated, columns = estimate(case)
+        estimating += time.perf_counter() - started
+
+        if recorded is not None:
+            actual = recorded[case]
+        else:
+            started = time.perf_counter()
+            html = paper.to_html(
+                style=case.style,
+                font_size=case.font_size,
+                page_profile=case.page_profile,
+                edition=_edition(case.stories),
+            )
+            document = renderer.render(
+                html,
+                case.style,
+                font_size=case.font_size,
+                page_profile=case.page_profile,
+            )
+            layout += time.perf_counter() - started
+            actual = len(document.pages)
+        rows.append({**asdict(case), "pages": actual})
+
+        ratios.setdefault(case.style, []).append(estimated / actual)
+        errors.setdefault(case.style, []).append(math.ceil(estimated) - actual)
+        print(
+            f"{case.style:12} {case.page_profile:15} {case.font_size:3}pt "
+            f"{case.stories:3} stories {columns} col: "
+            f"estimated {estimated:5.1f}, rendered {actual:3}"
+        )
+
+    print()
+    for style in STYLES:
+        if not errors[style]:
+            continue
+        mean_error = sum(abs(error) for error in errors[style]) / len(errors[style])
+        print(f"{style:12} mean absolute error: {mean_error:.2f} pages")
+    print(f"estimates: {estimating * 1000:8.2f}ms for {len(rows)} editions")
+    if recorded is None:
+        print(f"layout:    {layout:8.2f}s for {len(rows)} editions")
+
+    if args.record:
+        payload = json.dumps(rows, indent=2) + "\n"
+        Path(args.record).write_text(payload, encoding="utf-8")
+        print(f"Recorded {len(rows)} page counts in {args.record}")
+
+    if args.fit:
+        print()
+        for style in STYLES:
+            if not ratios[style]:
+                continue
+            mean_ratio = sum(ratios[style]) / len(ratios[style])
+            fill = calibration_for(style).fill * mean_ratio
+            print(f'"{style}": fill={fill:.3f}')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Micro-benchmark for Story's memoized plain text.
+
+Builds a 1,000-story edition and runs a typical mix of text lookups over it
+(dedupe, ranking and page budgeting each read plain_text / word_count), once
+re-parsing the HTML every time as Story used to and once through the cache.
+
+    python benchmarks/story_text.py
+
+"""
+
+import argparse
+import time
+
+import bs4
+
+from goosepaper.story import Story
+
+PARAGRAPH = (
+    "<p>The council met on <b>Tuesday</b> to discuss the budget, the bridges, "
+    "and the <a href='https://example.com'>library hours</a> for next year. "
+    "Residents spoke for and against the proposal late into the evening.</p>"
+)
+
+
+def _edition(size):
+    return [
+        Story(f"Story {index}", body_html=PARAGRAPH * (3 + index % 5))
+        for index in range(size)
+    ]
+
+
+def _uncached_lookups(stories, passes):
+    for _ in range(passes):
+        for story in stories:
+            text = bs4.BeautifulSoup(story.body_html, "lxml").get_text(" ", strip=True)
+            len(bs4.BeautifulSoup(story.body_html, "lxml").get_text(" ", strip=True).split())
+            len(text)
+
+
+def _cached_lookups(stories, passes):
+    for _ in range(passes):
+        for story in stories:
+            text = story.plain_text()
+            story.word_count()
+            len(text)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--stories", type=int, default=1000)
+    parser.add_argument("--passes", type=int, default=3)
+    args = parser.parse_args()
+
+    stories = _edition(args.stories)
+    started = time.perf_counter()
+    _uncached_lookups(stories, args.passes)
+    uncached = time.perf_counter() - started
+
+    stories = _edition(args.stories)
+    started = time.perf_counter()
+    _cached_lookups(stories, args.passes)
+    cached = time.perf_counter() - started
+
+    print(f"{args.stories} stories, {args.passes} passes of plain_text + word_count")
+    print(f"re-parsing every call: {uncached:8.3f}s")
+    print(f"memoized:              {cached:8.3f}s  ({uncached / cached:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
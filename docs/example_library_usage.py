@@ -9,23 +9,29 @@ from goosepaper.storyprovider.wikipedia import WikipediaCurrentEventsStoryProvid
 from goosepaper.upload import upload
 
 
-FNAME = datetime.now().strftime("%Y-%m-%d") + ".pdf"
-logging.info("Honk! I will save your temporary PDF to {FNAME}.")
+def main():
+    fname = datetime.now().strftime("%Y-%m-%d") + ".pdf"
+    logging.info(f"Honk! I will save your temporary PDF to {fname}.")
 
+    logging.info("Generating paper...")
+    Goosepaper(
+        [
+            WikipediaCurrentEventsStoryProvider(),
+            OpenMeteoWeatherStoryProvider(lat=42.3601, lon=-71.0589, F=True),
+            RSSFeedStoryProvider("https://www.npr.org/feed/", limit=5),
+            RSSFeedStoryProvider("https://www.statnews.com/feed/", limit=2),
+            RedditHeadlineStoryProvider("news"),
+            RedditHeadlineStoryProvider("todayilearned"),
+        ]
+    ).to_pdf(fname)
+    logging.info("Saved to PDF, now transferring...")
 
-logging.info("Generating paper...")
-Goosepaper(
-    [
-        WikipediaCurrentEventsStoryProvider(),
-        OpenMeteoWeatherStoryProvider(lat=42.3601, lon=-71.0589, F=True),
-        RSSFeedStoryProvider("https://www.npr.org/feed/", limit=5),
-        RSSFeedStoryProvider("https://www.statnews.com/feed/", limit=2),
-        RedditHeadlineStoryProvider("news"),
-        RedditHeadlineStoryProvider("todayilearned"),
-    ]
-).to_pdf(FNAME)
-logging.info("Saved to PDF, now transferring...")
+    upload(fname)
+    logging.info("HONK! I'm done :)")
 
 
-upload(FNAME)
-logging.info("HONK! I'm done :)")
+# Goosepaper starts worker processes with "spawn" when asked to (render limits,
+# renditions, `use_extraction_processes`), and each worker re-imports this
+# script, so the work belongs under this guard.
+if __name__ == "__main__":
+    main()
@@ -1,2 +1,3 @@
+from .edition import Edition  # noqa
 from .goosepaper import Goosepaper  # noqa
 from .version import __version__  # noqa
@@ -1,12 +1,33 @@
+import math
 import sys
+from pathlib import Path
 
-from goosepaper.goosepaper import Goosepaper
+from goosepaper import metrics
+from goosepaper.cache import (
+    default_cache_dir,
+    get_article_cache,
+    get_feed_cache,
+    get_last_good_store,
+    install_default_caches,
+)
+from goosepaper.cache import main as cache_main
 from goosepaper.config import ConfigError, dump_resolved_config, resolve_runtime_config
-from goosepaper.upload import upload
-from goosepaper.util import construct_story_providers_from_source_configs
+from goosepaper.fonts import main as fonts_main
+from goosepaper.renditions import plan_renders, render_edition
+
+RENDERABLE_SUFFIXES = (".html", ".pdf", ".epub")
+DELIVERABLE_SUFFIXES = (".pdf", ".epub")
+UNCHANGED_EXIT_CODE = 3
 
 
 def main(args=None):
+    if args is None:
+        args = sys.argv[1:]
+    if args and args[0] == "cache":
+        return cache_main(args[1:])
+    if args and args[0] == "fonts":
+        return fonts_main(args[1:])
+
     try:
         config = resolve_runtime_config(args)
     except ConfigError as err:
@@ -16,52 +37,199 @@ def main(args=None):
     if config.showconfig:
         print(dump_resolved_config(config))
 
+    if not (config.profile or config.metrics_json):
+        return run(config)
+    with metrics.recording() as recorder:
+        status = run(config)
+    report_metrics(recorder, config)
+    return status
+
+
+def run(config):
     if not config.nostory:
+        for output in config.outputs:
+            if not output.endswith(RENDERABLE_SUFFIXES):
+                print(f"Unknown file extension '{output.split('.')[-1]}'.")
+                return 1
+
+        from goosepaper.fingerprint import (
+            edition_fingerprint,
+            is_unchanged,
+            store_fingerprint,
+        )
+        from goosepaper.goosepaper import Goosepaper
+        from goosepaper.isolation import RenderLimitExceeded
+        from goosepaper.storyprovider.rss import use_extraction_processes
+        from goosepaper.util import construct_story_providers_from_source_configs
+
+        if config.use_cache:
+            install_default_caches(settings=config.cache)
         story_providers = construct_story_providers_from_source_configs(config.sources)
         paper = Goosepaper(
             story_providers=story_providers,
             title=config.paper.title,
             subtitle=config.paper.subtitle,
+            deadline=config.paper.deadline_seconds,
+            edition_time=config.edition_time,
+            style_dirs=config.paper.style_dirs,
+            fonts_dir=config.paper.fonts_dir,
         )
-
-        if config.output.endswith(".html"):
-            with open(config.output, "w", encoding="utf-8") as fh:
-                fh.write(
-                    paper.to_html(
-                        font_size=config.paper.font_size,
-                        style=config.paper.style,
-                        body_font=config.paper.body_font,
-                        table_of_contents=config.paper.table_of_contents,
-                        layout=config.paper.layout,
-                        page_profile=config.paper.page_profile,
-                    )
-                )
-        elif config.output.endswith(".pdf"):
-            paper.to_pdf(
-                config.output,
-                font_size=config.paper.font_size,
-                style=config.paper.style,
-                body_font=config.paper.body_font,
-                table_of_contents=config.paper.table_of_contents,
-                layout=config.paper.layout,
-                page_profile=config.paper.page_profile,
+        # Extract articles in worker processes while fetching, then stop them
+        # so they don't hold memory through layout.
+        previous = use_extraction_processes()
+        try:
+            edition = paper.fetch_edition(
+                deduplicate=config.paper.deduplicate, budget=_page_budget(config)
+            )
+        finally:
+            use_extraction_processes(previous)
+        for cluster in edition.duplicates:
+            print(f"Honk! Duplicate stories: {cluster.describe()}")
+        if config.estimate:
+            print_estimates(edition, config)
+            return 0
+        fingerprint = edition_fingerprint(edition, _fingerprint_settings(config))
+        planned = [job.output for job in plan_renders(config.outputs, config.paper)]
+        if not config.force and is_unchanged(
+            planned,
+            fingerprint,
+            require_outputs=not (config.deliver and config.delivery.cleanup),
+        ):
+            print(
+                "Honk! Nothing has changed since the last edition. "
+                "Skipping rendering and delivery (use --force to render anyway)."
             )
-        elif config.output.endswith(".epub"):
-            paper.to_epub(
-                config.output,
-                font_size=config.paper.font_size,
-                style=config.paper.style,
-                body_font=config.paper.body_font,
+            return UNCHANGED_EXIT_CODE
+        images = _image_pipeline(config)
+        try:
+            outputs = render_edition(
+                paper,
+                edition,
+                config.outputs,
+                config.paper,
+                images=images,
+                limits=config.render,
             )
-        else:
-            print(f"Unknown file extension '{config.output.split('.')[-1]}'.")
+        except RenderLimitExceeded as err:
+            print(f"Sad honk :/ {err}.")
             return 1
+        if config.use_cache:
+            get_article_cache().prune()
+            get_feed_cache().prune()
+            get_last_good_store().prune()
+            if images is not None:
+                images.prune()
+    else:
+        outputs = config.outputs
 
+    delivered = True
     if config.deliver:
-        upload(filepath=config.output, delivery_settings=config.delivery)
+        from goosepaper.upload import upload
+
+        deliverable = [
+            output
+            for output in outputs
+            if Path(output).suffix.lower() in DELIVERABLE_SUFFIXES
+        ]
+        if not deliverable:
+            print("Honk! Only PDF and EPUB outputs can be delivered.")
+            return 1
+        results = [
+            upload(filepath=output, delivery_settings=config.delivery)
+            for output in deliverable
+        ]
+        delivered = all(results)
 
+    if not config.nostory and delivered:
+        store_fingerprint(outputs, fingerprint)
     return 0
 
 
+def print_estimates(edition, config):
+    from goosepaper.estimate import PageEstimator, calibration_for
+    from goosepaper.styles import get_page_profile, get_style
+
+    style = get_style(config.paper.style, config.paper.style_dirs)
+    for job in plan_renders(config.outputs, config.paper):
+        if job.output.endswith(".epub"):
+            continue
+        settings = job.settings
+        columns = style.resolve_column_count(settings.layout, settings.page_profile)
+        estimator = PageEstimator(
+            get_page_profile(settings.page_profile),
+            font_size=settings.font_size,
+            columns=columns,
+            calibration=calibration_for(style.style_name),
+        )
+        pages = estimator.estimate_pages(edition.stories)
+        print(
+            f"Honk! {job.output}: about {max(1, math.ceil(pages))} page(s) in "
+            f"{columns} column(s), {len(edition.stories)} stories."
+        )
+    print(
+        "Honk! These are rough previews from text metrics, not yet checked "
+        "against real renders; render the paper for exact page counts."
+    )
+
+
+def _page_budget(config):
+    if config.paper.max_pages is None and config.paper.max_words is None:
+        return None
+    from goosepaper.budget import PageBudget
+    from goosepaper.styles import get_style
+
+    style = get_style(config.paper.style, config.paper.style_dirs)
+    return PageBudget(
+        max_pages=config.paper.max_pages,
+        max_words=config.paper.max_words,
+        page_profile=config.paper.page_profile,
+        font_size=config.paper.font_size,
+        columns=style.resolve_column_count(
+            config.paper.layout, config.paper.page_profile
+        ),
+        style=style.style_name,
+    )
+
+
+def _image_pipeline(config):
+    if config.paper.images == "original":
+        return None
+    from goosepaper.images import ImagePipeline
+
+    return ImagePipeline(
+        default_cache_dir() / "images" if config.use_cache else None,
+        mode=config.paper.images,
+    )
+
+
+def _fingerprint_settings(config):
+    """
+    The settings that change what a run produces, besides the stories. A run
+    that delivers differs from one that doesn't, so that rendering without
+    `--deliver` first doesn't stop the next delivering run. The style's
+    contents and the Goosepaper version are included too, so editing a
+    custom style or upgrading renders the paper again.
+    """
+    from goosepaper.styles import get_style
+    from goosepaper.version import __version__
+
+    style = get_style(config.paper.style, config.paper.style_dirs)
+    return {
+        "paper": config.paper.to_dict(),
+        "delivery": config.delivery.to_dict() if config.deliver else None,
+        "style": style.digest(),
+        "version": __version__,
+    }
+
+
+def report_metrics(recorder, config):
+    if config.profile:
+        print(recorder.format_table(), file=sys.stderr)
+    if config.metrics_json == "-":
+        print(recorder.to_json())
+    elif config.metrics_json:
+        Path(config.metrics_json).write_text(recorder.to_json(), encoding="utf-8")
+
+
 if __name__ == "__main__":
     sys.exit(main())
@@ -1,8 +1,7 @@
-from remarkapy import Client, resolve_config_path
-from remarkapy.exceptions import RemarkableAPIError
-
-
 def auth_client():
+    from remarkapy import Client, resolve_config_path
+    from remarkapy.exceptions import RemarkableAPIError
+
     try:
         client = Client(refresh_on_init=False)
         client.refresh_user_token()
@@ -0,0 +1,203 @@
+"""
+Fit an edition into a page or word budget.
+
+Every source has its own `limit`, but nothing bounds the edition as a whole,
+so its length (and the time it takes to lay out) swings with the news. A
+`PageBudget` caps it.
+
+Stories are picked by `StoryPriority` (banner, then headline, default and
+low), and within a priority round-robin between sources, so one prolific
+source can't crowd out the others. `fit_to_budget` applies `max_words` when
+the edition is fetched: a story that doesn't fit is skipped and smaller ones
+after it are still considered. The stories that are kept stay in their
+original order.
+
+Pages are only known after layout, and `estimate.PageEstimator` alone is too
+rough to cut stories on, so `max_pages` is checked against each PDF's real
+page count (see `Goosepaper.to_pdf`). A PDF within budget costs nothing
+extra. One that runs over is trimmed by `trim_to_pages`, which leaves out the
+stories picked last, as many as an estimator fitted to that real layout says
+it takes, and is laid out once more.
+
+"""
+
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from . import metrics
+from .estimate import PageEstimator, calibration_for
+from .story import Story
+from .styles import get_page_profile
+from .util import StoryPriority
+
+_PRIORITY_RANK = {
+    StoryPriority.BANNER: 0,
+    StoryPriority.HEADLINE: 1,
+    StoryPriority.DEFAULT: 2,
+    StoryPriority.LOW: 3,
+}
+
+
+@dataclass(frozen=True)
+class PageBudget:
+    """
+    How long an edition may be, and the page geometry it is estimated in.
+
+    Arguments:
+        max_pages: The most pages each PDF of the edition may fill. Default:
+            no limit
+        max_words: The most words the edition's stories may add up to.
+            Default: no limit
+        page_profile: The page profile the pages are counted in.
+        font_size: The paper's base font size, in points.
+        columns: How many columns the main stories are set in.
+        style: The name of the paper's style, whose calibration is used.
+
+    """
+
+    max_pages: Optional[int] = None
+    max_words: Optional[int] = None
+    page_profile: str = "remarkable2"
+    font_size: int = 14
+    columns: int = 1
+    style: Optional[str] = None
+
+    @property
+    def estimator(self) -> PageEstimator:
+        return PageEstimator(
+            get_page_profile(self.page_profile),
+            font_size=self.font_size,
+            columns=self.columns,
+            calibration=calibration_for(self.style),
+        )
+
+    def estimate_pages(self, stories: Sequence[Story]) -> float:
+        return self.estimator.estimate_pages(stories)
+
+
+@dataclass(frozen=True)
+class BudgetResult:
+    stories: Tuple[Story, ...] = ()
+    dropped: Tuple[Story, ...] = ()
+    estimated_pages: float = 0.0
+
+
+def fit_to_budget(
+    stories: Sequence[Story],
+    sources: Sequence[int],
+    budget: PageBudget,
+) -> BudgetResult:
+    """
+    Pick the stories that fit in `budget.max_words`. `max_pages` is left to
+    `trim_to_pages`, once a layout has counted the pages.
+
+    Arguments:
+        stories: The edition's stories, in order.
+        sources: For each story, the index of the source it came from.
+        budget: The limits to fit the stories in.
+
+    Returns:
+        The kept stories in their original order, the dropped ones, and the
+        estimated page count of the kept ones.
+
+    """
+    stories = list(stories)
+    estimator = budget.estimator
+    word_limit = budget.max_words
+    lines = [estimator.story_lines(story) for story in stories]
+
+    kept = set()
+    kept_main = False
+    used_lines = estimator.calibration.masthead_lines
+    used_words = 0
+    for index in _picking_order(stories, sources):
+        story = stories[index]
+        # Ears and the utility strip sit in the masthead, which is always
+        # there; they take no lines and don't count against the budget.
+        words = 0 if lines[index] == 0 else story.word_count()
+        fits = word_limit is None or used_words + words <= word_limit
+        # An edition always gets its most important story, even if it alone
+        # is over budget.
+        if fits or (lines[index] and not kept_main):
+            kept.add(index)
+            kept_main = kept_main or bool(lines[index])
+            used_lines += lines[index]
+            used_words += words
+
+    result = BudgetResult(
+        stories=tuple(story for index, story in enumerate(stories) if index in kept),
+        dropped=tuple(
+            story for index, story in enumerate(stories) if index not in kept
+        ),
+        estimated_pages=used_lines / estimator.lines_per_page,
+    )
+    metrics.increment("stories.over_budget", len(result.dropped))
+    return result
+
+
+def trim_to_pages(
+    stories: Sequence[Story],
+    sources: Sequence[int],
+    budget: PageBudget,
+    pages: int,
+) -> BudgetResult:
+    """
+    Pick the stories to keep of an edition whose layout came to `pages`
+    pages, more than `budget.max_pages`.
+
+    `budget.estimator` is fitted to the real layout, so it predicts `pages`
+    for all of `stories`. Then the stories `fit_to_budget` would pick last are
+    left out, until the rest should fit. Stories in the masthead take no room
+    and are kept, and so is the most important story.
+
+    Arguments:
+        stories: The laid out stories, in order.
+        sources: For each story, the index of the source it came from.
+        budget: The budget, in the geometry of the layout.
+        pages: How many pages the layout came to.
+
+    Returns:
+        The kept stories in their original order, the dropped ones, and the
+        estimated page count of the kept ones.
+
+    """
+    stories = list(stories)
+    estimator = budget.estimator.fitted_to(stories, pages)
+    lines = [estimator.story_lines(story) for story in stories]
+    order = _picking_order(stories, sources)
+    lead = next((index for index in order if lines[index]), None)
+    line_limit = budget.max_pages * estimator.lines_per_page
+
+    dropped = set()
+    used_lines = estimator.estimate_lines(stories)
+    for index in reversed(order):
+        if used_lines <= line_limit:
+            break
+        if lines[index] and index != lead:
+            dropped.add(index)
+            used_lines -= lines[index]
+
+    result = BudgetResult(
+        stories=tuple(
+            story for index, story in enumerate(stories) if index not in dropped
+        ),
+        dropped=tuple(story for index, story in enumerate(stories) if index in dropped),
+        estimated_pages=used_lines / estimator.lines_per_page,
+    )
+    metrics.increment("stories.over_budget", len(result.dropped))
+    return result
+
+
+def _picking_order(stories: Sequence[Story], sources: Sequence[int]) -> List[int]:
+    """
+    The indexes of `stories` by priority, taking turns between sources.
+    """
+    rounds: Dict[Tuple[int, int], int] = {}
+    order = []
+    for index, (story, source) in enumerate(zip(stories, sources)):
+        rank = _PRIORITY_RANK.get(story.priority, 2)
+        turn = rounds.get((rank, source), 0)
+        rounds[(rank, source)] = turn + 1
+        order.append((rank, turn, source, index))
+    return [index for _rank, _turn, _source, index in sorted(order)]
@@ -0,0 +1,663 @@
+"""
+Persistent, on-disk caches that let consecutive editions reuse earlier work.
+
+Caches are off by default when Goosepaper is used as a library. The CLI turns
+them on (see `install_default_caches`) unless it is run with `--no-cache`.
+
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import tempfile
+import threading
+import time
+import urllib.parse
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+DEFAULT_ARTICLE_TTL_HOURS = 72
+DEFAULT_ARTICLE_MAX_MB = 100
+DEFAULT_LAST_GOOD_MAX_AGE_HOURS = 24
+DEFAULT_LAST_GOOD_MAX_MB = 50
+DEFAULT_FEED_MAX_AGE_HOURS = 30 * 24
+DEFAULT_FEED_MAX_MB = 50
+# Caches prune themselves on their first write, then once every this many, so
+# a long-lived process stays within its limits without listing the directory
+# on every write.
+DEFAULT_PRUNE_EVERY_WRITES = 50
+# The subdirectories of a cache root that Goosepaper writes, and that
+# `goosepaper cache clear` removes.
+CACHE_SUBDIRS = ("feeds", "articles", "last_good", "images")
+# Subdirectories that are not cache and that `clear` keeps: the fonts synced
+# by `goosepaper fonts sync` are needed to render offline.
+KEPT_SUBDIRS = ("fonts",)
+_TRACKING_QUERY_PREFIXES = ("utm_",)
+_TRACKING_QUERY_KEYS = {"fbclid", "gclid", "mc_cid", "mc_eid", "ref", "cmpid"}
+
+
+def default_cache_dir() -> Path:
+    xdg_cache_home = os.environ.get("XDG_CACHE_HOME")
+    base = (
+        Path(xdg_cache_home).expanduser()
+        if xdg_cache_home
+        else Path.home() / ".cache"
+    )
+    return base / "goosepaper"
+
+
+def _key_digest(key: str) -> str:
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+class _PruneSchedule:
+    """
+    Counts a cache's writes and says when it is time to prune: on the first
+    write, then once every `every` writes.
+    """
+
+    def __init__(self, every: int = DEFAULT_PRUNE_EVERY_WRITES):
+        self.every = max(1, every)
+        self._lock = threading.Lock()
+        self._countdown = 0
+
+    def due(self) -> bool:
+        with self._lock:
+            self._countdown -= 1
+            if self._countdown > 0:
+                return False
+            self._countdown = self.every
+            return True
+
+
+def write_atomic(path: Path, payload: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(payload)
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.remove(tmp_name)
+        except OSError:
+            pass
+        raise
+
+
+class FeedCache:
+    """
+    Remembers each feed's HTTP validators and its last parsed result.
+
+    The validators (ETag and Last-Modified) are sent back as a conditional
+    request on the next fetch. When the server answers `304 Not Modified`,
+    the previously parsed feed is reused instead of downloading and parsing
+    it again.
+
+    Feeds that haven't been requested for `max_age_seconds` (a feed dropped
+    from the config, say) are deleted, and so are the least recently used
+    ones once the cache grows past `max_bytes`. Writes prune now and then, so
+    the limits hold without calling `prune`.
+
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        max_age_seconds: float = DEFAULT_FEED_MAX_AGE_HOURS * 3600,
+        max_bytes: int = DEFAULT_FEED_MAX_MB * 1024 * 1024,
+        prune_every: int = DEFAULT_PRUNE_EVERY_WRITES,
+    ):
+        self.directory = Path(directory)
+        self.max_age_seconds = max_age_seconds
+        self.max_bytes = max_bytes
+        self._prune_schedule = _PruneSchedule(prune_every)
+
+    def _path(self, url: str) -> Path:
+        return self.directory / f"{_key_digest(url)}.pickle"
+
+    def _read(self, url: str) -> Optional[Dict[str, Any]]:
+        path = self._path(url)
+        try:
+            with open(path, "rb") as fh:
+                record = pickle.load(fh)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            return None
+        if not isinstance(record, dict) or record.get("url") != url:
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return record
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        record = self._read(url)
+        if record is None:
+            return {}
+        headers = {}
+        if record.get("etag"):
+            headers["If-None-Match"] = record["etag"]
+        if record.get("last_modified"):
+            headers["If-Modified-Since"] = record["last_modified"]
+        return headers
+
+    def load(self, url: str) -> Optional[Any]:
+        record = self._read(url)
+        return None if record is None else record.get("feed")
+
+    def store(
+        self,
+        url: str,
+        feed: Any,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> bool:
+        if not etag and not last_modified:
+            return False
+        try:
+            payload = pickle.dumps(
+                {
+                    "url": url,
+                    "etag": etag,
+                    "last_modified": last_modified,
+                    "feed": feed,
+                }
+            )
+        except Exception:
+            return False
+        try:
+            write_atomic(self._path(url), payload)
+        except OSError:
+            return False
+        if self._prune_schedule.due():
+            self.prune()
+        return True
+
+    def prune(
+        self,
+        max_age_seconds: Optional[float] = None,
+        max_bytes: Optional[int] = None,
+    ) -> int:
+        """
+        Delete feeds unused for `max_age_seconds`, then least recently used
+        ones until the cache fits in `max_bytes`. Returns how many feeds were
+        removed.
+        """
+        return _prune_files(
+            self.directory,
+            self.max_age_seconds if max_age_seconds is None else max_age_seconds,
+            self.max_bytes if max_bytes is None else max_bytes,
+        )
+
+
+def canonical_url(url: str) -> str:
+    """
+    Normalize an article URL so trivially different links share a cache entry.
+
+    Lowercases the scheme and host, drops the fragment, default ports and
+    common tracking parameters (`utm_*`, `fbclid`, ...), and sorts the query.
+    """
+    parts = urllib.parse.urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and not (
+        (scheme == "http" and parts.port == 80)
+        or (scheme == "https" and parts.port == 443)
+    ):
+        host = f"{host}:{parts.port}"
+    query = sorted(
+        (key, value)
+        for key, value in urllib.parse.parse_qsl(parts.query, keep_blank_values=True)
+        if key not in _TRACKING_QUERY_KEYS
+        and not key.startswith(_TRACKING_QUERY_PREFIXES)
+    )
+    return urllib.parse.urlunsplit(
+        (scheme, host, parts.path or "/", urllib.parse.urlencode(query), "")
+    )
+
+
+def content_hash(*parts: Optional[str]) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update((part or "").encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class ArticleCache:
+    """
+    Stores the readability output for linked articles between editions.
+
+    Entries are keyed by the article's canonical URL plus a hash of the feed
+    entry that linked to it, so an article is downloaded and extracted again
+    only when the feed says it changed. Entries older than `ttl_seconds` are
+    ignored, and `prune` evicts the least recently used entries once the
+    cache grows past `max_bytes`. Writes prune now and then, so the limits
+    hold without calling `prune`.
+
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        ttl_seconds: float = DEFAULT_ARTICLE_TTL_HOURS * 3600,
+        max_bytes: int = DEFAULT_ARTICLE_MAX_MB * 1024 * 1024,
+        prune_every: int = DEFAULT_PRUNE_EVERY_WRITES,
+    ):
+        self.directory = Path(directory)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._prune_schedule = _PruneSchedule(prune_every)
+
+    def _path(self, url: str, entry_hash: str) -> Path:
+        return self.directory / f"{content_hash(canonical_url(url), entry_hash)}.json"
+
+    def get(self, url: str, entry_hash: str) -> Optional[Tuple[str, str]]:
+        path = self._path(url, entry_hash)
+        try:
+            record = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if time.time() - record.get("stored_at", 0) > self.ttl_seconds:
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return record.get("headline") or "", record.get("body_html") or ""
+
+    def put(self, url: str, entry_hash: str, headline: str, body_html: str) -> None:
+        record = {
+            "url": canonical_url(url),
+            "entry_hash": entry_hash,
+            "headline": headline,
+            "body_html": body_html,
+            "stored_at": time.time(),
+        }
+        try:
+            write_atomic(
+                self._path(url, entry_hash),
+                json.dumps(record).encode("utf-8"),
+            )
+        except OSError:
+            return
+        if self._prune_schedule.due():
+            self.prune()
+
+    def entries(self) -> List[Dict[str, Any]]:
+        """
+        Describe every entry, most recently used first.
+        """
+        described = []
+        for path in self.directory.glob("*.json"):
+            try:
+                stat = path.stat()
+                record = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                continue
+            described.append(
+                {
+                    "path": path,
+                    "url": record.get("url"),
+                    "headline": record.get("headline"),
+                    "stored_at": record.get("stored_at", 0),
+                    "last_used": stat.st_mtime,
+                    "size": stat.st_size,
+                }
+            )
+        described.sort(key=lambda entry: entry["last_used"], reverse=True)
+        return described
+
+    def prune(
+        self,
+        ttl_seconds: Optional[float] = None,
+        max_bytes: Optional[int] = None,
+    ) -> int:
+        """
+        Delete expired entries, then least recently used ones until the cache
+        fits in `max_bytes`. Returns how many entries were removed.
+        """
+        ttl_seconds = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        now = time.time()
+        removed = 0
+        kept = []
+        for entry in self.entries():
+            if now - entry["stored_at"] > ttl_seconds:
+                removed += _unlink(entry["path"])
+            else:
+                kept.append(entry)
+
+        total = sum(entry["size"] for entry in kept)
+        while kept and total > max_bytes:
+            entry = kept.pop()
+            total -= entry["size"]
+            removed += _unlink(entry["path"])
+        return removed
+
+
+class LastGoodStore:
+    """
+    Keeps the most recent successful stories from each source.
+
+    When a source fails or misses the edition deadline, its last good stories
+    can stand in for it, as long as they are no older than `max_age_seconds`.
+    Entries are keyed by a description of the source's configuration, so
+    changing a source's options starts it afresh. Entries too old to use are
+    deleted, and so are the least recently stored ones once the store grows
+    past `max_bytes`. Writes prune now and then, so the limits hold without
+    calling `prune`.
+
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        max_age_seconds: float = DEFAULT_LAST_GOOD_MAX_AGE_HOURS * 3600,
+        max_bytes: int = DEFAULT_LAST_GOOD_MAX_MB * 1024 * 1024,
+        prune_every: int = DEFAULT_PRUNE_EVERY_WRITES,
+    ):
+        self.directory = Path(directory)
+        self.max_age_seconds = max_age_seconds
+        self.max_bytes = max_bytes
+        self._prune_schedule = _PruneSchedule(prune_every)
+
+    def _path(self, source_key: str) -> Path:
+        return self.directory / f"{_key_digest(source_key)}.pickle"
+
+    def load(self, source_key: str) -> Optional[Tuple[List[Any], float]]:
+        """
+        Return the stored stories and when they were stored, or None if there
+        are none or they are older than `max_age_seconds`.
+        """
+        try:
+            with open(self._path(source_key), "rb") as fh:
+                record = pickle.load(fh)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            return None
+        if not isinstance(record, dict) or record.get("source_key") != source_key:
+            return None
+        stored_at = record.get("stored_at", 0)
+        if time.time() - stored_at > self.max_age_seconds:
+            return None
+        return list(record.get("stories") or []), stored_at
+
+    def store(self, source_key: str, stories: List[Any]) -> bool:
+        try:
+            payload = pickle.dumps(
+                {
+                    "source_key": source_key,
+                    "stories": list(stories),
+                    "stored_at": time.time(),
+                }
+            )
+        except Exception:
+            return False
+        try:
+            write_atomic(self._path(source_key), payload)
+        except OSError:
+            return False
+        if self._prune_schedule.due():
+            self.prune()
+        return True
+
+    def prune(
+        self,
+        max_age_seconds: Optional[float] = None,
+        max_bytes: Optional[int] = None,
+    ) -> int:
+        """
+        Delete entries older than `max_age_seconds`, then the oldest ones
+        until the store fits in `max_bytes`. Returns how many entries were
+        removed.
+        """
+        return _prune_files(
+            self.directory,
+            self.max_age_seconds if max_age_seconds is None else max_age_seconds,
+            self.max_bytes if max_bytes is None else max_bytes,
+        )
+
+
+def _prune_files(directory: Path, max_age_seconds: float, max_bytes: int) -> int:
+    """
+    Delete the pickles in `directory` last written or used more than
+    `max_age_seconds` ago, then the least recently used ones until the rest
+    fit in `max_bytes`. Returns how many were removed.
+    """
+    now = time.time()
+    removed = 0
+    kept = []
+    for path in directory.glob("*.pickle"):
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        if now - stat.st_mtime > max_age_seconds:
+            removed += _unlink(path)
+        else:
+            kept.append((stat.st_mtime, stat.st_size, path))
+
+    kept.sort(reverse=True)
+    total = sum(size for _, size, _ in kept)
+    while kept and total > max_bytes:
+        _, size, path = kept.pop()
+        total -= size
+        removed += _unlink(path)
+    return removed
+
+
+def _unlink(path: Path) -> int:
+    try:
+        path.unlink()
+    except OSError:
+        return 0
+    return 1
+
+
+_feed_cache: Optional[FeedCache] = None
+_article_cache: Optional[ArticleCache] = None
+_last_good_store: Optional[LastGoodStore] = None
+_cache_lock = threading.Lock()
+
+
+def get_feed_cache() -> Optional[FeedCache]:
+    return _feed_cache
+
+
+def set_feed_cache(cache: Optional[FeedCache]) -> Optional[FeedCache]:
+    global _feed_cache
+    with _cache_lock:
+        previous = _feed_cache
+        _feed_cache = cache
+        return previous
+
+
+def get_article_cache() -> Optional[ArticleCache]:
+    return _article_cache
+
+
+def set_article_cache(cache: Optional[ArticleCache]) -> Optional[ArticleCache]:
+    global _article_cache
+    with _cache_lock:
+        previous = _article_cache
+        _article_cache = cache
+        return previous
+
+
+def get_last_good_store() -> Optional[LastGoodStore]:
+    return _last_good_store
+
+
+def set_last_good_store(store: Optional[LastGoodStore]) -> Optional[LastGoodStore]:
+    global _last_good_store
+    with _cache_lock:
+        previous = _last_good_store
+        _last_good_store = store
+        return previous
+
+
+def install_default_caches(directory: Optional[Path] = None, settings=None) -> Path:
+    """
+    Turn on every persistent cache, rooted at `directory`.
+
+    Arguments:
+        directory: Where to keep cache files. Default: `default_cache_dir()`
+        settings: The user's CacheSettings. Default: built-in limits.
+
+    Returns:
+        Path: The cache root in use.
+
+    """
+    root = Path(directory) if directory else default_cache_dir()
+    set_feed_cache(FeedCache(root / "feeds"))
+    set_article_cache(_article_cache_for(root, settings))
+    set_last_good_store(_last_good_store_for(root, settings))
+    return root
+
+
+def _article_cache_for(root: Path, settings=None) -> ArticleCache:
+    if settings is None:
+        return ArticleCache(root / "articles")
+    return ArticleCache(
+        root / "articles",
+        ttl_seconds=settings.article_ttl_hours * 3600,
+        max_bytes=int(settings.article_max_mb * 1024 * 1024),
+    )
+
+
+def _last_good_store_for(root: Path, settings=None) -> LastGoodStore:
+    return LastGoodStore(
+        root / "last_good",
+        max_age_seconds=(
+            settings.last_good_max_age_hours * 3600
+            if settings is not None
+            else DEFAULT_LAST_GOOD_MAX_AGE_HOURS * 3600
+        ),
+    )
+
+
+def main(args=None):
+    from .config import ConfigError, load_user_config
+
+    parser = argparse.ArgumentParser(
+        prog="goosepaper cache",
+        description="Inspect and prune Goosepaper's on-disk caches.",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        required=False,
+        help="The cache directory to use. Defaults to ~/.cache/goosepaper.",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("stats", help="Summarize what is cached.")
+    commands.add_parser("list", help="List cached articles, most recently used first.")
+    prune_parser = commands.add_parser(
+        "prune",
+        help=(
+            "Evict expired and least recently used articles, feeds and last "
+            "good stories."
+        ),
+    )
+    prune_parser.add_argument(
+        "--max-age-hours",
+        type=float,
+        required=False,
+        help="Evict articles older than this. Defaults to the cache settings.",
+    )
+    prune_parser.add_argument(
+        "--max-mb",
+        type=float,
+        required=False,
+        help="Keep the articles to this size. Defaults to the cache settings.",
+    )
+    commands.add_parser("clear", help="Delete every cached feed, article and image.")
+    parsed = parser.parse_args(args)
+
+    try:
+        settings = load_user_config().cache
+    except ConfigError as err:
+        print(f"Honk! {err}")
+        return 1
+
+    root = Path(parsed.cache_dir).expanduser() if parsed.cache_dir else default_cache_dir()
+    articles = _article_cache_for(root, settings)
+
+    if parsed.command == "stats":
+        entries = articles.entries()
+        feeds = list((root / "feeds").glob("*.pickle"))
+        last_good = list((root / "last_good").glob("*.pickle"))
+        print(f"Cache directory: {root}")
+        print(f"Feeds: {len(feeds)} ({_human_size(sum(_size(p) for p in feeds))})")
+        print(
+            f"Last good sources: {len(last_good)} "
+            f"({_human_size(sum(_size(p) for p in last_good))})"
+        )
+        print(
+            f"Articles: {len(entries)} "
+            f"({_human_size(sum(entry['size'] for entry in entries))} "
+            f"of {_human_size(articles.max_bytes)})"
+        )
+    elif parsed.command == "list":
+        now = time.time()
+        for entry in articles.entries():
+            age_hours = (now - entry["stored_at"]) / 3600
+            print(
+                f"{age_hours:6.1f}h  {_human_size(entry['size']):>9}  {entry['url']}"
+            )
+    elif parsed.command == "prune":
+        removed = articles.prune(
+            ttl_seconds=(
+                parsed.max_age_hours * 3600
+                if parsed.max_age_hours is not None
+                else None
+            ),
+            max_bytes=(
+                int(parsed.max_mb * 1024 * 1024) if parsed.max_mb is not None else None
+            ),
+        )
+        feeds = FeedCache(root / "feeds").prune()
+        last_good = _last_good_store_for(root, settings).prune()
+        print(
+            f"Honk! Pruned {removed} cached article(s), {feeds} feed(s) and "
+            f"{last_good} last good source(s)."
+        )
+    elif parsed.command == "clear":
+        owned = [root / name for name in CACHE_SUBDIRS]
+        if (
+            root.is_dir()
+            and any(root.iterdir())
+            and not any(
+                (root / name).is_dir() for name in CACHE_SUBDIRS + KEPT_SUBDIRS
+            )
+        ):
+            print(
+                f"Sad honk :/ {root} doesn't look like a Goosepaper cache, "
+                "so it was left alone."
+            )
+            return 1
+        for path in owned:
+            if path.is_dir():
+                shutil.rmtree(path)
+        print(f"Honk! Cleared {root}.")
+    return 0
+
+
+def _size(path: Path) -> int:
+    try:
+        return path.stat().st_size
+    except OSError:
+        return 0
+
+
+def _human_size(num_bytes: float) -> str:
+    if num_bytes < 1024:
+        return f"{num_bytes:.0f} B"
+    for unit in ("KB", "MB"):
+        num_bytes /= 1024
+        if num_bytes < 1024:
+            return f"{num_bytes:.1f} {unit}"
+    return f"{num_bytes / 1024:.1f} GB"
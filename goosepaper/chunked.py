@@ -0,0 +1,293 @@
+"""
+Lay out a long paper a section at a time, and stitch the PDFs together.
+
+WeasyPrint keeps the boxes of every page of a document in memory until the
+whole document is laid out, so a weekly digest with hundreds of stories can
+need gigabytes. `render_chunked` instead lays out the masthead (with the
+utility strip and table of contents), each section run of the main stories,
+and the sidebar as documents of their own. Each chunk is written to a
+temporary PDF as soon as it is laid out, and the PDFs are merged with pypdf,
+so peak memory is about that of the largest chunk rather than of the paper.
+
+Every chunk starts on a new page. Untitled stories are kept together in one
+chunk, and without a table of contents the first chunk shares the masthead's
+page. The table of contents is laid out last, once the page of every anchor
+is known: it prints those page numbers, and its links are added to the merged
+PDF. Links and bookmarks within a chunk are kept as WeasyPrint wrote them.
+
+Merging needs pypdf (`pip install goosepaper[chunked]`).
+
+"""
+
+import importlib.util
+import logging
+import shutil
+import tempfile
+from contextlib import contextmanager
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import BinaryIO, Callable, Dict, List, Sequence, Tuple, Union
+
+from . import metrics
+from .goosepaper import DocumentPlan
+from .story import Story
+
+# WeasyPrint measures pages in CSS pixels, PDF in points.
+POINTS_PER_PX = 0.75
+# How many times to lay out the table of contents before its page count (and
+# so the page numbers it prints) settles.
+MAX_FRONT_ATTEMPTS = 3
+
+# (page index, left, top) in PDF points.
+Destination = Tuple[int, float, float]
+
+
+@dataclass(frozen=True)
+class ChunkLayout:
+    """
+    A chunk that has been laid out and written to a PDF.
+
+    Attributes:
+        path: The chunk's PDF file.
+        pages: How many pages it has.
+        anchors: Where each anchor in the chunk is, by name.
+        links: The links to anchors in other chunks, as (page index, anchor,
+            rectangle in PDF points) triples.
+
+    """
+
+    path: str
+    pages: int
+    anchors: Dict[str, Destination]
+    links: Tuple[Tuple[int, str, Tuple[float, float, float, float]], ...] = ()
+
+
+def chunkable() -> bool:
+    """
+    Whether pypdf is installed to merge the chunks.
+    """
+    return importlib.util.find_spec("pypdf") is not None
+
+
+def plan_chunks(plan: DocumentPlan) -> List[DocumentPlan]:
+    """
+    Split a document plan into the plans of its chunks. The first chunk is
+    the masthead, with the utility strip and table of contents.
+    """
+    body = replace(
+        plan, header_html="", utility_items=(), toc_entries=(), sidebar_items=()
+    )
+    chunks = [replace(body, main_items=run) for run in _section_runs(plan.main_items)]
+    if plan.sidebar_items:
+        chunks.append(replace(body, main_items=(), sidebar_items=plan.sidebar_items))
+
+    front = replace(plan, main_items=(), sidebar_items=())
+    if not plan.toc_entries and chunks:
+        first = chunks.pop(0)
+        front = replace(
+            front, main_items=first.main_items, sidebar_items=first.sidebar_items
+        )
+    return [front, *chunks]
+
+
+def page_numbers(chunks: Sequence[ChunkLayout], first_page: int) -> Dict[str, int]:
+    """
+    The page number of every anchor in `chunks`, when the first of them
+    starts on page `first_page`.
+    """
+    destinations = _destinations(chunks, first_page)
+    return {name: page for name, (page, _left, _top) in destinations.items()}
+
+
+def render_chunked(
+    target: Union[str, BinaryIO],
+    plan: DocumentPlan,
+    to_html: Callable[[DocumentPlan], str],
+    layout: Callable[[str], object],
+) -> int:
+    """
+    Lay out `plan` chunk by chunk and write the merged PDF to `target`.
+
+    Arguments:
+        target: The file name or writable binary stream to write the PDF to.
+        plan: The whole paper's DocumentPlan.
+        to_html: Renders a DocumentPlan to an HTML document.
+        layout: Lays out an HTML document, returning a WeasyPrint Document.
+
+    Returns:
+        The number of pages in the PDF.
+
+    """
+    from pypdf import PdfReader, PdfWriter
+    from pypdf.annotations import Link
+    from pypdf.generic import Fit
+
+    front, *chunks = plan_chunks(plan)
+    with tempfile.TemporaryDirectory(prefix="goosepaper-chunks-") as workdir:
+        laid_out = []
+        for index, chunk in enumerate(chunks, start=1):
+            with metrics.span("pdf.chunk", chunk=index) as span:
+                laid_out.append(
+                    _lay_out(chunk, to_html, layout, f"{workdir}/chunk-{index}.pdf")
+                )
+                span.set(pages=laid_out[-1].pages)
+        with metrics.span("pdf.chunk", chunk=0) as span:
+            front_layout = _lay_out_front(
+                front, laid_out, to_html, layout, f"{workdir}/chunk-0.pdf"
+            )
+            span.set(pages=front_layout.pages)
+
+        with metrics.span("pdf.merge", chunks=len(laid_out) + 1):
+            writer = PdfWriter()
+            for chunk_layout in [front_layout, *laid_out]:
+                writer.append(chunk_layout.path)
+            destinations = _destinations(laid_out, front_layout.pages)
+            for page_index, anchor, rectangle in front_layout.links:
+                if anchor not in destinations:
+                    continue
+                target_index, left, top = destinations[anchor]
+                writer.add_annotation(
+                    page_index,
+                    Link(
+                        rect=rectangle,
+                        border=[0, 0, 0],
+                        target_page_index=target_index,
+                        fit=Fit.xyz(left=left, top=top),
+                    ),
+                )
+            metadata = PdfReader(front_layout.path).metadata
+            if metadata:
+                writer.add_metadata(dict(metadata))
+            merged = Path(workdir) / "paper.pdf"
+            writer.write(str(merged))
+            pages = len(writer.pages)
+
+        if isinstance(target, str):
+            shutil.move(str(merged), target)
+        else:
+            with open(merged, "rb") as fh:
+                shutil.copyfileobj(fh, target)
+    return pages
+
+
+def _section_runs(
+    items: Sequence[Union[str, Story]],
+) -> List[Tuple[Union[str, Story], ...]]:
+    """
+    Split the main stories at each section heading, and where untitled
+    stories follow a section.
+    """
+    runs = []
+    current: List[Union[str, Story]] = []
+    titled = False
+    for item in items:
+        untitled = isinstance(item, Story) and not (item.section_title or "").strip()
+        if current and (isinstance(item, str) or (titled and untitled)):
+            runs.append(tuple(current))
+            current = []
+        if not current:
+            titled = isinstance(item, str)
+        current.append(item)
+    if current:
+        runs.append(tuple(current))
+    return runs
+
+
+def _lay_out_front(
+    front: DocumentPlan,
+    chunks: Sequence[ChunkLayout],
+    to_html: Callable[[DocumentPlan], str],
+    layout: Callable[[str], object],
+    path: str,
+) -> ChunkLayout:
+    """
+    Lay out the masthead chunk, numbering the table of contents from the page
+    after it. If the table of contents turns out longer (or shorter) than
+    assumed, it is laid out again with the numbers shifted.
+    """
+    if not front.toc_entries:
+        return _lay_out(front, to_html, layout, path)
+    pages = 1
+    for _attempt in range(MAX_FRONT_ATTEMPTS):
+        numbered = replace(front, page_numbers=page_numbers(chunks, pages + 1))
+        front_layout = _lay_out(numbered, to_html, layout, path)
+        if front_layout.pages == pages:
+            break
+        pages = front_layout.pages
+    return front_layout
+
+
+def _lay_out(
+    chunk: DocumentPlan,
+    to_html: Callable[[DocumentPlan], str],
+    layout: Callable[[str], object],
+    path: str,
+) -> ChunkLayout:
+    document = layout(to_html(chunk))
+    anchors: Dict[str, Destination] = {}
+    for index, page in enumerate(document.pages):
+        for name, point in page.anchors.items():
+            left, top = point[:2]
+            top = (page.height - top) * POINTS_PER_PX
+            anchors.setdefault(name, (index, left * POINTS_PER_PX, top))
+    links = []
+    for index, page in enumerate(document.pages):
+        for link in page.links:
+            link_type, anchor, rectangle = link[:3]
+            if link_type == "internal" and anchor not in anchors:
+                links.append((index, anchor, _pdf_rectangle(rectangle, page.height)))
+    with _quiet_missing_anchors():
+        document.write_pdf(path)
+    return ChunkLayout(path, len(document.pages), anchors, tuple(links))
+
+
+def _destinations(
+    chunks: Sequence[ChunkLayout], first_page: int
+) -> Dict[str, Destination]:
+    """
+    Where every anchor in `chunks` ends up, when the first of them starts on
+    page `first_page` (a page number or a page index).
+    """
+    destinations: Dict[str, Destination] = {}
+    offset = first_page
+    for chunk in chunks:
+        for name, (index, left, top) in chunk.anchors.items():
+            destinations.setdefault(name, (offset + index, left, top))
+        offset += chunk.pages
+    return destinations
+
+
+def _pdf_rectangle(
+    rectangle: Sequence[float], page_height: float
+) -> Tuple[float, float, float, float]:
+    """
+    Convert a WeasyPrint (x1, y1, x2, y2) rectangle in CSS pixels from the top
+    of the page to a PDF one in points from the bottom.
+    """
+    x1, y1, x2, y2 = rectangle
+    return (
+        x1 * POINTS_PER_PX,
+        (page_height - y2) * POINTS_PER_PX,
+        x2 * POINTS_PER_PX,
+        (page_height - y1) * POINTS_PER_PX,
+    )
+
+
+class _MissingAnchorFilter(logging.Filter):
+    def filter(self, record: logging.LogRecord) -> bool:
+        return not record.getMessage().startswith("No anchor")
+
+
+@contextmanager
+def _quiet_missing_anchors():
+    """
+    WeasyPrint logs an error for every link to an anchor that isn't in the
+    document; in a chunk, those are the links `render_chunked` adds itself.
+    """
+    logger = logging.getLogger("weasyprint")
+    log_filter = _MissingAnchorFilter()
+    logger.addFilter(log_filter)
+    try:
+        yield
+    finally:
+        logger.removeFilter(log_filter)
@@ -2,10 +2,11 @@ import argparse
 import datetime
 import json
 import os
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Sequence
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
 
+from goosepaper.images import IMAGE_MODES
 from goosepaper.layout import LAYOUT_CHOICES
 from goosepaper.styles import PAGE_PROFILE_CHOICES
 from goosepaper.util import load_config_file
@@ -20,6 +21,39 @@ class ConfigError(ValueError):
     pass
 
 
+@dataclass(frozen=True)
+class Rendition:
+    """
+    One extra page profile (and optionally layout) to render the edition in.
+    """
+
+    page_profile: str
+    layout: Optional[str] = None
+
+    def __post_init__(self):
+        if self.page_profile not in PAGE_PROFILE_CHOICES:
+            raise ValueError(
+                "Rendition page_profile must be one of: "
+                + ", ".join(f'"{profile}"' for profile in PAGE_PROFILE_CHOICES)
+                + "."
+            )
+        if self.layout is not None and self.layout not in LAYOUT_CHOICES:
+            raise ValueError(
+                "Rendition layout must be one of: "
+                + ", ".join(f'"{layout}"' for layout in LAYOUT_CHOICES)
+                + "."
+            )
+
+    @property
+    def name(self) -> str:
+        if self.layout is None:
+            return self.page_profile
+        return f"{self.page_profile}-{self.layout}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"page_profile": self.page_profile, "layout": self.layout}
+
+
 @dataclass(frozen=True)
 class PaperSettings:
     title: Optional[str] = None
@@ -30,6 +64,15 @@ class PaperSettings:
     table_of_contents: bool = False
     layout: str = "auto"
     page_profile: str = "remarkable2"
+    deadline_seconds: Optional[float] = None
+    deduplicate: bool = False
+    renditions: Tuple[Rendition, ...] = ()
+    style_dirs: Tuple[str, ...] = ()
+    fonts_dir: Optional[str] = None
+    images: str = "original"
+    max_pages: Optional[int] = None
+    max_words: Optional[int] = None
+    chunked: bool = False
 
     def __post_init__(self):
         if self.title is not None and not isinstance(self.title, str):
@@ -62,6 +105,43 @@ class PaperSettings:
                 + ", ".join(f'"{profile}"' for profile in PAGE_PROFILE_CHOICES)
                 + "."
             )
+        if self.deadline_seconds is not None and (
+            not isinstance(self.deadline_seconds, (int, float))
+            or isinstance(self.deadline_seconds, bool)
+            or self.deadline_seconds <= 0
+        ):
+            raise ValueError("Paper deadline_seconds must be a positive number or null.")
+        if not isinstance(self.deduplicate, bool):
+            raise ValueError("Paper deduplicate must be a boolean.")
+        object.__setattr__(self, "renditions", tuple(self.renditions))
+        if not all(isinstance(item, Rendition) for item in self.renditions):
+            raise ValueError("Paper renditions must be a list of renditions.")
+        object.__setattr__(self, "style_dirs", tuple(self.style_dirs))
+        if not all(
+            isinstance(path, str) and path.strip() for path in self.style_dirs
+        ):
+            raise ValueError("Paper style_dirs must be a list of directory paths.")
+        if self.fonts_dir is not None and (
+            not isinstance(self.fonts_dir, str) or not self.fonts_dir.strip()
+        ):
+            raise ValueError("Paper fonts_dir must be a directory path or null.")
+        names = [rendition.name for rendition in self.renditions]
+        if len(set(names)) != len(names):
+            raise ValueError("Paper renditions must not repeat a page profile and layout.")
+        if self.images not in IMAGE_MODES:
+            raise ValueError(
+                "Paper images must be one of: "
+                + ", ".join(f'"{mode}"' for mode in IMAGE_MODES)
+                + "."
+            )
+        for name in ("max_pages", "max_words"):
+            value = getattr(self, name)
+            if value is not None and (
+                not isinstance(value, int) or isinstance(value, bool) or value <= 0
+            ):
+                raise ValueError(f"Paper {name} must be a positive integer or null.")
+        if not isinstance(self.chunked, bool):
+            raise ValueError("Paper chunked must be a boolean.")
 
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -73,6 +153,15 @@ class PaperSettings:
             "table_of_contents": self.table_of_contents,
             "layout": self.layout,
             "page_profile": self.page_profile,
+            "deadline_seconds": self.deadline_seconds,
+            "deduplicate": self.deduplicate,
+            "renditions": [rendition.to_dict() for rendition in self.renditions],
+            "style_dirs": list(self.style_dirs),
+            "fonts_dir": self.fonts_dir,
+            "images": self.images,
+            "max_pages": self.max_pages,
+            "max_words": self.max_words,
+            "chunked": self.chunked,
         }
 
 
@@ -143,15 +232,94 @@ class PaperConfig:
         }
 
 
+@dataclass(frozen=True)
+class CacheSettings:
+    article_ttl_hours: float = 72
+    article_max_mb: float = 100
+    last_good_max_age_hours: float = 24
+
+    def __post_init__(self):
+        for name in (
+            "article_ttl_hours",
+            "article_max_mb",
+            "last_good_max_age_hours",
+        ):
+            value = getattr(self, name)
+            if (
+                not isinstance(value, (int, float))
+                or isinstance(value, bool)
+                or value <= 0
+            ):
+                raise ValueError(f"cache {name} must be a positive number.")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "article_ttl_hours": self.article_ttl_hours,
+            "article_max_mb": self.article_max_mb,
+            "last_good_max_age_hours": self.last_good_max_age_hours,
+        }
+
+
+@dataclass(frozen=True)
+class RenderLimits:
+    """
+    Limits on the worker process that lays out each PDF. Setting any of them
+    moves PDF layout out of the main process (see `goosepaper.isolation`).
+    The worker is started with "spawn", which re-imports the `__main__`
+    module, so a script rendering with limits must keep its work under an
+    `if __name__ == "__main__":` guard.
+    """
+
+    memory_mb: Optional[float] = None
+    cpu_seconds: Optional[float] = None
+    timeout_seconds: Optional[float] = None
+    max_dropped_stories: int = 3
+
+    def __post_init__(self):
+        for name in ("memory_mb", "cpu_seconds", "timeout_seconds"):
+            value = getattr(self, name)
+            if value is not None and (
+                not isinstance(value, (int, float))
+                or isinstance(value, bool)
+                or value <= 0
+            ):
+                raise ValueError(f"render {name} must be a positive number or null.")
+        if (
+            not isinstance(self.max_dropped_stories, int)
+            or isinstance(self.max_dropped_stories, bool)
+            or self.max_dropped_stories < 0
+        ):
+            raise ValueError("render max_dropped_stories must be a non-negative integer.")
+
+    @property
+    def enabled(self) -> bool:
+        return any(
+            value is not None
+            for value in (self.memory_mb, self.cpu_seconds, self.timeout_seconds)
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "memory_mb": self.memory_mb,
+            "cpu_seconds": self.cpu_seconds,
+            "timeout_seconds": self.timeout_seconds,
+            "max_dropped_stories": self.max_dropped_stories,
+        }
+
+
 @dataclass(frozen=True)
 class UserConfig:
     version: int = CONFIG_VERSION
     delivery_defaults: DeliverySettings = field(default_factory=DeliverySettings)
+    cache: CacheSettings = field(default_factory=CacheSettings)
+    render: RenderLimits = field(default_factory=RenderLimits)
 
     def to_dict(self) -> Dict[str, Any]:
         return {
             "version": self.version,
             "delivery_defaults": self.delivery_defaults.to_dict(),
+            "cache": self.cache.to_dict(),
+            "render": self.render.to_dict(),
         }
 
 
@@ -160,12 +328,24 @@ class ResolvedConfig:
     paper: PaperSettings
     sources: List[SourceConfig]
     delivery: DeliverySettings
-    output: str
+    cache: CacheSettings
+    outputs: List[str]
     deliver: bool
     nostory: bool
     showconfig: bool
+    use_cache: bool
     paper_config_path: Optional[Path]
     user_config_path: Path
+    profile: bool = False
+    metrics_json: Optional[str] = None
+    force: bool = False
+    edition_time: Optional[datetime.datetime] = None
+    estimate: bool = False
+    render: RenderLimits = field(default_factory=RenderLimits)
+
+    @property
+    def output(self) -> str:
+        return self.outputs[0]
 
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -176,10 +356,20 @@ class ResolvedConfig:
             "paper": self.paper.to_dict(),
             "sources": [source.to_dict() for source in self.sources],
             "delivery": self.delivery.to_dict(),
-            "output": self.output,
+            "cache": self.cache.to_dict(),
+            "outputs": list(self.outputs),
             "deliver": self.deliver,
             "nostory": self.nostory,
             "showconfig": self.showconfig,
+            "use_cache": self.use_cache,
+            "profile": self.profile,
+            "metrics_json": self.metrics_json,
+            "force": self.force,
+            "edition_time": (
+                self.edition_time.isoformat() if self.edition_time else None
+            ),
+            "estimate": self.estimate,
+            "render": self.render.to_dict(),
         }
 
 
@@ -197,8 +387,12 @@ def build_cli_parser() -> argparse.ArgumentParser:
     parser.add_argument(
         "-o",
         "--output",
+        action="append",
         required=False,
-        help="The output file path at which to save the paper.",
+        help=(
+            "The output file path at which to save the paper. Repeat to render "
+            "several formats (e.g. '-o paper.pdf -o paper.epub') from one fetch."
+        ),
     )
     parser.add_argument(
         "--deliver",
@@ -247,6 +441,85 @@ def build_cli_parser() -> argparse.ArgumentParser:
         required=False,
         help="Print the resolved configuration for this run.",
     )
+    parser.add_argument(
+        "--no-cache",
+        dest="use_cache",
+        action="store_false",
+        default=True,
+        help="Don't read or write the on-disk caches (~/.cache/goosepaper) for this run.",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        required=False,
+        help=(
+            "Render and deliver even if the edition is identical to the one "
+            "last rendered to the same output."
+        ),
+    )
+    parser.add_argument(
+        "--estimate",
+        action="store_true",
+        required=False,
+        help=(
+            "Fetch the edition and print a rough preview of the page count of "
+            "each PDF and HTML output, without rendering or delivering anything."
+        ),
+    )
+    parser.add_argument(
+        "--deadline",
+        type=float,
+        required=False,
+        metavar="SECONDS",
+        help=(
+            "Render whatever has arrived after SECONDS, leaving out slow sources. "
+            "Overrides the paper config's deadline_seconds."
+        ),
+    )
+    parser.add_argument(
+        "--edition-time",
+        required=False,
+        metavar="ISO8601",
+        help=(
+            "Pin the edition date and time (e.g. 2026-01-31T06:00:00Z) and make "
+            "the output reproducible: the same stories and settings give "
+            "byte-identical files. Defaults to $SOURCE_DATE_EPOCH when it is set."
+        ),
+    )
+    parser.add_argument(
+        "--fonts-dir",
+        required=False,
+        metavar="DIR",
+        help=(
+            "Use the fonts synced to this directory with 'goosepaper fonts "
+            "sync --fonts-dir'. Overrides the paper config's fonts_dir."
+        ),
+    )
+    parser.add_argument(
+        "--page-profile",
+        dest="page_profiles",
+        action="append",
+        choices=PAGE_PROFILE_CHOICES,
+        required=False,
+        metavar="PROFILE",
+        help=(
+            "Render the paper for this page profile. Repeat to render several "
+            "profiles of one edition in parallel, each output named by profile "
+            "(e.g. paper-paper_pro.pdf). Overrides the paper config's renditions."
+        ),
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        required=False,
+        help="Print how long each stage of the run took.",
+    )
+    parser.add_argument(
+        "--metrics-json",
+        required=False,
+        metavar="PATH",
+        help="Write per-stage timings, bytes fetched, and story counts as JSON to PATH ('-' for stdout).",
+    )
     return parser
 
 
@@ -273,7 +546,7 @@ def load_paper_config(path: Path) -> PaperConfig:
     try:
         return PaperConfig(
             version=CONFIG_VERSION,
-            paper=_parse_paper_settings(raw.get("paper", {})),
+            paper=_parse_paper_settings(raw.get("paper", {}), path.parent),
             sources=_parse_sources(raw.get("sources", [])),
             delivery=_parse_delivery_intent(raw.get("delivery", {})),
         )
@@ -281,16 +554,41 @@ def load_paper_config(path: Path) -> PaperConfig:
         raise ConfigError(str(err)) from err
 
 
-def load_user_config(path: Optional[Path] = None) -> UserConfig:
+def load_user_config(path: Optional[Path] = None, strict: bool = True) -> UserConfig:
+    """
+    Load the user config.
+
+    Arguments:
+        path: The file to load. Default: `default_user_config_path()`
+        strict: Raise a ConfigError for anything wrong with the file. Without
+            it, only the `cache` and `render` sections are read, and a file or
+            section that can't be read is reported and left at its defaults,
+            so a legacy or broken user config doesn't stop runs that don't
+            deliver. Default: True
+
+    """
     config_path = path or default_user_config_path()
     try:
         raw = _load_json_object(config_path, "user config")
     except FileNotFoundError:
         return UserConfig()
+    except ConfigError as err:
+        if strict:
+            raise
+        _report_ignored_user_config(err)
+        return UserConfig()
+
+    if not strict:
+        return UserConfig(
+            cache=_parse_leniently(_parse_cache_settings, raw.get("cache", {})),
+            render=_parse_leniently(_parse_render_limits, raw.get("render", {})),
+        )
 
     _maybe_raise_legacy_user_config_error(raw)
     _require_config_version(raw, "user config")
-    _reject_unknown_keys(raw, {"version", "delivery_defaults"}, "user config")
+    _reject_unknown_keys(
+        raw, {"version", "delivery_defaults", "cache", "render"}, "user config"
+    )
 
     try:
         return UserConfig(
@@ -298,11 +596,25 @@ def load_user_config(path: Optional[Path] = None) -> UserConfig:
             delivery_defaults=_parse_delivery_settings(
                 raw.get("delivery_defaults", {}), "delivery_defaults"
             ),
+            cache=_parse_cache_settings(raw.get("cache", {})),
+            render=_parse_render_limits(raw.get("render", {})),
         )
     except ValueError as err:
         raise ConfigError(str(err)) from err
 
 
+def _parse_leniently(parse: Callable[[Any], Any], raw: Any):
+    try:
+        return parse(raw)
+    except ValueError as err:
+        _report_ignored_user_config(err)
+        return parse({})
+
+
+def _report_ignored_user_config(err: Exception):
+    print(f"Honk! Ignoring part of the user config: {err}")
+
+
 def resolve_runtime_config(args: Optional[Sequence[str]] = None) -> ResolvedConfig:
     cli_args = build_cli_parser().parse_args(args)
 
@@ -332,15 +644,37 @@ def resolve_runtime_config(args: Optional[Sequence[str]] = None) -> ResolvedConf
             "No paper config found. Create ./goosepaper.json or pass '--config /path/to/paper.json'."
         )
 
-    should_load_user_config = (
-        cli_args.deliver
+    # The render limits and cache settings apply to every run that renders
+    # stories, with or without the cache, and the delivery defaults to every
+    # delivery ('--nostory' requires '--deliver'). Only runs that deliver, or
+    # show the config, need the whole file to be valid.
+    user_config = load_user_config(
+        strict=cli_args.deliver
         or cli_args.showconfig
         or _has_delivery_cli_overrides(cli_args)
     )
-    user_config = load_user_config() if should_load_user_config else UserConfig()
+
+    paper_settings = paper_config.paper
+    if cli_args.deadline is not None:
+        try:
+            paper_settings = replace(paper_settings, deadline_seconds=cli_args.deadline)
+        except ValueError as err:
+            raise ConfigError("'--deadline' must be a positive number of seconds.") from err
+    if cli_args.fonts_dir is not None:
+        paper_settings = replace(
+            paper_settings, fonts_dir=str(Path(cli_args.fonts_dir).expanduser())
+        )
+    if cli_args.page_profiles:
+        paper_settings = replace(
+            paper_settings,
+            renditions=tuple(
+                Rendition(page_profile=profile)
+                for profile in dict.fromkeys(cli_args.page_profiles)
+            ),
+        )
 
     return ResolvedConfig(
-        paper=paper_config.paper,
+        paper=paper_settings,
         sources=paper_config.sources,
         delivery=resolve_delivery_settings(
             user_defaults=user_config.delivery_defaults,
@@ -349,12 +683,20 @@ def resolve_runtime_config(args: Optional[Sequence[str]] = None) -> ResolvedConf
             replace_mode_override=cli_args.replace_mode,
             cleanup_override=cli_args.cleanup,
         ),
-        output=cli_args.output or default_output_filename(),
+        cache=user_config.cache,
+        outputs=list(cli_args.output or [default_output_filename()]),
         deliver=cli_args.deliver,
         nostory=cli_args.nostory,
         showconfig=cli_args.showconfig,
+        use_cache=cli_args.use_cache,
         paper_config_path=paper_config_path,
         user_config_path=default_user_config_path(),
+        profile=cli_args.profile,
+        metrics_json=cli_args.metrics_json,
+        force=cli_args.force,
+        edition_time=_resolve_edition_time(cli_args.edition_time),
+        estimate=cli_args.estimate,
+        render=user_config.render,
     )
 
 
@@ -387,6 +729,34 @@ def resolve_delivery_settings(
         raise ConfigError(str(err)) from err
 
 
+def _resolve_edition_time(
+    edition_time: Optional[str],
+) -> Optional[datetime.datetime]:
+    if edition_time is not None:
+        value = edition_time.strip()
+        if value.endswith(("Z", "z")):
+            value = value[:-1] + "+00:00"
+        try:
+            return datetime.datetime.fromisoformat(value)
+        except ValueError as err:
+            raise ConfigError(
+                "'--edition-time' must be an ISO 8601 date and time, "
+                "e.g. 2026-01-31T06:00:00Z."
+            ) from err
+
+    source_date_epoch = os.environ.get("SOURCE_DATE_EPOCH")
+    if not source_date_epoch:
+        return None
+    try:
+        return datetime.datetime.fromtimestamp(
+            int(source_date_epoch), tz=datetime.timezone.utc
+        )
+    except (ValueError, OverflowError, OSError) as err:
+        raise ConfigError(
+            "SOURCE_DATE_EPOCH must be a number of seconds since 1970-01-01."
+        ) from err
+
+
 def default_output_filename() -> str:
     return f"Goosepaper-{datetime.datetime.now().strftime('%Y-%B-%d-%H-%M')}.pdf"
 
@@ -473,7 +843,7 @@ def _require_config_version(raw: Dict[str, Any], config_kind: str):
         )
 
 
-def _parse_paper_settings(raw: Any) -> PaperSettings:
+def _parse_paper_settings(raw: Any, base_dir: Optional[Path] = None) -> PaperSettings:
     section = _require_object(raw, "paper")
     _reject_unknown_keys(
         section,
@@ -486,6 +856,15 @@ def _parse_paper_settings(raw: Any) -> PaperSettings:
             "table_of_contents",
             "layout",
             "page_profile",
+            "deadline_seconds",
+            "deduplicate",
+            "renditions",
+            "style_dirs",
+            "fonts_dir",
+            "images",
+            "max_pages",
+            "max_words",
+            "chunked",
         },
         "paper",
     )
@@ -500,6 +879,17 @@ def _parse_paper_settings(raw: Any) -> PaperSettings:
     )
     layout = section.get("layout", PaperSettings.layout)
     page_profile = section.get("page_profile", PaperSettings.page_profile)
+    deadline_seconds = section.get("deadline_seconds", PaperSettings.deadline_seconds)
+    deduplicate = section.get("deduplicate", PaperSettings.deduplicate)
+    renditions = _parse_renditions(section.get("renditions", []))
+    style_dirs = _parse_style_dirs(section.get("style_dirs", []), base_dir)
+    fonts_dir = section.get("fonts_dir", PaperSettings.fonts_dir)
+    if isinstance(fonts_dir, str) and fonts_dir.strip():
+        fonts_dir = _resolve_config_path(fonts_dir, base_dir)
+    images = section.get("images", PaperSettings.images)
+    max_pages = section.get("max_pages", PaperSettings.max_pages)
+    max_words = section.get("max_words", PaperSettings.max_words)
+    chunked = section.get("chunked", PaperSettings.chunked)
 
     return PaperSettings(
         title=title,
@@ -510,9 +900,57 @@ def _parse_paper_settings(raw: Any) -> PaperSettings:
         table_of_contents=table_of_contents,
         layout=layout,
         page_profile=page_profile,
+        deadline_seconds=deadline_seconds,
+        deduplicate=deduplicate,
+        renditions=renditions,
+        style_dirs=style_dirs,
+        fonts_dir=fonts_dir,
+        images=images,
+        max_pages=max_pages,
+        max_words=max_words,
+        chunked=chunked,
     )
 
 
+def _parse_style_dirs(raw: Any, base_dir: Optional[Path]) -> Tuple[str, ...]:
+    """
+    Style directories are resolved relative to the paper config file.
+    """
+    if not isinstance(raw, list):
+        raise ValueError("Paper style_dirs must be a list of directory paths.")
+    style_dirs = []
+    for path in raw:
+        if not isinstance(path, str) or not path.strip():
+            raise ValueError("Paper style_dirs must be a list of directory paths.")
+        style_dirs.append(_resolve_config_path(path, base_dir))
+    return tuple(style_dirs)
+
+
+def _resolve_config_path(path: str, base_dir: Optional[Path]) -> str:
+    resolved = Path(path).expanduser()
+    if not resolved.is_absolute() and base_dir is not None:
+        resolved = base_dir / resolved
+    return str(resolved)
+
+
+def _parse_renditions(raw: Any) -> Tuple[Rendition, ...]:
+    if not isinstance(raw, list):
+        raise ValueError("Paper renditions must be a list.")
+    renditions = []
+    for index, item in enumerate(raw):
+        context = f"paper renditions[{index}]"
+        if isinstance(item, str):
+            item = {"page_profile": item}
+        section = _require_object(item, context)
+        _reject_unknown_keys(section, {"page_profile", "layout"}, context)
+        if "page_profile" not in section:
+            raise ValueError(f"{context} must set a page_profile.")
+        renditions.append(
+            Rendition(page_profile=section["page_profile"], layout=section.get("layout"))
+        )
+    return tuple(renditions)
+
+
 def _parse_delivery_intent(raw: Any) -> DeliveryIntent:
     section = _require_object(raw, "delivery")
     _reject_unknown_keys(section, {"folder"}, "delivery")
@@ -533,6 +971,41 @@ def _parse_delivery_settings(raw: Any, context: str) -> DeliverySettings:
     )
 
 
+def _parse_cache_settings(raw: Any) -> CacheSettings:
+    section = _require_object(raw, "cache")
+    _reject_unknown_keys(
+        section,
+        {"article_ttl_hours", "article_max_mb", "last_good_max_age_hours"},
+        "cache",
+    )
+    return CacheSettings(
+        article_ttl_hours=section.get(
+            "article_ttl_hours", CacheSettings.article_ttl_hours
+        ),
+        article_max_mb=section.get("article_max_mb", CacheSettings.article_max_mb),
+        last_good_max_age_hours=section.get(
+            "last_good_max_age_hours", CacheSettings.last_good_max_age_hours
+        ),
+    )
+
+
+def _parse_render_limits(raw: Any) -> RenderLimits:
+    section = _require_object(raw, "render")
+    _reject_unknown_keys(
+        section,
+        {"memory_mb", "cpu_seconds", "timeout_seconds", "max_dropped_stories"},
+        "render",
+    )
+    return RenderLimits(
+        memory_mb=section.get("memory_mb", RenderLimits.memory_mb),
+        cpu_seconds=section.get("cpu_seconds", RenderLimits.cpu_seconds),
+        timeout_seconds=section.get("timeout_seconds", RenderLimits.timeout_seconds),
+        max_dropped_stories=section.get(
+            "max_dropped_stories", RenderLimits.max_dropped_stories
+        ),
+    )
+
+
 def _parse_sources(raw: Any) -> List[SourceConfig]:
     if raw is None:
         return []
@@ -585,7 +1058,13 @@ def _source_schema(source_type: str) -> Dict[str, Any]:
         },
         "rss": {
             "required": {"url"},
-            "optional": {"limit", "since_days_ago", "byline", "body_source"},
+            "optional": {
+                "limit",
+                "since_days_ago",
+                "byline",
+                "body_source",
+                "article_concurrency",
+            },
         },
         "mastodon": {
             "required": {"server", "username"},
@@ -639,6 +1118,9 @@ def _validate_source_options(source_type: str, options: Dict[str, Any], index: i
         ),
         "byline": lambda value: _validate_rss_byline(value, index),
         "body_source": lambda value: _validate_rss_body_source(value, index),
+        "article_concurrency": lambda value: _validate_positive_int(
+            value, f"source #{index} article_concurrency"
+        ),
         "include_replies": lambda value: _validate_bool(
             value, f"source #{index} include_replies"
         ),
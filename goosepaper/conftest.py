@@ -0,0 +1,22 @@
+import pytest
+
+from . import fetch
+
+
+@pytest.fixture
+def use_transport(monkeypatch):
+    """
+    Route the shared HTTP client through a `fetch.MockTransport`.
+
+    Call it with a handler that takes a request and returns the response
+    body. It returns the transport, which records the requests made.
+    """
+
+    def install(handler):
+        transport = fetch.MockTransport(handler)
+        monkeypatch.setattr(
+            fetch, "_default_client", fetch.HttpClient(transport=transport)
+        )
+        return transport
+
+    return install
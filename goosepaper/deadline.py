@@ -0,0 +1,133 @@
+"""
+An edition-wide time budget.
+
+A Deadline is activated for the duration of a fetch with `deadline_scope`.
+Code running inside that scope (including worker threads started with
+`run_in_context`) can ask how much time is left and cap its own timeouts,
+so no single slow server can hold up the whole edition. Work that may still
+be running when the deadline passes is started with `run_in_daemon_threads`,
+so it can't keep the process alive once the edition is done.
+
+"""
+
+import contextlib
+import contextvars
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Iterable, Iterator, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+_current_deadline: contextvars.ContextVar[Optional["Deadline"]] = contextvars.ContextVar(
+    "goosepaper_deadline", default=None
+)
+
+
+class DeadlineExceeded(TimeoutError):
+    pass
+
+
+class Deadline:
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def cap(self, timeout: Optional[float]) -> float:
+        """
+        Shrink `timeout` so it ends no later than this deadline.
+
+        Raises DeadlineExceeded if the deadline has already passed.
+        """
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise DeadlineExceeded(f"Edition deadline of {self.seconds:g}s passed")
+        return remaining if timeout is None else min(timeout, remaining)
+
+
+def current_deadline() -> Optional[Deadline]:
+    return _current_deadline.get()
+
+
+def remaining_time() -> Optional[float]:
+    """
+    Seconds left before the active deadline, or None if there isn't one.
+    """
+    deadline = current_deadline()
+    return None if deadline is None else deadline.remaining()
+
+
+def capped_timeout(timeout: Optional[float]) -> Optional[float]:
+    deadline = current_deadline()
+    return timeout if deadline is None else deadline.cap(timeout)
+
+
+@contextlib.contextmanager
+def deadline_scope(deadline: Optional[Deadline]) -> Iterator[Optional[Deadline]]:
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
+
+
+def run_in_context(fn: Callable[..., T]) -> Callable[..., T]:
+    """
+    Bind `fn` to a copy of the caller's context, so that the active deadline
+    follows it into an executor thread.
+    """
+    context = contextvars.copy_context()
+
+    def bound(*args, **kwargs):
+        return context.copy().run(fn, *args, **kwargs)
+
+    return bound
+
+
+def run_in_daemon_threads(
+    fn: Callable[..., T],
+    items: Iterable,
+    max_workers: int,
+    thread_name_prefix: str = "goosepaper",
+) -> List["Future[T]"]:
+    """
+    Call `fn` on every item from at most `max_workers` daemon threads.
+
+    Unlike a ThreadPoolExecutor, whose threads are joined when the interpreter
+    exits, these threads are abandoned: a call that hangs (on a lock, a
+    subprocess, or a socket with no timeout) can't stop the process from
+    exiting. Cancelling a returned future before its call has started skips
+    the call.
+    """
+    pending: "queue.SimpleQueue" = queue.SimpleQueue()
+    futures: List[Future] = []
+    for item in items:
+        future: Future = Future()
+        futures.append(future)
+        pending.put((item, future))
+
+    def work():
+        while True:
+            try:
+                item, future = pending.get_nowait()
+            except queue.Empty:
+                return
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(fn(item))
+            except BaseException as err:
+                future.set_exception(err)
+
+    for index in range(max(1, min(max_workers, len(futures)))):
+        threading.Thread(
+            target=work, name=f"{thread_name_prefix}_{index}", daemon=True
+        ).start()
+    return futures
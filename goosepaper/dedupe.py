@@ -0,0 +1,239 @@
+"""
+Find and drop duplicate stories, in time linear in the number of stories.
+
+Two kinds of duplicates are caught:
+
+- Exact duplicates share a canonical link, or a normalized headline and the
+  same date (so recurring headlines like a daily weather report from
+  different days are kept). They are found with plain dictionary lookups.
+- Near duplicates (the same wire story lightly edited by two outlets) share
+  most of their three-word shingles. Each story's text is summarized by a
+  MinHash sketch; sketches are split into bands and bucketed, so a story is
+  only compared with the few stories that share a band, never with all of
+  them.
+
+The first story of each cluster, in the order given, is kept.
+
+"""
+
+import datetime
+import hashlib
+import re
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from . import metrics
+from .cache import canonical_url
+from .story import Story
+
+SKETCH_BINS = 64
+BAND_ROWS = 2
+DEFAULT_THRESHOLD = 0.5
+DEFAULT_MIN_WORDS = 12
+
+_BIN_SHIFT = 58
+_VALUE_MASK = (1 << _BIN_SHIFT) - 1
+_EMPTY = 1 << _BIN_SHIFT
+_UINT64 = (1 << 64) - 1
+_GOLDEN = 0x9E3779B97F4A7C15
+
+_WORD_RE = re.compile(r"\w+")
+
+
+@dataclass(frozen=True)
+class DuplicateCluster:
+    """
+    One kept story and the stories dropped as duplicates of it.
+
+    `reasons` holds one entry per dropped story: "url", "headline" or
+    "similar text".
+    """
+
+    kept: Story
+    dropped: Tuple[Story, ...] = ()
+    reasons: Tuple[str, ...] = ()
+
+    def describe(self) -> str:
+        dropped = ", ".join(
+            f"{_label(story)} ({reason})"
+            for story, reason in zip(self.dropped, self.reasons)
+        )
+        return f"Kept {_label(self.kept)}; dropped {dropped}"
+
+
+@dataclass(frozen=True)
+class DedupeResult:
+    stories: Tuple[Story, ...] = ()
+    clusters: Tuple[DuplicateCluster, ...] = ()
+
+
+def normalize_headline(headline: Optional[str]) -> str:
+    return " ".join(_WORD_RE.findall((headline or "").lower()))
+
+
+def minhash(text: str) -> Tuple[int, ...]:
+    """
+    A MinHash sketch of the three-word shingles in `text`.
+
+    Uses one-permutation hashing: each shingle is hashed once, the top bits
+    of the hash choose one of SKETCH_BINS bins, and each bin keeps the
+    smallest remaining value it sees.
+    """
+    words = _WORD_RE.findall(text.lower())
+    word_hashes = {word: _hash64(word) for word in set(words)}
+    hashes = [word_hashes[word] for word in words]
+    sketch = [_EMPTY] * SKETCH_BINS
+    for first, second, third in zip(hashes, hashes[1:], hashes[2:]):
+        value = ((first * _GOLDEN + second) * _GOLDEN + third) & _UINT64
+        value = ((value ^ (value >> 29)) * _GOLDEN) & _UINT64
+        index = value >> _BIN_SHIFT
+        value &= _VALUE_MASK
+        if value < sketch[index]:
+            sketch[index] = value
+    return tuple(sketch)
+
+
+def similarity(left: Tuple[int, ...], right: Tuple[int, ...]) -> float:
+    """
+    Estimate the Jaccard similarity of two texts from their MinHash sketches.
+    """
+    filled = matching = 0
+    for left_value, right_value in zip(left, right):
+        if left_value == _EMPTY and right_value == _EMPTY:
+            continue
+        filled += 1
+        if left_value == right_value:
+            matching += 1
+    return matching / filled if filled else 0.0
+
+
+def _hash64(word: str) -> int:
+    return int.from_bytes(
+        hashlib.blake2b(word.encode("utf-8"), digest_size=8).digest(), "big"
+    )
+
+
+class Deduplicator:
+    """
+    Incrementally collects stories, dropping each one that duplicates a story
+    already kept.
+
+    Arguments:
+        near_duplicates: Also compare story text. Default: True
+        threshold: How similar (estimated Jaccard similarity of word
+            shingles, from 0 to 1) two stories' text must be to count as
+            near duplicates. Default: 0.5
+        min_words: Stories with fewer words than this are never compared by
+            text, since short snippets collide too easily. Default: 12
+
+    """
+
+    def __init__(
+        self,
+        near_duplicates: bool = True,
+        threshold: float = DEFAULT_THRESHOLD,
+        min_words: int = DEFAULT_MIN_WORDS,
+    ):
+        self.near_duplicates = near_duplicates
+        self.threshold = threshold
+        self.min_words = min_words
+        self._kept: List[Story] = []
+        self._dropped: Dict[int, List[Tuple[Story, str]]] = {}
+        self._by_url: Dict[str, int] = {}
+        self._by_headline: Dict[Tuple[str, Optional[datetime.datetime]], int] = {}
+        self._sketches: List[Optional[Tuple[int, ...]]] = []
+        self._bands: Dict[Tuple[int, Tuple[int, ...]], List[int]] = {}
+
+    def add(self, story: Story) -> bool:
+        """
+        Offer a story. Returns True if it was kept, False if it duplicates a
+        story that was already kept.
+        """
+        url = canonical_url(story.url) if story.url else None
+        headline = normalize_headline(story.headline)
+        headline_key = (headline, story.date)
+
+        match, reason = None, None
+        if url is not None and url in self._by_url:
+            match, reason = self._by_url[url], "url"
+        elif headline and headline_key in self._by_headline:
+            match, reason = self._by_headline[headline_key], "headline"
+
+        sketch = None
+        if match is None and self.near_duplicates:
+            text = story.plain_text()
+            if len(_WORD_RE.findall(text)) >= self.min_words:
+                sketch = minhash(text)
+                match = self._similar(sketch)
+                reason = "similar text"
+
+        if match is not None:
+            self._dropped.setdefault(match, []).append((story, reason))
+            return False
+
+        index = len(self._kept)
+        self._kept.append(story)
+        self._sketches.append(sketch)
+        if url is not None:
+            self._by_url[url] = index
+        if headline:
+            self._by_headline.setdefault(headline_key, index)
+        if sketch is not None:
+            for band in _band_keys(sketch):
+                self._bands.setdefault(band, []).append(index)
+        return True
+
+    def result(self) -> DedupeResult:
+        clusters = tuple(
+            DuplicateCluster(
+                kept=self._kept[index],
+                dropped=tuple(story for story, _ in dropped),
+                reasons=tuple(reason for _, reason in dropped),
+            )
+            for index, dropped in sorted(self._dropped.items())
+        )
+        return DedupeResult(stories=tuple(self._kept), clusters=clusters)
+
+    def _similar(self, sketch: Tuple[int, ...]) -> Optional[int]:
+        candidates = set()
+        for band in _band_keys(sketch):
+            candidates.update(self._bands.get(band, ()))
+        for index in sorted(candidates):
+            if similarity(sketch, self._sketches[index]) >= self.threshold:
+                return index
+        return None
+
+
+def _band_keys(sketch: Tuple[int, ...]):
+    for start in range(0, SKETCH_BINS, BAND_ROWS):
+        rows = sketch[start:start + BAND_ROWS]
+        if any(row != _EMPTY for row in rows):
+            yield start, rows
+
+
+@metrics.timed("dedupe")
+def deduplicate(
+    stories: Iterable[Story],
+    near_duplicates: bool = True,
+    threshold: float = DEFAULT_THRESHOLD,
+    min_words: int = DEFAULT_MIN_WORDS,
+) -> DedupeResult:
+    """
+    Drop duplicate stories, keeping the first of each cluster.
+
+    See `Deduplicator` for the arguments.
+    """
+    deduplicator = Deduplicator(
+        near_duplicates=near_duplicates,
+        threshold=threshold,
+        min_words=min_words,
+    )
+    for story in stories:
+        deduplicator.add(story)
+    return deduplicator.result()
+
+
+def _label(story: Story) -> str:
+    if story.headline:
+        return f'"{story.headline}"'
+    return f'"{" ".join(story.plain_text().split()[:8])}..."'
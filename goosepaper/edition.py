@@ -0,0 +1,83 @@
+import datetime
+from dataclasses import dataclass, field, replace
+from typing import TYPE_CHECKING, Iterable, Optional, Tuple
+
+from .dedupe import DuplicateCluster
+from .story import Story
+
+if TYPE_CHECKING:
+    from .budget import PageBudget
+
+
+@dataclass(frozen=True)
+class Edition:
+    """
+    An immutable snapshot of one fetched Goosepaper edition.
+
+    Fetching is the slow, network-bound part of producing a paper, so an
+    Edition is fetched once (see `Goosepaper.fetch_edition`) and can then be
+    handed to any number of renderers. Every output rendered from the same
+    Edition contains exactly the same stories.
+
+    `cut_sources` lists the sources that missed the edition deadline and are
+    therefore absent from `stories`; the ones nothing stands in for
+    (`left_out_sources`) are named in a note under the masthead.
+    `stale_sources` lists the sources whose stories were reused from an
+    earlier edition because they failed or missed the deadline this time;
+    those stories have `stale` set. `duplicates` records which story was kept
+    from each group of duplicates when the edition was fetched with
+    `deduplicate=True`. `over_budget` holds the stories left out to fit the
+    edition's `budget` when it was fetched; its `max_pages` is checked when
+    the edition is laid out as a PDF. `story_sources` gives, for each story,
+    the index of the source it came from.
+
+    A `reproducible` edition was fetched with a pinned edition time (see
+    `Goosepaper(edition_time=...)`), which is used as `fetched_at`. Its
+    renders carry no other timestamps or random identifiers, so rendering the
+    same stories with the same settings gives byte-identical files.
+
+    """
+
+    title: str
+    subtitle: str
+    stories: Tuple[Story, ...] = ()
+    cut_sources: Tuple[str, ...] = ()
+    stale_sources: Tuple[str, ...] = ()
+    duplicates: Tuple[DuplicateCluster, ...] = ()
+    over_budget: Tuple[Story, ...] = ()
+    budget: Optional["PageBudget"] = None
+    story_sources: Tuple[int, ...] = ()
+    fetched_at: datetime.datetime = field(default_factory=datetime.datetime.now)
+    reproducible: bool = False
+
+    def __post_init__(self):
+        object.__setattr__(self, "stories", tuple(self.stories))
+        object.__setattr__(self, "cut_sources", tuple(self.cut_sources))
+        object.__setattr__(self, "stale_sources", tuple(self.stale_sources))
+        object.__setattr__(self, "duplicates", tuple(self.duplicates))
+        object.__setattr__(self, "over_budget", tuple(self.over_budget))
+        if len(self.story_sources) != len(self.stories):
+            object.__setattr__(self, "story_sources", tuple(range(len(self.stories))))
+        object.__setattr__(self, "story_sources", tuple(self.story_sources))
+
+    def with_stories(self, stories: Iterable[Story]) -> "Edition":
+        """
+        This edition with only `stories`, some of its own, keeping the source
+        each of them came from.
+        """
+        stories = tuple(stories)
+        sources = dict(zip(map(id, self.stories), self.story_sources))
+        return replace(
+            self,
+            stories=stories,
+            story_sources=tuple(sources[id(story)] for story in stories),
+        )
+
+    @property
+    def left_out_sources(self) -> Tuple[str, ...]:
+        """
+        The sources cut by the deadline whose stories weren't filled in from
+        an earlier edition.
+        """
+        stale = set(self.stale_sources)
+        return tuple(source for source in self.cut_sources if source not in stale)
@@ -0,0 +1,201 @@
+"""
+Predict how a paper lays out without running WeasyPrint.
+
+A full layout is the only way to know the real page count, and it takes
+seconds. `PageEstimator` instead works from text metrics: the page profile's
+printable area, the column count and the font size give the characters per
+line and lines per column, and each story's plain text, paragraph count and
+headline give the lines it fills. An estimate takes microseconds, so it can
+preview an edition's length before rendering it (`--estimate`), and size the
+trim of a PDF that came out over its page budget (`goosepaper.budget`).
+
+The per-theme constants in `CALIBRATIONS` are read off each theme's
+stylesheet (line heights, headline sizes, body font widths); they have not
+been fitted to real renders, so estimates are rough. They drive the
+`--estimate` preview, but not `layout: auto`, which keeps choosing columns
+from the theme and page profile, nor what a page budget lets through.
+`fitted_to` rescales an estimator to the page count of a real layout, which
+makes it reliable for sizing changes to that one edition, and is how page
+budgets use it.
+
+`python -m benchmarks.page_estimate --record benchmarks/page_counts.json`
+renders a fixed set of editions for every built-in theme and page profile
+and records their real page counts; `--fit` suggests constants from them.
+Once a recording is checked in, `test_estimate` holds `CALIBRATIONS` to
+within a page of every recorded render.
+
+"""
+
+import math
+import re
+from dataclasses import dataclass, replace
+from typing import TYPE_CHECKING, Dict, Optional, Sequence
+
+from .util import PlacementPreference
+
+if TYPE_CHECKING:
+    from .story import Story
+    from .styles import PageProfile
+
+# The root font size that rem lengths in the print stylesheet refer to.
+ROOT_FONT_POINTS = 12
+# The column gap of `.main-stories`, in rem.
+COLUMN_GAP_REMS = 1.35
+
+_PARAGRAPH_RE = re.compile(r"<(?:p|li|h[1-6]|blockquote|pre|figure|tr)\b", re.I)
+# Stories in the masthead, which take no room in the page flow.
+_MASTHEAD_PLACEMENTS = (PlacementPreference.EAR, PlacementPreference.UTILITY)
+
+
+@dataclass(frozen=True)
+class Calibration:
+    """
+    A theme's typographic constants, in ems of the body font unless noted.
+
+    Attributes:
+        char_width: Average advance of a character of body text.
+        line_height: Body line height.
+        paragraph_gap: Space between paragraphs, in body lines.
+        headline_scale: Headline font size.
+        headline_line_height: Headline line height, in headline ems.
+        story_gap: Byline, rules and space around each story, in body lines.
+        masthead_lines: Height of the masthead, in body lines.
+        fill: Share of each column's height that ends up filled, after
+            column balancing and avoided breaks.
+
+    """
+
+    char_width: float = 0.5
+    line_height: float = 1.45
+    paragraph_gap: float = 0.85
+    headline_scale: float = 2.25
+    headline_line_height: float = 1.02
+    story_gap: float = 2.5
+    masthead_lines: float = 9.0
+    fill: float = 0.92
+
+
+CALIBRATIONS: Dict[str, Calibration] = {
+    "Academy": Calibration(char_width=0.47, line_height=1.48, headline_scale=2.1),
+    "Autumn": Calibration(char_width=0.47, line_height=1.5, headline_scale=2.2),
+    "FifthAvenue": Calibration(char_width=0.53, line_height=1.42),
+    "GrayMaiden": Calibration(
+        char_width=0.48, line_height=1.5, headline_scale=2.4, masthead_lines=11.0
+    ),
+}
+DEFAULT_CALIBRATION = Calibration()
+
+
+def calibration_for(style_name: Optional[str]) -> Calibration:
+    return CALIBRATIONS.get(style_name or "", DEFAULT_CALIBRATION)
+
+
+class PageEstimator:
+    """
+    Estimates story heights and page counts for one page geometry.
+
+    Arguments:
+        profile: The PageProfile to lay out on.
+        font_size: The paper's base font size, in points. Default: 14
+        columns: How many columns the main stories are set in. Default: 1
+        calibration: The theme's constants. Default: `DEFAULT_CALIBRATION`
+
+    """
+
+    def __init__(
+        self,
+        profile: "PageProfile",
+        font_size: int = 14,
+        columns: int = 1,
+        calibration: Optional[Calibration] = None,
+    ):
+        self.profile = profile
+        self.font_size = font_size
+        self.columns = max(1, columns)
+        self.calibration = calibration or DEFAULT_CALIBRATION
+
+    @property
+    def em_inches(self) -> float:
+        return self.font_size / 72
+
+    @property
+    def column_width_inches(self) -> float:
+        gap = COLUMN_GAP_REMS * ROOT_FONT_POINTS / 72
+        width = self.profile.content_width_inches - gap * (self.columns - 1)
+        return max(width / self.columns, self.em_inches)
+
+    @property
+    def chars_per_line(self) -> float:
+        char_inches = self.calibration.char_width * self.em_inches
+        return self.column_width_inches / char_inches
+
+    @property
+    def line_inches(self) -> float:
+        return self.calibration.line_height * self.em_inches
+
+    @property
+    def lines_per_page(self) -> float:
+        """
+        Body lines that fit on one page, across all its columns.
+        """
+        lines_per_column = self.profile.content_height_inches / self.line_inches
+        return lines_per_column * self.columns * self.calibration.fill
+
+    def story_lines(self, story: "Story") -> float:
+        """
+        The body lines (in one column) a story fills, headline included.
+        """
+        if story.placement_preference in _MASTHEAD_PLACEMENTS:
+            return 0.0
+        calibration = self.calibration
+        text_lines = math.ceil(len(story.plain_text()) / self.chars_per_line)
+        paragraphs = len(_PARAGRAPH_RE.findall(story.body_html or "")) or 1
+        headline_lines = 0.0
+        if story.headline:
+            headline_chars = self.chars_per_line / calibration.headline_scale
+            headline_lines = (
+                math.ceil(len(story.headline) / headline_chars)
+                * calibration.headline_scale
+                * calibration.headline_line_height
+                / calibration.line_height
+            )
+        return (
+            text_lines
+            + paragraphs * calibration.paragraph_gap
+            + headline_lines
+            + calibration.story_gap
+        )
+
+    def story_height_inches(self, story: "Story") -> float:
+        return self.story_lines(story) * self.line_inches
+
+    def estimate_lines(self, stories: Sequence["Story"]) -> float:
+        return self.calibration.masthead_lines + sum(
+            self.story_lines(story) for story in stories
+        )
+
+    def estimate_pages(self, stories: Sequence["Story"]) -> float:
+        """
+        The estimated number of pages, as a fraction. Round it up for a
+        page count.
+        """
+        return self.estimate_lines(stories) / self.lines_per_page
+
+    def fitted_to(self, stories: Sequence["Story"], pages: float) -> "PageEstimator":
+        """
+        An estimator for the same geometry whose `fill` is rescaled so that it
+        estimates `pages` for `stories`: calibrated on one real layout, to
+        size changes to that same edition.
+        """
+        estimated = self.estimate_pages(stories)
+        if estimated <= 0 or pages <= 0:
+            return self
+        calibration = replace(
+            self.calibration, fill=self.calibration.fill * estimated / pages
+        )
+        return PageEstimator(
+            self.profile,
+            font_size=self.font_size,
+            columns=self.columns,
+            calibration=calibration,
+        )
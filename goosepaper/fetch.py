@@ -0,0 +1,244 @@
+"""
+The shared HTTP layer used by every story provider.
+
+All network access goes through one pooled `requests.Session`, so keep-alive
+connections are reused across feeds and articles that live on the same host,
+and every request carries the same `goosepaper/<version>` User-Agent.
+
+"""
+
+import contextlib
+import threading
+from typing import Any, Callable, Dict, Iterator, Optional, Union
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from .cache import FeedCache, get_feed_cache
+from . import metrics
+from .deadline import DeadlineExceeded, capped_timeout, remaining_time
+from .version import __version__
+
+USER_AGENT = f"goosepaper/{__version__}"
+DEFAULT_TIMEOUT = 20
+DEFAULT_POOL_CONNECTIONS = 32
+DEFAULT_POOL_MAXSIZE = 4
+TIMEOUT_ERRORS = (DeadlineExceeded, requests.exceptions.Timeout)
+REQUEST_ERRORS = (DeadlineExceeded, requests.exceptions.RequestException)
+
+
+class HttpClient:
+    """
+    A thread-safe, connection-pooling HTTP client.
+
+    Arguments:
+        transport: A `requests` transport adapter to send every request
+            through. Defaults to a pooled `HTTPAdapter`; tests can pass a
+            `MockTransport` instead.
+        pool_connections: How many per-host connection pools to keep.
+        pool_maxsize: The most requests to have in flight to any one host at
+            once. Further requests to that host wait for one to finish, but
+            never past the edition deadline.
+        timeout: The default timeout (in seconds) for each request.
+        user_agent: The User-Agent header sent with every request.
+
+    """
+
+    def __init__(
+        self,
+        transport: Optional[BaseAdapter] = None,
+        pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        timeout: float = DEFAULT_TIMEOUT,
+        user_agent: str = USER_AGENT,
+    ):
+        self.timeout = timeout
+        self.pool_maxsize = pool_maxsize
+        # The per-host limit is kept here rather than with urllib3's
+        # pool_block, whose wait for a free connection can't be bounded by
+        # the deadline through requests.
+        self.transport = transport or HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+        )
+        self._host_slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._host_slots_lock = threading.Lock()
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = user_agent
+        self.session.mount("https://", self.transport)
+        self.session.mount("http://", self.transport)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """
+        Send a GET request. The timeout never runs past the active edition
+        deadline, and DeadlineExceeded is raised if it has already passed.
+        """
+        kwargs["timeout"] = capped_timeout(kwargs.get("timeout", self.timeout))
+        with self._host_slot(url):
+            response = self.session.get(url, **kwargs)
+        metrics.increment("http.requests")
+        if not kwargs.get("stream"):
+            metrics.increment("http.bytes", len(response.content or b""))
+        return response
+
+    def close(self) -> None:
+        self.session.close()
+
+    @contextlib.contextmanager
+    def _host_slot(self, url: str) -> Iterator[None]:
+        """
+        Hold one of the `pool_maxsize` request slots of the URL's host,
+        waiting at most until the edition deadline for one to come free.
+        """
+        host = urlsplit(url).netloc.lower()
+        with self._host_slots_lock:
+            slots = self._host_slots.get(host)
+            if slots is None:
+                slots = self._host_slots[host] = threading.BoundedSemaphore(
+                    self.pool_maxsize
+                )
+        if not slots.acquire(timeout=remaining_time()):
+            raise DeadlineExceeded(
+                f"Edition deadline passed while waiting for a connection to {host}"
+            )
+        try:
+            yield
+        finally:
+            slots.release()
+
+
+class MockTransport(BaseAdapter):
+    """
+    A transport that answers requests from a Python callable, for tests.
+
+    The handler receives the `requests.PreparedRequest` and returns either a
+    `requests.Response` (see `mock_response`) or the body of a 200 response
+    as `str` or `bytes`. Every request sent is recorded in `self.requests`.
+
+    """
+
+    def __init__(
+        self,
+        handler: Callable[
+            [requests.PreparedRequest], Union[requests.Response, str, bytes]
+        ],
+    ):
+        super().__init__()
+        self.handler = handler
+        self.requests: list[requests.PreparedRequest] = []
+        self.timeouts: list = []
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        self.requests.append(request)
+        self.timeouts.append(timeout)
+        result = self.handler(request)
+        if isinstance(result, requests.Response):
+            return result
+        return mock_response(request, content=result)
+
+    def close(self) -> None:
+        pass
+
+
+def mock_response(
+    request: requests.PreparedRequest,
+    status_code: int = 200,
+    content: Union[str, bytes, None] = b"",
+    headers: Optional[dict] = None,
+) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = (
+        content.encode("utf-8") if isinstance(content, str) else (content or b"")
+    )
+    response.headers = CaseInsensitiveDict(headers or {})
+    response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+    response.url = request.url
+    response.request = request
+    response.reason = "OK" if response.ok else "Error"
+    return response
+
+
+_default_client: Optional[HttpClient] = None
+_default_client_lock = threading.Lock()
+
+
+def get_client() -> HttpClient:
+    """
+    Return the process-wide HttpClient, creating it on first use.
+    """
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = HttpClient()
+        return _default_client
+
+
+def set_client(client: Optional[HttpClient]) -> Optional[HttpClient]:
+    """
+    Replace the process-wide HttpClient, returning the previous one.
+    """
+    global _default_client
+    with _default_client_lock:
+        previous = _default_client
+        _default_client = client
+        return previous
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    """
+    Send a GET request through the process-wide HttpClient.
+    """
+    return get_client().get(url, **kwargs)
+
+
+def get_feed(
+    url: str,
+    parse: Callable[..., Any],
+    cache: Optional[FeedCache] = None,
+) -> Any:
+    """
+    Download and parse a feed, skipping both when it hasn't changed.
+
+    If a FeedCache is available (passed in, or installed process-wide), the
+    request is sent with the feed's stored ETag / Last-Modified validators and
+    a `304 Not Modified` answer returns the previously parsed feed as-is.
+
+    Arguments:
+        url: The feed URL.
+        parse: Turns the response body into a parsed feed, e.g.
+            `feedparser.parse`. It is also given the response's headers (as
+            `response_headers`, with lower-case names), including the final
+            URL as `content-location`, so relative links and the declared
+            encoding are resolved as if it had fetched the feed itself.
+        cache: The FeedCache to use. Default: the process-wide cache, if any.
+
+    """
+    cache = cache if cache is not None else get_feed_cache()
+    headers = cache.conditional_headers(url) if cache is not None else {}
+    response = get(url, headers=headers)
+    if response.status_code == 304 and cache is not None:
+        cached = cache.load(url)
+        if cached is not None:
+            metrics.increment("http.not_modified")
+            return cached
+        response = get(url)
+
+    response.raise_for_status()
+    feed = parse(
+        response.content,
+        response_headers={
+            "content-location": response.url,
+            **{name.lower(): value for name, value in response.headers.items()},
+        },
+    )
+    if cache is not None:
+        cache.store(
+            url,
+            feed,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+        )
+    return feed
@@ -0,0 +1,87 @@
+"""
+Recognize an edition that is identical to the last one rendered.
+
+An edition's fingerprint digests the ordered stories and the settings it is
+rendered with. After a run, the CLI stores the fingerprint next to each
+output (`paper.pdf` gets `paper.pdf.fingerprint`). If the next run fetches an
+edition with the same fingerprint, nothing can have changed, so it skips
+rendering and delivery.
+
+"""
+
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+from .cache import content_hash, write_atomic
+from .edition import Edition
+from .story import Story
+
+FINGERPRINT_SUFFIX = ".fingerprint"
+
+
+def story_fingerprint(story: Story) -> str:
+    """
+    A digest of everything about a story that shows up in a rendered paper.
+    """
+    return content_hash(
+        story.headline,
+        story.byline,
+        story.date.isoformat() if story.date else None,
+        str(story.priority),
+        str(story.placement_preference),
+        str(story.include_in_toc),
+        story.section_title,
+        str(story.short_form),
+        str(story.stale),
+        story.url,
+        story.content_hash(),
+    )
+
+
+def edition_fingerprint(
+    edition: Edition, settings: Optional[Dict[str, Any]] = None
+) -> str:
+    """
+    A digest of the edition's stories, in order, the sources it notes as left
+    out, and the resolved settings (e.g. `PaperSettings.to_dict()`) it will be
+    rendered with.
+    """
+    return content_hash(
+        *(story_fingerprint(story) for story in edition.stories),
+        json.dumps(edition.left_out_sources),
+        json.dumps(settings or {}, sort_keys=True, default=str),
+    )
+
+
+def fingerprint_path(output: str) -> Path:
+    path = Path(output)
+    return path.with_name(path.name + FINGERPRINT_SUFFIX)
+
+
+def stored_fingerprint(output: str) -> Optional[str]:
+    try:
+        return fingerprint_path(output).read_text(encoding="utf-8").strip() or None
+    except OSError:
+        return None
+
+
+def is_unchanged(
+    outputs: Iterable[str], fingerprint: str, require_outputs: bool = True
+) -> bool:
+    """
+    Whether every output was last rendered from an edition with this
+    fingerprint. With `require_outputs`, the output files must also still
+    exist.
+    """
+    outputs = list(outputs)
+    return bool(outputs) and all(
+        stored_fingerprint(output) == fingerprint
+        and (not require_outputs or Path(output).exists())
+        for output in outputs
+    )
+
+
+def store_fingerprint(outputs: Iterable[str], fingerprint: str) -> None:
+    for output in outputs:
+        write_atomic(fingerprint_path(output), f"{fingerprint}\n".encode("utf-8"))
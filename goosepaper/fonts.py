@@ -0,0 +1,209 @@
+"""
+A local copy of the web fonts that styles load from remote stylesheets.
+
+`goosepaper fonts sync` downloads every remote stylesheet a style lists in its
+`stylesheets.txt`, plus the font files those stylesheets reference, into
+`~/.cache/goosepaper/fonts`. The font URLs are rewritten to point at the local
+files, so WeasyPrint can render without touching the network.
+`Style.get_stylesheets` returns the local copies whenever they exist. Fonts
+synced elsewhere with `--fonts-dir` are used by renders given the same
+directory (`paper.fonts_dir`, or `goosepaper --fonts-dir`). Like a render,
+the commands read the paper config (`./goosepaper.json`, or `--config`), so
+styles in its `style_dirs` are synced too, into its `fonts_dir`.
+
+"""
+
+import argparse
+import hashlib
+import os
+import re
+import urllib.parse
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+from .cache import default_cache_dir, write_atomic
+
+_CSS_URL_RE = re.compile(r"""url\(\s*(['"]?)([^'")]+)\1\s*\)""")
+
+
+def default_fonts_dir() -> Path:
+    override = os.environ.get("GOOSEPAPER_FONTS_DIR")
+    if override:
+        return Path(override).expanduser()
+    return default_cache_dir() / "fonts"
+
+
+def _digest(url: str) -> str:
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()[:32]
+
+
+def _is_remote(url: str) -> bool:
+    return urllib.parse.urlsplit(url).scheme in {"http", "https"}
+
+
+def local_stylesheet_path(url: str, directory: Optional[Path] = None) -> Path:
+    return Path(directory or default_fonts_dir()) / f"{_digest(url)}.css"
+
+
+def local_stylesheet(url: str, directory: Optional[Path] = None) -> Optional[str]:
+    """
+    The `file://` URL of the synced copy of a remote stylesheet, or None if it
+    hasn't been synced.
+    """
+    if not _is_remote(url):
+        return None
+    path = local_stylesheet_path(url, directory)
+    return path.resolve().as_uri() if path.is_file() else None
+
+
+def sync_stylesheet(url: str, directory: Optional[Path] = None) -> Path:
+    """
+    Download a remote stylesheet and every font file it references.
+
+    The stylesheet is written last, so a failed sync never leaves behind a
+    local copy pointing at missing fonts.
+    """
+    from . import fetch
+
+    directory = Path(directory or default_fonts_dir())
+    response = fetch.get(url)
+    response.raise_for_status()
+    css = response.text
+
+    def vendor(match):
+        quote, reference = match.group(1), match.group(2).strip()
+        if reference.startswith("data:"):
+            return match.group(0)
+        absolute = urllib.parse.urljoin(url, reference)
+        suffix = Path(urllib.parse.urlsplit(absolute).path).suffix or ".font"
+        name = f"{_digest(absolute)}{suffix}"
+        target = directory / "files" / name
+        if not target.is_file():
+            font = fetch.get(absolute)
+            font.raise_for_status()
+            write_atomic(target, font.content)
+        return f"url({quote}files/{name}{quote})"
+
+    local_css = _CSS_URL_RE.sub(vendor, css)
+    path = local_stylesheet_path(url, directory)
+    write_atomic(path, local_css.encode("utf-8"))
+    return path
+
+
+def remote_stylesheets(
+    style_names: Optional[Iterable[str]] = None, style_dirs: Iterable[str] = ()
+) -> List[str]:
+    """
+    The remote stylesheet URLs of these styles (default: every style), found
+    in `style_dirs` before the built-in styles.
+    """
+    from .styles import Style, available_styles
+
+    style_dirs = tuple(style_dirs)
+    urls: List[str] = []
+    for name in style_names or available_styles(style_dirs):
+        for url in Style(name, style_dirs).get_stylesheets(prefer_local=False):
+            if _is_remote(url) and url not in urls:
+                urls.append(url)
+    return urls
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(
+        prog="goosepaper fonts",
+        description="Keep a local copy of the web fonts used by Goosepaper styles.",
+    )
+    parser.add_argument(
+        "-c",
+        "--config",
+        required=False,
+        help=(
+            "The paper config file whose style_dirs and fonts_dir to use. "
+            "Defaults to ./goosepaper.json, if there is one."
+        ),
+    )
+    parser.add_argument(
+        "--fonts-dir",
+        required=False,
+        help=(
+            "Where to keep the fonts. Defaults to the paper config's fonts_dir, "
+            "$GOOSEPAPER_FONTS_DIR, or ~/.cache/goosepaper/fonts. Renders need "
+            "the same directory as paper.fonts_dir or 'goosepaper --fonts-dir'."
+        ),
+    )
+    parser.add_argument(
+        "--style-dir",
+        action="append",
+        default=[],
+        dest="style_dirs",
+        help=(
+            "An extra directory to look for styles in, before the paper "
+            "config's style_dirs and the built-in styles. Repeat for several."
+        ),
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    sync_parser = commands.add_parser(
+        "sync", help="Download the stylesheets and fonts of every style."
+    )
+    sync_parser.add_argument(
+        "styles",
+        nargs="*",
+        help="Only sync these styles. Defaults to every style.",
+    )
+    commands.add_parser("status", help="Show which stylesheets are synced.")
+    parsed = parser.parse_args(args)
+
+    from .config import ConfigError
+
+    try:
+        paper = _paper_settings(parsed.config)
+    except ConfigError as err:
+        print(f"Honk! {err}")
+        return 1
+    style_dirs = [str(Path(path).expanduser()) for path in parsed.style_dirs]
+    style_dirs += list(paper.style_dirs)
+    if parsed.fonts_dir:
+        directory = Path(parsed.fonts_dir).expanduser()
+    elif paper.fonts_dir:
+        directory = Path(paper.fonts_dir)
+    else:
+        directory = default_fonts_dir()
+
+    if parsed.command == "status":
+        for url in remote_stylesheets(style_dirs=style_dirs):
+            state = "synced" if local_stylesheet(url, directory) else "missing"
+            print(f"{state:>8}  {url}")
+        return 0
+
+    failures = 0
+    for url in remote_stylesheets(parsed.styles or None, style_dirs):
+        try:
+            sync_stylesheet(url, directory)
+            print(f"Honk! Synced {url}")
+        except Exception as err:
+            failures += 1
+            print(f"Sad honk :/ Failed to sync {url}: {err}")
+    return 1 if failures else 0
+
+
+def _paper_settings(config_argument: Optional[str]):
+    from .config import (
+        ConfigError,
+        PaperSettings,
+        default_paper_config_path,
+        load_paper_config,
+    )
+
+    # The paper config may list extra style directories and the fonts_dir
+    # renders read the fonts from; without one, only the built-in styles and
+    # the default fonts directory are used.
+
+    if config_argument:
+        path = Path(config_argument).expanduser()
+        if not path.is_file():
+            raise ConfigError(f"Couldn't find paper config file ({config_argument}).")
+    else:
+        path = default_paper_config_path()
+        if not path.is_file():
+            return PaperSettings()
+    return load_paper_config(path.resolve()).paper
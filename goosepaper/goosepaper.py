@@ -1,22 +1,89 @@
+import concurrent.futures
 import datetime
 import io
-import pathlib
+import json
 import re
-import tempfile
+import zipfile
+from dataclasses import dataclass, field, replace
 from html import escape
-from typing import List, Optional, Type, Union
-from uuid import uuid4
+from typing import (
+    IO,
+    TYPE_CHECKING,
+    Any,
+    BinaryIO,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+)
 
 from goosepaper.story import Story
 
-from .styles import Style
+from . import metrics
+from .budget import PageBudget, fit_to_budget, trim_to_pages
+from .cache import content_hash, get_last_good_store
+from .deadline import Deadline, deadline_scope, run_in_context, run_in_daemon_threads
+from .dedupe import deduplicate as deduplicate_stories
+from .edition import Edition
+from .fingerprint import edition_fingerprint, story_fingerprint
+from .renderer import Renderer
+from .styles import Style, get_style
 from .storyprovider.storyprovider import StoryProvider
 from .util import PlacementPreference
 
+if TYPE_CHECKING:
+    from .config import RenderLimits
 
-def _get_style(style):
+DEFAULT_FETCH_WORKERS = 8
+
+
+@dataclass(frozen=True)
+class DocumentPlan:
+    """
+    The regions of one HTML document, with the stories assigned to each and
+    their anchors, before any story is rendered. `goosepaper.chunked` lays
+    out parts of a plan as separate documents.
+
+    Attributes:
+        head_html: The contents of the document's `<head>`.
+        body_classes: The classes of the `<body>`.
+        header_html: The masthead and ears, or "" to leave them out.
+        utility_items: The utility strip's section headings and stories.
+        toc_entries: The (title, anchor) pairs of the table of contents, or
+            () to leave it out.
+        stories_classes: The classes of the `.stories` container.
+        main_items: The main column's section headings and stories.
+        sidebar_items: The sidebar's section headings and stories.
+        story_anchor_ids: Each story's anchor, by `id(story)`.
+        effective_columns: How many columns the main stories are set in.
+        page_numbers: Page numbers to print in the table of contents, by
+            anchor. Default: let WeasyPrint count them with target-counter()
+
+    """
+
+    head_html: str
+    body_classes: Tuple[str, ...]
+    header_html: str
+    utility_items: Tuple[Union[str, Story], ...]
+    toc_entries: Tuple[Tuple[str, str], ...]
+    stories_classes: Tuple[str, ...]
+    main_items: Tuple[Union[str, Story], ...]
+    sidebar_items: Tuple[Union[str, Story], ...]
+    story_anchor_ids: Dict[int, str] = field(default_factory=dict)
+    effective_columns: int = 1
+    page_numbers: Optional[Dict[str, int]] = None
+
+
+def _get_style(style, style_dirs: Iterable[str] = ()):
+    if isinstance(style, Style):
+        return style
     if isinstance(style, str):
-        style_obj = Style(style)
+        style_obj = get_style(style, style_dirs)
     else:
         try:
             style_obj = style()
@@ -25,6 +92,107 @@ def _get_style(style):
     return style_obj
 
 
+def _left_out_note(edition: Edition) -> str:
+    """
+    A note naming the sources cut by the deadline that no earlier stories
+    stand in for, or "" if there are none.
+    """
+    if not edition.left_out_sources:
+        return ""
+    return (
+        '<p class="edition-note">Left out: '
+        + escape(", ".join(edition.left_out_sources))
+        + " (still loading at the deadline)</p>"
+    )
+
+
+def _fetch_stories_safely(prov: StoryProvider) -> Optional[List[Story]]:
+    with metrics.span("fetch.source", source=_provider_label(prov)) as span:
+        try:
+            stories = list(prov.get_stories())
+        except Exception as err:
+            print(
+                f"Sad honk :/ Failed to fetch stories from {prov.__class__.__name__}: {err}"
+            )
+            span.set(status="failed")
+            return None
+        span.set(status="ok", stories=len(stories))
+        return stories
+
+
+def _is_writable(target) -> bool:
+    return callable(getattr(target, "write", None))
+
+
+def _chapter_file_name(stories: List[Story], used: set) -> str:
+    """
+    An EPUB chapter file name derived from the chapter's stories, so the same
+    stories always give the same names.
+    """
+    base = content_hash(*(story_fingerprint(story) for story in stories))[:16]
+    name, suffix = f"{base}.xhtml", 1
+    while name in used:
+        suffix += 1
+        name = f"{base}-{suffix}.xhtml"
+    used.add(name)
+    return name
+
+
+def _utc(moment: datetime.datetime) -> datetime.datetime:
+    if moment.tzinfo is None:
+        return moment
+    return moment.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+
+
+def _w3c_datetime(moment: datetime.datetime) -> str:
+    if moment.tzinfo is None:
+        return moment.strftime("%Y-%m-%dT%H:%M:%S")
+    return _utc(moment).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _normalize_zip(payload: bytes, moment: datetime.datetime) -> bytes:
+    """
+    Rewrite a zip archive with every entry stamped with `moment` and given the
+    same permissions, so its bytes depend only on its contents.
+    """
+    date_time = max(_utc(moment), datetime.datetime(1980, 1, 1)).timetuple()[:6]
+    packed = io.BytesIO()
+    with zipfile.ZipFile(io.BytesIO(payload)) as source, zipfile.ZipFile(
+        packed, "w"
+    ) as target:
+        for entry in source.infolist():
+            normalized = zipfile.ZipInfo(entry.filename, date_time=date_time)
+            normalized.compress_type = entry.compress_type
+            normalized.external_attr = 0o644 << 16
+            target.writestr(normalized, source.read(entry))
+    return packed.getvalue()
+
+
+def _provider_label(prov) -> str:
+    for attr in ("feed_url", "subreddit", "username"):
+        value = getattr(prov, attr, None)
+        if value:
+            return f"{prov.__class__.__name__} ({value})"
+    return prov.__class__.__name__
+
+
+def _source_key(prov) -> str:
+    key = getattr(prov, "source_key", None)
+    if key:
+        return key
+    options = {
+        name: value
+        for name, value in sorted(vars(prov).items())
+        if not name.startswith("_")
+        and isinstance(value, (str, int, float, bool, type(None), list, tuple))
+    }
+    return json.dumps(
+        {"provider": prov.__class__.__qualname__, **options},
+        sort_keys=True,
+        default=str,
+    )
+
+
 class Goosepaper:
     """
     A high-level class that manages the creation and styling of a goosepaper
@@ -37,6 +205,12 @@ class Goosepaper:
         story_providers: List[StoryProvider],
         title: str = None,
         subtitle: str = None,
+        max_workers: Optional[int] = None,
+        deadline: Optional[float] = None,
+        renderer: Optional[Renderer] = None,
+        edition_time: Optional[datetime.datetime] = None,
+        style_dirs: Iterable[str] = (),
+        fonts_dir: Optional[str] = None,
     ):
         """
         Create a new Goosepaper.
@@ -45,48 +219,220 @@ class Goosepaper:
             story_providers: A list of StoryProvider objects to render
             title: The title of the goosepaper
             subtitle: The subtitle of the goosepaper
+            max_workers: How many providers to fetch at once. Default: 8
+            deadline: Seconds the whole fetch may take. Providers still
+                running when it passes are cut from the paper, and article
+                downloads fall back to feed summaries. Default: no limit
+            renderer: The Renderer that lays out PDFs. Share one between
+                papers to reuse its fonts and parsed stylesheets. Default: a
+                new Renderer, kept for the life of this paper
+            edition_time: Pin the edition's date and time, shown in the
+                subtitle and used for every timestamp in the rendered files.
+                Editions fetched by this paper are then reproducible: the
+                same stories always render to byte-identical files.
+                Default: now, and not reproducible
+            style_dirs: Extra directories to look for styles in, before the
+                built-in ones. Default: none
+            fonts_dir: Where `goosepaper fonts sync` put the styles' web
+                fonts, for the Renderer this paper creates. Default:
+                `fonts.default_fonts_dir()`
 
         """
         self.story_providers = story_providers
+        self.max_workers = max_workers or DEFAULT_FETCH_WORKERS
+        self.deadline = deadline
+        self.renderer = renderer
+        self.edition_time = edition_time
+        self.style_dirs = tuple(style_dirs)
+        self.fonts_dir = fonts_dir
+        self.cut_sources: List[str] = []
+        self.stale_sources: List[str] = []
+        self.duplicates = []
+        self.over_budget: List[Story] = []
+        self.story_sources: List[int] = []
         self.title = title if title else "Daily Goosepaper"
         self.subtitle = subtitle + "\n" if subtitle else ""
-        self.subtitle += datetime.datetime.today().strftime("%B %d, %Y %H:%M")
+        self.subtitle += (edition_time or datetime.datetime.today()).strftime(
+            "%B %d, %Y %H:%M"
+        )
 
-    def get_stories(self, deduplicate: bool = False) -> List[Story]:
+    def get_stories(
+        self, deduplicate: bool = False, budget: Optional[PageBudget] = None
+    ) -> List[Story]:
         """
         Retrieve the complete list of stories to render in this Goosepaper.
 
         Arguments:
-            deduplicate: Whether to remove duplicate stories. Default: False
+            deduplicate: Whether to remove duplicate stories: ones sharing a
+                headline or link, or with nearly identical text. The first
+                story of each group is kept, and the groups are recorded in
+                `self.duplicates`. Default: False
+            budget: A PageBudget whose `max_words` to fit the stories in.
+                Stories are picked by priority, taking turns between sources,
+                and the ones left out are recorded in `self.over_budget`.
+                Default: no limit
+
+        The source each story came from is recorded in `self.story_sources`.
 
         Returns:
             List[Story]
 
         """
         stories: List[Story] = []
-        for prov in self.story_providers:
-            try:
-                new_stories = prov.get_stories()
-            except Exception as err:
+        sources: Dict[int, int] = {}
+        for index, new_stories in enumerate(self._fetch_provider_stories()):
+            stories.extend(new_stories)
+            sources.update((id(story), index) for story in new_stories)
+        self.duplicates = []
+        if deduplicate:
+            result = deduplicate_stories(stories)
+            self.duplicates = list(result.clusters)
+            stories = list(result.stories)
+        self.over_budget = []
+        if budget is not None:
+            fitted = fit_to_budget(
+                stories, [sources[id(story)] for story in stories], budget
+            )
+            self.over_budget = list(fitted.dropped)
+            stories = list(fitted.stories)
+            if self.over_budget:
                 print(
-                    f"Sad honk :/ Failed to fetch stories from {prov.__class__.__name__}: {err}"
+                    f"Honk! Left out {len(self.over_budget)} stories to keep the "
+                    f"edition to {budget.max_words} words."
                 )
-                continue
-            for story in new_stories:
-                if deduplicate:
-                    for existing in stories:
-                        if (
-                            story.headline == existing.headline
-                            and story.date == existing.date
-                        ):
-                            break
-                    else:
-                        stories.append(story)
-                else:
-                    stories.append(story)
+        self.story_sources = [sources[id(story)] for story in stories]
         return stories
 
-    def _render_html_document(
+    def fetch_edition(
+        self, deduplicate: bool = False, budget: Optional[PageBudget] = None
+    ) -> Edition:
+        """
+        Fetch every story once and freeze the result as an Edition.
+
+        Pass the returned Edition to `to_html`, `to_pdf` or `to_epub` to render
+        several formats of the same paper without refetching any source.
+
+        Arguments:
+            deduplicate: Whether to remove duplicate stories. Default: False
+            budget: A PageBudget to fit the edition in. Its `max_words` is
+                applied now, and its `max_pages` to each PDF laid out from the
+                edition. Default: no limit
+
+        Returns:
+            Edition
+
+        """
+        stories = self.get_stories(deduplicate=deduplicate, budget=budget)
+        metrics.increment("stories", len(stories))
+        pinned = {}
+        if self.edition_time is not None:
+            pinned = {"fetched_at": self.edition_time, "reproducible": True}
+        return Edition(
+            title=self.title,
+            subtitle=self.subtitle,
+            stories=stories,
+            cut_sources=tuple(self.cut_sources),
+            stale_sources=tuple(self.stale_sources),
+            duplicates=tuple(self.duplicates),
+            over_budget=tuple(self.over_budget),
+            budget=budget,
+            story_sources=tuple(self.story_sources),
+            **pinned,
+        )
+
+    def _edition(self, edition: Optional[Edition]) -> Edition:
+        return edition if edition is not None else self.fetch_edition()
+
+    def _fetch_provider_stories(self) -> List[List[Story]]:
+        """
+        Fetch every provider concurrently, returning one list per provider.
+
+        Results are returned in the configured provider order. A provider that
+        raises, or is still running when the deadline passes, contributes its
+        last good stories (marked stale) when a LastGoodStore is installed and
+        has fresh enough ones, and an empty list otherwise, rather than
+        failing the whole paper. The labels of providers cut by the deadline
+        are kept in `self.cut_sources`, and of those filled in from earlier
+        editions in `self.stale_sources`. Providers run in daemon threads, so
+        one that never returns is abandoned rather than waited for at exit.
+
+        """
+        self.cut_sources = []
+        self.stale_sources = []
+        if not self.story_providers:
+            return []
+        deadline = Deadline(self.deadline) if self.deadline else None
+        with metrics.span("fetch", sources=len(self.story_providers)):
+            with deadline_scope(deadline):
+                futures = run_in_daemon_threads(
+                    run_in_context(_fetch_stories_safely),
+                    self.story_providers,
+                    max_workers=self.max_workers,
+                    thread_name_prefix="goosepaper-fetch",
+                )
+            concurrent.futures.wait(
+                futures, timeout=deadline.remaining() if deadline else None
+            )
+            for future in futures:
+                future.cancel()
+
+        store = get_last_good_store()
+        results: List[List[Story]] = []
+        for prov, future in zip(self.story_providers, futures):
+            stories = None
+            status = "failed"
+            if future.done() and not future.cancelled():
+                stories = future.result()
+            else:
+                status = "cut"
+                self.cut_sources.append(_provider_label(prov))
+            if stories is None:
+                stories = self._last_good_stories(store, prov)
+                if stories:
+                    status += ", stale"
+            else:
+                status = "ok"
+                if stories and store is not None:
+                    store.store(_source_key(prov), stories)
+            metrics.add_source(
+                source=_provider_label(prov), stories=len(stories), status=status
+            )
+            results.append(stories)
+        if self.cut_sources:
+            print(
+                f"Honk! The {self.deadline:g}s deadline passed before "
+                f"{len(self.cut_sources)} source(s) finished: "
+                + ", ".join(self.cut_sources)
+            )
+        if self.stale_sources:
+            print(
+                f"Honk! Using stories from an earlier edition for "
+                f"{len(self.stale_sources)} source(s): "
+                + ", ".join(self.stale_sources)
+            )
+        return results
+
+    def _last_good_stories(self, store, prov) -> List[Story]:
+        if store is None:
+            return []
+        found = store.load(_source_key(prov))
+        if not found:
+            return []
+        stories, _stored_at = found
+        for story in stories:
+            story.stale = True
+        if stories:
+            self.stale_sources.append(_provider_label(prov))
+        return stories
+
+    @metrics.timed("html")
+    def _render_html_document(self, **settings) -> str:
+        return "".join(self._iter_html_document(**settings))
+
+    def _iter_html_document(self, **settings) -> Iterator[str]:
+        yield from self._iter_planned_html(self._plan_html_document(**settings))
+
+    def _plan_html_document(
         self,
         *,
         style: Union[str, Type[Style]] = "",
@@ -96,9 +442,15 @@ class Goosepaper:
         layout: str = "auto",
         page_profile: str = "remarkable2",
         embed_styles: bool = True,
-    ) -> str:
-        style_obj = _get_style(style)
-        stories = self.get_stories()
+        edition: Optional[Edition] = None,
+    ) -> "DocumentPlan":
+        """
+        Sort the edition's stories into the regions of the page and assign
+        their anchors, without rendering any of them.
+        """
+        style_obj = _get_style(style, self.style_dirs)
+        edition = self._edition(edition)
+        stories = list(edition.stories)
         effective_columns = style_obj.resolve_column_count(layout, page_profile)
 
         ears = [
@@ -144,31 +496,28 @@ class Goosepaper:
             for index, story in enumerate(ordered_story_objects, start=1)
         }
         used_anchors = set(story_anchor_ids.values())
-        utility_stories, utility_toc_entries = self._render_story_region(
+        utility_items, utility_toc_entries = self._plan_story_region(
             utility_story_objects,
             story_anchor_ids,
             story_numbers,
             used_anchors=used_anchors,
         )
-        main_stories, main_toc_entries = self._render_story_region(
+        main_items, main_toc_entries = self._plan_story_region(
             main_story_objects,
             story_anchor_ids,
             story_numbers,
             used_anchors=used_anchors,
         )
-        sidebar_stories, sidebar_toc_entries = self._render_story_region(
+        sidebar_items, sidebar_toc_entries = self._plan_story_region(
             sidebar_story_objects,
             story_anchor_ids,
             story_numbers,
             used_anchors=used_anchors,
         )
-        toc_html = self._render_table_of_contents(
-            utility_toc_entries + main_toc_entries + sidebar_toc_entries,
-            enabled=table_of_contents,
-            effective_columns=effective_columns,
-        )
+        toc_entries = utility_toc_entries + main_toc_entries + sidebar_toc_entries
+        has_toc = table_of_contents and bool(toc_entries)
         subtitle_html = "<br />".join(
-            escape(line) for line in self.subtitle.splitlines() if line.strip()
+            escape(line) for line in edition.subtitle.splitlines() if line.strip()
         )
         header_classes = ["header"]
         if left_ear:
@@ -176,23 +525,8 @@ class Goosepaper:
         if right_ear:
             header_classes.append("has-right-ear")
         stories_classes = ["stories", f"stories--{effective_columns}col"]
-        if sidebar_stories:
+        if sidebar_items:
             stories_classes.append("has-sidebar")
-        sidebar_html = ""
-        if sidebar_stories:
-            sidebar_html = f"""
-                    <div class="sidebar">
-                        <h2 class="sidebar-title">Briefs & notes</h2>
-                        {''.join(sidebar_stories)}
-                    </div>
-            """
-        utility_html = ""
-        if utility_stories:
-            utility_html = f"""
-                    <div class="utility-strip">
-                        {''.join(utility_stories)}
-                    </div>
-            """
 
         stylesheet_links = ""
         style_block = ""
@@ -200,12 +534,12 @@ class Goosepaper:
             f"theme-{escape(style_obj.style_name)}",
             f"page-{escape(page_profile)}",
             f"columns-{effective_columns}",
-            "has-toc" if toc_html else "no-toc",
+            "has-toc" if has_toc else "no-toc",
         ]
         if embed_styles:
             stylesheet_links = "".join(
                 f'<link rel="stylesheet" href="{url}">'
-                for url in style_obj.get_stylesheets()
+                for url in style_obj.get_stylesheets(prefer_local=False)
             )
             style_block = (
                 "<style>"
@@ -218,33 +552,92 @@ class Goosepaper:
                 + "</style>"
             )
 
-        return f"""
-            <html>
-            <head>
+        metadata_tags = ""
+        if edition.reproducible:
+            timestamp = _w3c_datetime(edition.fetched_at)
+            metadata_tags = (
+                f'<meta name="dcterms.created" content="{timestamp}" />'
+                f'<meta name="dcterms.modified" content="{timestamp}" />'
+            )
+
+        return DocumentPlan(
+            head_html=f"""
                 <meta
                     http-equiv="Content-type"
                     content="text/html;
                     charset=utf-8" />
                 <meta charset="UTF-8" />
+                {metadata_tags}
                 {stylesheet_links}
                 {style_block}
-            </head>
-            <body class="{' '.join(body_classes)}">
+            """,
+            body_classes=tuple(body_classes),
+            header_html=f"""
                 <div class="{' '.join(header_classes)}">
                     <div class="left-ear ear">{left_ear}</div>
                     <div class="masthead">
-                        <h1>{escape(self.title)}</h1>
+                        <h1>{escape(edition.title)}</h1>
                         <p class="edition-line">{subtitle_html}</p>
+                        {_left_out_note(edition)}
                     </div>
                     <div class="right-ear ear">{right_ear}</div>
                 </div>
-                {utility_html}
+                """,
+            utility_items=tuple(utility_items),
+            toc_entries=tuple(toc_entries) if has_toc else (),
+            stories_classes=tuple(stories_classes),
+            main_items=tuple(main_items),
+            sidebar_items=tuple(sidebar_items),
+            story_anchor_ids=story_anchor_ids,
+            effective_columns=effective_columns,
+        )
+
+    def _iter_planned_html(self, plan: "DocumentPlan") -> Iterator[str]:
+        yield f"""
+            <html>
+            <head>
+                {plan.head_html}
+            </head>
+            <body class="{' '.join(plan.body_classes)}">
+                {plan.header_html}
+                """
+        if plan.utility_items:
+            yield """
+                    <div class="utility-strip">
+                        """
+            yield from self._iter_story_region(
+                plan.utility_items, plan.story_anchor_ids
+            )
+            yield """
+                    </div>
+            """
+        toc_html = self._render_table_of_contents(
+            list(plan.toc_entries),
+            enabled=bool(plan.toc_entries),
+            effective_columns=plan.effective_columns,
+            page_numbers=plan.page_numbers,
+        )
+        yield f"""
                 {toc_html}
-                <div class="{' '.join(stories_classes)}">
+                <div class="{' '.join(plan.stories_classes)}">
                     <div class="main-stories">
-                        {''.join(main_stories)}
+                        """
+        yield from self._iter_story_region(plan.main_items, plan.story_anchor_ids)
+        yield """
                     </div>
-                    {sidebar_html}
+                    """
+        if plan.sidebar_items:
+            yield """
+                    <div class="sidebar">
+                        <h2 class="sidebar-title">Briefs & notes</h2>
+                        """
+            yield from self._iter_story_region(
+                plan.sidebar_items, plan.story_anchor_ids
+            )
+            yield """
+                    </div>
+            """
+        yield """
                 </div>
             </body>
             </html>
@@ -258,10 +651,15 @@ class Goosepaper:
         table_of_contents: bool = False,
         layout: str = "auto",
         page_profile: str = "remarkable2",
+        edition: Optional[Edition] = None,
     ) -> str:
         """
         Produce an HTML version of the Goosepaper.
 
+        Arguments:
+            edition: A previously fetched Edition to render. If omitted, the
+                stories are fetched now.
+
         Returns:
             str: An HTML version of the paper
 
@@ -274,86 +672,300 @@ class Goosepaper:
             layout=layout,
             page_profile=page_profile,
             embed_styles=True,
+            edition=edition,
+        )
+
+    def iter_html(
+        self,
+        style: Union[str, Type[Style]] = "",
+        font_size: int = 14,
+        body_font: str | None = None,
+        table_of_contents: bool = False,
+        layout: str = "auto",
+        page_profile: str = "remarkable2",
+        edition: Optional[Edition] = None,
+    ) -> Iterator[str]:
+        """
+        Produce the HTML version of the Goosepaper in chunks: the header, the
+        utility strip, the table of contents, each story and the sidebar.
+
+        Joined, the chunks are identical to `to_html`, but only one story is
+        held in memory at a time. Takes the same arguments as `to_html`.
+
+        """
+        return self._iter_html_document(
+            style=style,
+            font_size=font_size,
+            body_font=body_font,
+            table_of_contents=table_of_contents,
+            layout=layout,
+            page_profile=page_profile,
+            embed_styles=True,
+            edition=edition,
         )
 
+    def write_html(
+        self,
+        target: Union[str, IO],
+        encoding: str = "utf-8",
+        **settings,
+    ) -> Optional[str]:
+        """
+        Stream the HTML version of the Goosepaper to a file as it's rendered.
+
+        Arguments:
+            target: The filename to save the HTML to, or a writable file-like
+                object. Text streams are given str chunks; anything else
+                (e.g. a socket file) is given bytes in `encoding`.
+            encoding: The encoding of the written HTML. Default: utf-8
+            settings: The arguments of `to_html`.
+
+        Returns:
+            str: The filename of the HTML file. If `target` is an IO object,
+                then this will return None.
+
+        """
+        with metrics.span("html"):
+            if isinstance(target, str):
+                with open(target, "w", encoding=encoding) as fh:
+                    for chunk in self.iter_html(**settings):
+                        fh.write(chunk)
+                return target
+            if not _is_writable(target):
+                raise ValueError(f"Invalid filename {target}")
+            text = isinstance(target, io.TextIOBase)
+            for chunk in self.iter_html(**settings):
+                target.write(chunk if text else chunk.encode(encoding))
+            return None
+
     def to_pdf(
         self,
-        filename: Union[str, io.BytesIO],
+        filename: Union[str, BinaryIO],
         style: Union[str] = "",
         font_size: int = 14,
         body_font: str | None = None,
         table_of_contents: bool = False,
         layout: str = "auto",
         page_profile: str = "remarkable2",
+        edition: Optional[Edition] = None,
+        limits: Optional["RenderLimits"] = None,
+        chunked: bool = False,
     ) -> Optional[str]:
         """
         Renders the current Goosepaper to a PDF file on disk.
 
         Arguments:
-            filename: The filename to save the PDF to. If this is an io.BytesIO
-                object, the PDF will be written to the object instead and this
-                function will return None.
+            filename: The filename to save the PDF to. If this is a writable
+                binary file-like object (a BytesIO, pipe, socket file or
+                upload stream), the PDF is streamed straight into it and this
+                function returns None. It doesn't need to be seekable.
             style: The style to use for the paper. Default: FifthAvenueStyle
             font_size: The font size to use for the paper. Default: 14
+            edition: A previously fetched Edition to render. If omitted, the
+                stories are fetched now.
+            limits: Memory, CPU and time limits to lay the PDF out under, in
+                a worker process. Stories that break them are dropped (see
+                `goosepaper.isolation`). The worker is spawned, so scripts
+                must call this under an `if __name__ == "__main__":` guard.
+                Default: lay out in this process
+            chunked: Lay out the masthead, each section and the sidebar as
+                separate documents and merge them, to cap memory use on long
+                papers (see `goosepaper.chunked`). Needs pypdf. Default: False
 
         Returns:
             str: The filename of the PDF file. If `filename` is an IO object,
                 then this will return None.
 
         """
-        from weasyprint import CSS, HTML
-        from weasyprint.text.fonts import FontConfiguration
+        if limits is not None and limits.enabled:
+            from .isolation import render_isolated
 
-        font_config = FontConfiguration()
-        style_obj = _get_style(style)
-        html = self._render_html_document(
-            style=style,
+            if not isinstance(filename, str) and not _is_writable(filename):
+                raise ValueError(f"Invalid filename {filename}")
+            render_isolated(
+                filename,
+                self._edition(edition),
+                limits,
+                style_dirs=self.style_dirs,
+                fonts_dir=self.fonts_dir,
+                style=style,
+                font_size=font_size,
+                body_font=body_font,
+                table_of_contents=table_of_contents,
+                layout=layout,
+                page_profile=page_profile,
+                chunked=chunked,
+            )
+            return filename if isinstance(filename, str) else None
+        if self.renderer is None:
+            self.renderer = Renderer(
+                fonts_dir=self.fonts_dir, style_dirs=self.style_dirs
+            )
+        style_obj = _get_style(style, self.style_dirs)
+        edition = self._edition(edition)
+        settings = dict(
+            style=style_obj,
             font_size=font_size,
             body_font=body_font,
-            table_of_contents=table_of_contents,
             layout=layout,
             page_profile=page_profile,
-            embed_styles=False,
         )
-        base_url = str(pathlib.Path.cwd())
-        h = HTML(string=html, base_url=base_url)
-        c = CSS(
-            string=style_obj.get_css(
-                font_size=font_size,
-                body_font=body_font,
-                layout=layout,
-                page_profile=page_profile,
+        page_limited = edition.budget is not None and edition.budget.max_pages
+        if chunked:
+            from .chunked import chunkable, render_chunked
+
+            if not isinstance(filename, str) and not _is_writable(filename):
+                raise ValueError(f"Invalid filename {filename}")
+            if chunkable():
+
+                def lay_out_chunked(edition: Edition, target) -> int:
+                    plan = self._plan_html_document(
+                        table_of_contents=table_of_contents,
+                        embed_styles=False,
+                        edition=edition,
+                        **settings,
+                    )
+                    with metrics.span("pdf.chunked") as span:
+                        pages = render_chunked(
+                            target,
+                            plan,
+                            lambda chunk: "".join(self._iter_planned_html(chunk)),
+                            lambda html: self.renderer.render(html, **settings),
+                        )
+                        span.set(pages=pages)
+                    return pages
+
+                if not page_limited:
+                    lay_out_chunked(edition, filename)
+                    return filename if isinstance(filename, str) else None
+
+                def lay_out_buffered(edition: Edition) -> Tuple[io.BytesIO, int]:
+                    buffer = io.BytesIO()
+                    return buffer, lay_out_chunked(edition, buffer)
+
+                buffer, _ = self._lay_out_within_budget(
+                    edition,
+                    lay_out_buffered,
+                    lambda result: result[1],
+                    settings,
+                    filename,
+                )
+                if isinstance(filename, str):
+                    with open(filename, "wb") as fh:
+                        fh.write(buffer.getvalue())
+                    return filename
+                filename.write(buffer.getvalue())
+                return None
+            print(
+                "Sad honk :/ Chunked rendering needs pypdf "
+                "(pip install goosepaper[chunked]); laying the paper out in one piece."
+            )
+
+        def lay_out(edition: Edition):
+            html = self._render_html_document(
+                table_of_contents=table_of_contents,
+                embed_styles=False,
+                edition=edition,
+                **settings,
+            )
+            with metrics.span("pdf.layout") as span:
+                document = self.renderer.render(html, **settings)
+                span.set(pages=len(document.pages))
+            return document
+
+        if page_limited:
+            document = self._lay_out_within_budget(
+                edition,
+                lay_out,
+                lambda document: len(document.pages),
+                settings,
+                filename,
+            )
+        else:
+            document = lay_out(edition)
+        with metrics.span("pdf.write"):
+            if isinstance(filename, str):
+                document.write_pdf(filename)
+                return filename
+            if _is_writable(filename):
+                document.write_pdf(filename)
+                return None
+        raise ValueError(f"Invalid filename {filename}")
+
+    def _lay_out_within_budget(
+        self,
+        edition: Edition,
+        lay_out: Callable[[Edition], Any],
+        page_count: Callable[[Any], int],
+        settings: dict,
+        target: Union[str, BinaryIO],
+    ) -> Any:
+        """
+        Lay `edition` out, and if it comes to more than its budget's
+        `max_pages`, leave out the stories picked last (see
+        `budget.trim_to_pages`) and lay it out once more.
+
+        Arguments:
+            edition: The edition to lay out, with a page budget.
+            lay_out: Lays an edition out and returns the result.
+            page_count: How many pages a result of `lay_out` has.
+            settings: The style, font_size, layout and page_profile it is
+                laid out with.
+            target: Where the PDF goes, to name in messages.
+
+        Returns:
+            The result of the last call to `lay_out`.
+
+        """
+        result = lay_out(edition)
+        pages = page_count(result)
+        if pages <= edition.budget.max_pages:
+            return result
+        style_obj = settings["style"]
+        budget = replace(
+            edition.budget,
+            page_profile=settings["page_profile"],
+            font_size=settings["font_size"],
+            columns=style_obj.resolve_column_count(
+                settings["layout"], settings["page_profile"]
             ),
-            font_config=font_config,
-            base_url=base_url,
+            style=style_obj.style_name,
         )
-        if isinstance(filename, str):
-            h.write_pdf(
-                filename,
-                stylesheets=[c, *style_obj.get_stylesheets()],
-                font_config=font_config,
+        trimmed = trim_to_pages(edition.stories, edition.story_sources, budget, pages)
+        name = target if isinstance(target, str) else "the PDF"
+        if not trimmed.dropped:
+            print(
+                f"Sad honk :/ {name} came to {pages} pages, over the budget of "
+                f"{budget.max_pages}, but no story can be left out."
             )
-            return filename
-        if isinstance(filename, io.BytesIO):
-            tf = tempfile.NamedTemporaryFile(suffix=".pdf")
-            h.write_pdf(
-                tf,
-                stylesheets=[c, *style_obj.get_stylesheets()],
+            return result
+        print(
+            f"Honk! {name} came to {pages} pages; left out "
+            f"{len(trimmed.dropped)} stories to keep it to {budget.max_pages}."
+        )
+        result = lay_out(edition.with_stories(trimmed.stories))
+        pages = page_count(result)
+        if pages > budget.max_pages:
+            print(
+                f"Sad honk :/ {name} still came to {pages} pages, over the "
+                f"budget of {budget.max_pages}."
             )
-            tf.seek(0)
-            filename.write(tf.read())
-            return None
-        raise ValueError(f"Invalid filename {filename}")
+        return result
 
-    def _render_story_region(
+    def _plan_story_region(
         self,
         stories: List[Story],
         story_anchor_ids: dict[int, str],
         story_numbers: dict[int, int],
         *,
         used_anchors: set[str],
-    ) -> tuple[list[str], list[tuple[str, str]]]:
-        rendered: list[str] = []
+    ) -> tuple[list[Union[str, Story]], list[tuple[str, str]]]:
+        """
+        Assign the section anchors and table of contents entries of a region
+        without rendering its stories. Returns the region's items (section
+        headings as HTML, stories as Story objects) and its ToC entries.
+        """
+        items: list[Union[str, Story]] = []
         toc_entries: list[tuple[str, str]] = []
 
         for section_title, run_stories in self._story_runs(stories):
@@ -362,7 +974,7 @@ class Goosepaper:
                     f"section-{self._slugify(section_title)}",
                     used_anchors,
                 )
-                rendered.append(
+                items.append(
                     f"""
                     <div id="{escape(section_anchor)}" class="story-section-heading">
                         <h2 class="story-section-title">{escape(section_title)}</h2>
@@ -373,15 +985,23 @@ class Goosepaper:
                     toc_entries.append((section_title, section_anchor))
 
             for story in run_stories:
-                rendered.append(
-                    story.to_html(anchor_id=story_anchor_ids[id(story)])
-                )
+                items.append(story)
                 if section_title or not story.include_in_toc:
                     continue
                 headline = story.headline or f"Untitled story {story_numbers[id(story)]}"
                 toc_entries.append((headline, story_anchor_ids[id(story)]))
 
-        return rendered, toc_entries
+        return items, toc_entries
+
+    @staticmethod
+    def _iter_story_region(
+        items: Iterable[Union[str, Story]], story_anchor_ids: dict[int, str]
+    ) -> Iterator[str]:
+        for item in items:
+            if isinstance(item, str):
+                yield item
+            else:
+                yield item.to_html(anchor_id=story_anchor_ids[id(item)])
 
     def _story_runs(
         self, stories: List[Story]
@@ -423,15 +1043,19 @@ class Goosepaper:
         *,
         enabled: bool,
         effective_columns: int,
+        page_numbers: Optional[Dict[str, int]] = None,
     ) -> str:
         if not enabled or not toc_entries:
             return ""
 
         items = []
         for headline, anchor_id in toc_entries:
+            page = ""
+            if page_numbers is not None and anchor_id in page_numbers:
+                page = f' data-page="{page_numbers[anchor_id]}"'
             items.append(
                 '<div class="table-of-contents__entry">'
-                f'<a class="table-of-contents__link" href="#{escape(anchor_id)}">'
+                f'<a class="table-of-contents__link" href="#{escape(anchor_id)}"{page}>'
                 f'<span class="table-of-contents__title">{escape(headline)}</span>'
                 "</a>"
                 "</div>"
@@ -461,41 +1085,47 @@ class Goosepaper:
         used.add(anchor)
         return anchor
 
+    @metrics.timed("epub")
     def to_epub(
         self,
-        filename: Union[str, io.BytesIO],
+        filename: Union[str, BinaryIO],
         style: Union[str, Type[Style]] = "",
         font_size: int = 14,
         body_font: str | None = None,
+        edition: Optional[Edition] = None,
     ) -> Optional[str]:
         """
         Render the current Goosepaper to an epub file on disk.
 
         Arguments:
-            filename: The filename to save the epub to. If `filename` is an
-                IO object, then this will return None and the epub will be
-                written to that object.
+            filename: The filename to save the epub to. If `filename` is a
+                writable binary file-like object, then this will return None
+                and the epub will be streamed straight into it. It doesn't
+                need to be seekable.
             style: The style to use for the paper. Default: FifthAvenueStyle
             font_size: The font size to use for the paper. Default: 14
+            edition: A previously fetched Edition to render. If omitted, the
+                stories are fetched now.
 
         """
         from ebooklib import epub
 
-        style_obj = _get_style(style)
+        style_obj = _get_style(style, self.style_dirs)
+        edition = self._edition(edition)
 
+        # The table of contents lists each headline once, whatever its date
+        # or link.
         stories = []
-        for story in self.get_stories():
-            if not story.headline:
-                stories.append(story)
-                continue
-            for existing in stories:
-                if story.headline == existing.headline:
-                    break
-            else:
-                stories.append(story)
+        headlines = set()
+        for story in edition.stories:
+            if story.headline:
+                if story.headline in headlines:
+                    continue
+                headlines.add(story.headline)
+            stories.append(story)
 
         book = epub.EpubBook()
-        title = f"{self.title} - {self.subtitle}"
+        title = f"{edition.title} - {edition.subtitle}"
         book.set_title(title)
         book.set_language("en")
 
@@ -508,30 +1138,34 @@ class Goosepaper:
         book.add_item(css)
 
         chapters = []
+        used_names: set[str] = set()
+        note = _left_out_note(edition)
         no_headlines = []
         for story in stories:
             if not story.headline:
                 no_headlines.append(story)
         stories = [story for story in stories if story.headline]
         for story in stories:
-            file_name = f"{uuid4().hex}.xhtml"
+            file_name = _chapter_file_name([story], used_names)
             chapter = epub.EpubHtml(
                 title=story.headline,
                 file_name=file_name,
                 lang="en",
             )
-            chapter.content = story.to_html()
+            chapter.content = ("" if chapters else note) + story.to_html()
             book.add_item(chapter)
             chapters.append(chapter)
 
         if no_headlines:
-            file_name = f"{uuid4().hex}.xhtml"
+            file_name = _chapter_file_name(no_headlines, used_names)
             chapter = epub.EpubHtml(
                 title="From Reddit",
                 file_name=file_name,
                 lang="en",
             )
-            chapter.content = "<br>".join([story.to_html() for story in no_headlines])
+            chapter.content = ("" if chapters else note) + "<br>".join(
+                [story.to_html() for story in no_headlines]
+            )
             book.add_item(chapter)
             chapters.append(chapter)
 
@@ -540,13 +1174,28 @@ class Goosepaper:
         book.add_item(epub.EpubNav())
         book.spine = ["nav"] + chapters
 
+        if edition.reproducible:
+            book.set_identifier(f"urn:goosepaper:{edition_fingerprint(edition)}")
+            packed = io.BytesIO()
+            epub.write_epub(
+                packed,
+                book,
+                {"mtime": _utc(edition.fetched_at), "raise_exceptions": True},
+            )
+            payload = _normalize_zip(packed.getvalue(), edition.fetched_at)
+            if isinstance(filename, str):
+                with open(filename, "wb") as fh:
+                    fh.write(payload)
+                return filename
+            if _is_writable(filename):
+                filename.write(payload)
+                return None
+            raise ValueError(f"Invalid filename {filename}")
+
         if isinstance(filename, str):
             epub.write_epub(filename, book)
             return filename
-        if isinstance(filename, io.BytesIO):
-            tf = tempfile.NamedTemporaryFile(suffix=".epub")
-            epub.write_epub(tf, book)
-            tf.seek(0)
-            filename.write(tf.read())
+        if _is_writable(filename):
+            epub.write_epub(filename, book, {"raise_exceptions": True})
             return None
         raise ValueError(f"Invalid filename {filename}")
@@ -0,0 +1,270 @@
+"""
+Prepare the images in an edition for an e-ink PDF.
+
+Left alone, WeasyPrint downloads every `<img>` one at a time during layout and
+embeds it at full resolution and in colour. `ImagePipeline.prepare` instead
+downloads an edition's images concurrently before layout, shrinks each to the
+printable width of the page profile, converts it to grayscale (optionally
+dithered to black and white), keeps the result in a cache keyed by a hash of
+the URL, and points the stories' `src` attributes at the local files.
+
+Image processing needs Pillow 9.1 or later, which goosepaper depends on.
+Without it, editions are left unchanged.
+
+"""
+
+import copy
+import dataclasses
+import hashlib
+import io
+import re
+import tempfile
+import threading
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from html import escape, unescape
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+from . import metrics
+from .cache import write_atomic
+from .deadline import run_in_context
+from .styles import PageProfile, get_page_profile
+
+IMAGE_MODES = ("original", "grayscale", "dither")
+DEFAULT_DPI = 226
+DEFAULT_MAX_AGE_SECONDS = 7 * 24 * 3600
+
+_IMG_SRC_RE = re.compile(
+    r"""(<img\b[^>]*?(?<![-\w])src\s*=\s*)(["'])(.*?)\2""",
+    re.IGNORECASE | re.DOTALL,
+)
+_SRCSET_RE = re.compile(r"""\s+srcset\s*=\s*(["']).*?\1""", re.IGNORECASE | re.DOTALL)
+
+
+def printable_width_px(profile: PageProfile, dpi: int = DEFAULT_DPI) -> int:
+    """
+    The width between the page profile's left and right margins, in pixels
+    at `dpi`.
+    """
+    return max(1, round(profile.content_width_inches * dpi))
+
+
+class ImagePipeline:
+    """
+    Downloads, shrinks and converts the images of an edition.
+
+    Arguments:
+        directory: Where processed images are kept. Default: a temporary
+            directory that lasts as long as this pipeline
+        mode: "grayscale", "dither" (black and white, Floyd-Steinberg
+            dithered) or "original" (leave images alone). Default: grayscale
+        dpi: The pixel density images are shrunk for. Default: 226, the
+            reMarkable's screen
+        max_workers: How many images to download at once. Default: 8
+        max_age_seconds: How long `prune` keeps unused images. Default: a week
+
+    """
+
+    def __init__(
+        self,
+        directory: Optional[Path] = None,
+        mode: str = "grayscale",
+        dpi: int = DEFAULT_DPI,
+        max_workers: int = 8,
+        max_age_seconds: float = DEFAULT_MAX_AGE_SECONDS,
+    ):
+        if mode not in IMAGE_MODES:
+            raise ValueError(
+                "Image mode must be one of: "
+                + ", ".join(f'"{name}"' for name in IMAGE_MODES)
+                + "."
+            )
+        self._tmpdir = None
+        if directory is None:
+            self._tmpdir = tempfile.TemporaryDirectory(prefix="goosepaper-images-")
+            directory = self._tmpdir.name
+        self.directory = Path(directory)
+        self.mode = mode
+        self.dpi = dpi
+        self.max_workers = max_workers
+        self.max_age_seconds = max_age_seconds
+        self._lock = threading.Lock()
+        self._warned = False
+
+    def prepare(self, edition, page_profile: str = "remarkable2"):
+        """
+        A copy of `edition` whose stories point at processed local copies of
+        their images. The edition itself is not modified. Images that can't
+        be downloaded or decoded keep their original `src`.
+        """
+        if self.mode == "original" or not _pillow_available():
+            if self.mode != "original":
+                self._warn("Pillow is not installed")
+            return edition
+
+        width = printable_width_px(get_page_profile(page_profile), self.dpi)
+        with metrics.span("images", page_profile=page_profile) as span:
+            sources = {
+                id(story): _image_sources(story) for story in edition.stories
+            }
+            urls = sorted(
+                {url for found in sources.values() for url in found.values()}
+            )
+            local = self._fetch_all(urls, width)
+            span.set(images=len(urls), prepared=len(local))
+            if not local:
+                return edition
+
+            stories = []
+            for story in edition.stories:
+                found = sources[id(story)]
+                if not any(url in local for url in found.values()):
+                    stories.append(story)
+                    continue
+                prepared = copy.copy(story)
+                prepared.body_html = _rewrite_sources(
+                    story.body_html, {src: local.get(url) for src, url in found.items()}
+                )
+                stories.append(prepared)
+            return dataclasses.replace(edition, stories=tuple(stories))
+
+    def prune(self) -> int:
+        """
+        Delete processed images that haven't been used for `max_age_seconds`.
+        Returns how many were deleted.
+        """
+        cutoff = time.time() - self.max_age_seconds
+        removed = 0
+        if not self.directory.is_dir():
+            return 0
+        for path in self.directory.iterdir():
+            try:
+                if path.is_file() and path.stat().st_mtime < cutoff:
+                    path.unlink()
+                    removed += 1
+            except OSError:
+                continue
+        return removed
+
+    def _fetch_all(self, urls: Iterable[str], width: int) -> Dict[str, str]:
+        urls = list(urls)
+        if not urls:
+            return {}
+        with ThreadPoolExecutor(
+            max_workers=max(1, min(self.max_workers, len(urls))),
+            thread_name_prefix="goosepaper-image",
+        ) as executor:
+            results = executor.map(
+                run_in_context(lambda url: self._local_image(url, width)), urls
+            )
+            return {url: local for url, local in zip(urls, results) if local}
+
+    def _local_image(self, url: str, width: int) -> Optional[str]:
+        path = self._cache_path(url, width)
+        if path.is_file():
+            metrics.increment("images.cached")
+            path.touch()
+            return path.resolve().as_uri()
+
+        from . import fetch
+
+        try:
+            response = fetch.get(url)
+            response.raise_for_status()
+        except fetch.REQUEST_ERRORS as err:
+            print(f"Sad honk :/ Failed to download image {url}: {err}")
+            return None
+        try:
+            payload = _convert(response.content, width, self.mode)
+        except _decode_errors() as err:
+            print(f"Sad honk :/ Failed to prepare image {url}: {err}")
+            return None
+        write_atomic(path, payload)
+        metrics.increment("images.downloaded")
+        metrics.increment("images.bytes", len(payload))
+        return path.resolve().as_uri()
+
+    def _cache_path(self, url: str, width: int) -> Path:
+        digest = hashlib.sha256(f"{self.mode}\0{width}\0{url}".encode("utf-8"))
+        suffix = ".png" if self.mode == "dither" else ".jpg"
+        return self.directory / f"{digest.hexdigest()[:32]}{suffix}"
+
+    def _warn(self, reason: str) -> None:
+        with self._lock:
+            if self._warned:
+                return
+            self._warned = True
+        print(f"Sad honk :/ {reason}, so images are left unchanged.")
+
+
+def _pillow_available() -> bool:
+    try:
+        import PIL  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _decode_errors() -> tuple:
+    """
+    What Pillow raises for a payload that isn't an image it can decode:
+    UnidentifiedImageError and truncated files are OSErrors, and images too
+    large to decode safely raise DecompressionBombError.
+    """
+    from PIL import Image
+
+    return (OSError, ValueError, Image.DecompressionBombError)
+
+
+def _convert(payload: bytes, width: int, mode: str) -> bytes:
+    from PIL import Image, ImageOps
+
+    with Image.open(io.BytesIO(payload)) as image:
+        image = ImageOps.exif_transpose(image)
+        if image.mode in ("RGBA", "LA", "P"):
+            image = image.convert("RGBA")
+            background = Image.new("RGBA", image.size, "white")
+            image = Image.alpha_composite(background, image)
+        image = image.convert("L")
+        if image.width > width:
+            height = max(1, round(image.height * width / image.width))
+            image = image.resize((width, height), Image.Resampling.LANCZOS)
+        out = io.BytesIO()
+        if mode == "dither":
+            image.convert("1").save(out, format="PNG", optimize=True)
+        else:
+            image.save(out, format="JPEG", quality=80, optimize=True)
+        return out.getvalue()
+
+
+def _image_sources(story) -> Dict[str, str]:
+    """
+    The `src` of every remote image in a story, mapped to its absolute URL.
+    """
+    found = {}
+    for match in _IMG_SRC_RE.finditer(story.body_html or ""):
+        src = match.group(3).strip()
+        absolute = urllib.parse.urljoin(story.url or "", unescape(src))
+        if urllib.parse.urlsplit(absolute).scheme in {"http", "https"}:
+            found[src] = absolute
+    return found
+
+
+def _rewrite_sources(body_html: str, replacements: Dict[str, Optional[str]]) -> str:
+    def rewrite(match):
+        local = replacements.get(match.group(3).strip())
+        if not local:
+            return match.group(0)
+        quote = match.group(2)
+        return f"{match.group(1)}{quote}{escape(local)}{quote}"
+
+    def rewrite_tag(match):
+        tag = match.group(0)
+        rewritten = _IMG_SRC_RE.sub(rewrite, tag)
+        if rewritten != tag:
+            rewritten = _SRCSET_RE.sub("", rewritten)
+        return rewritten
+
+    return re.sub(r"<img\b[^>]*>", rewrite_tag, body_html, flags=re.IGNORECASE)
@@ -0,0 +1,398 @@
+"""
+Lay out PDFs in a separate process with memory, CPU and time limits.
+
+WeasyPrint layout normally runs in the process that fetched the edition, so
+one pathological story (a giant table, or deeply nested markup from
+readability) can exhaust its memory or spin for minutes and take the whole
+run down with it. `render_isolated` runs each layout in a worker process
+instead, with the limits in `config.RenderLimits`: the parent kills a worker
+whose resident memory (RSS) passes `memory_mb` or that runs past the
+wall-clock timeout, and the CPU limit is applied through `resource.setrlimit`.
+
+Memory is limited by resident size rather than with `RLIMIT_AS`, because
+WeasyPrint's font and image libraries reserve far more address space than
+they ever touch, so an address-space limit fails ordinary renders long
+before memory is actually short. Linux ignores `RLIMIT_RSS`, so the parent
+watches the worker's RSS in /proc instead. Where there is no /proc (macOS),
+the worker falls back to an address-space limit.
+
+When the worker runs out of memory, CPU time or wall-clock time, or dies, the
+story responsible is found by bisection: the edition's stories are split in
+half and each half is laid out on its own until one story is left that fails
+by itself. That story is dropped, reported in the run metrics, and the full
+edition is rendered again. Other render errors are raised as usual.
+
+One worker lays out one job after another, so the probes of a bisection don't
+each pay for starting Python and loading WeasyPrint. A worker that fails is
+replaced, and so is one left holding more than half the memory limit, so
+memory a job leaves behind isn't blamed on the next. The CPU limit counts
+each job's own CPU time.
+
+Workers are started with "spawn", which re-imports the `__main__` module in
+each of them. A script that renders with limits must keep its work under an
+`if __name__ == "__main__":` guard, or every worker runs the script again.
+
+The memory limit needs /proc or the `resource` module, and the CPU limit
+needs `resource` (Linux and macOS). The timeout works everywhere.
+
+"""
+
+import math
+import multiprocessing
+import os
+import shutil
+import signal
+import tempfile
+import time
+from dataclasses import replace
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Dict, List, Optional, Sequence, Union
+
+from . import metrics
+from .config import RenderLimits
+from .edition import Edition
+from .story import Story
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - Windows
+    resource = None
+
+Failure = Optional[str]
+
+# How often the parent checks the worker's resident memory.
+RSS_POLL_SECONDS = 0.05
+
+
+class RenderLimitExceeded(RuntimeError):
+    """
+    A render hit its limits, and no single story could be blamed (or too many
+    already were).
+    """
+
+    def __init__(self, reason: str, dropped: Sequence[Story] = (), detail: str = ""):
+        self.reason = reason
+        self.dropped = tuple(dropped)
+        message = f"The PDF render failed ({reason})"
+        super().__init__(f"{message} {detail}" if detail else message)
+
+
+def render_isolated(
+    target: Union[str, BinaryIO],
+    edition: Edition,
+    limits: RenderLimits,
+    style_dirs: Sequence[str] = (),
+    render: Optional[Callable] = None,
+    fonts_dir: Optional[str] = None,
+    **settings,
+) -> List[Story]:
+    """
+    Render `edition` to a PDF in a worker process, dropping stories that make
+    it exceed `limits`. The worker is spawned, so call this from a script
+    only under an `if __name__ == "__main__":` guard.
+
+    Arguments:
+        target: The file name or writable binary stream to write the PDF to.
+        edition: The Edition to render.
+        limits: The worker's memory, CPU and time limits.
+        style_dirs: The paper's extra style directories.
+        render: The function that lays out the PDF in the worker, called as
+            `render(path, edition, style_dirs, settings, fonts_dir)`. It must
+            be importable by name. Default: `Goosepaper.to_pdf`
+        fonts_dir: Where the styles' web fonts were synced. Default:
+            `fonts.default_fonts_dir()`
+        settings: The `to_pdf` rendering settings (style, font_size, ...).
+
+    Returns:
+        The stories that were dropped.
+
+    """
+    worker = _Worker(render or _render_pdf, limits, style_dirs, settings, fonts_dir)
+    try:
+        return _render_dropping_offenders(target, edition, limits, worker)
+    finally:
+        worker.close()
+
+
+def _render_dropping_offenders(
+    target: Union[str, BinaryIO],
+    edition: Edition,
+    limits: RenderLimits,
+    worker: "_Worker",
+) -> List[Story]:
+    stories = list(edition.stories)
+    dropped: List[Story] = []
+    with tempfile.TemporaryDirectory(prefix="goosepaper-render-") as workdir:
+        output = str(Path(workdir) / "paper.pdf")
+
+        def attempt(subset: Sequence[Story], path: Optional[str] = None) -> Failure:
+            if path is None:
+                # A probe only asks whether the subset breaks the limits, so
+                # it isn't held to the page budget.
+                return worker.run(
+                    str(Path(workdir) / "probe.pdf"),
+                    replace(edition.with_stories(subset), budget=None),
+                )
+            return worker.run(path, edition.with_stories(subset))
+
+        while True:
+            with metrics.span("pdf.isolated", stories=len(stories)) as span:
+                failure = attempt(stories, output)
+                if failure:
+                    span.set(failure=failure)
+            if failure is None:
+                break
+            if len(dropped) >= limits.max_dropped_stories:
+                raise RenderLimitExceeded(
+                    failure, dropped, f"even after dropping {len(dropped)} stories"
+                )
+            with metrics.span("pdf.bisect", stories=len(stories)):
+                index = find_offender(stories, lambda subset: bool(attempt(subset)))
+            if index is None:
+                raise RenderLimitExceeded(
+                    failure, dropped, "and no single story is to blame"
+                )
+            story = stories.pop(index)
+            dropped.append(story)
+            metrics.increment("render.dropped_stories")
+            metrics.add_dropped_story(
+                headline=story.headline,
+                url=story.url,
+                reason=failure,
+                output=target if isinstance(target, str) else None,
+            )
+            print(
+                f"Honk! Dropped {story.headline!r} from the paper: "
+                f"rendering it failed ({failure})."
+            )
+
+        if isinstance(target, str):
+            shutil.move(output, target)
+        else:
+            with open(output, "rb") as fh:
+                shutil.copyfileobj(fh, target)
+    return dropped
+
+
+def find_offender(
+    stories: Sequence[Story], fails: Callable[[List[Story]], bool]
+) -> Optional[int]:
+    """
+    Find a story that makes `fails` true on its own, by bisection.
+
+    Returns its index in `stories`, or None if a paper with no stories fails
+    too, or if neither half of some failing set fails alone (the failure
+    needs stories from both).
+    """
+    if fails([]):
+        return None
+    candidates = list(range(len(stories)))
+    while len(candidates) > 1:
+        half = len(candidates) // 2
+        for part in (candidates[:half], candidates[half:]):
+            if fails([stories[index] for index in part]):
+                candidates = part
+                break
+        else:
+            return None
+    return candidates[0] if candidates else None
+
+
+class _Worker:
+    """
+    A spawned process that lays out PDFs one after another, within `limits`.
+    It is started on the first job, and again after it fails.
+    """
+
+    def __init__(
+        self,
+        render: Callable,
+        limits: RenderLimits,
+        style_dirs: Sequence[str],
+        settings: Dict[str, Any],
+        fonts_dir: Optional[str] = None,
+    ):
+        self.render = render
+        self.limits = limits
+        self.style_dirs = tuple(style_dirs)
+        self.settings = settings
+        self.fonts_dir = fonts_dir
+        self._process = None
+        self._connection = None
+
+    def run(self, path: str, edition: Edition) -> Failure:
+        """
+        Lay out `edition` to `path`. Returns why the worker failed ("memory",
+        "cpu", "timeout" or "crashed"), or None if it succeeded.
+        """
+        started_at = time.monotonic()
+        if self._process is None:
+            self._start()
+        process, connection = self._process, self._connection
+        watch_rss = (
+            self.limits.memory_mb is not None and _rss_bytes(process.pid) is not None
+        )
+        # The timeout includes the worker's startup when this job started it.
+        expires_at = (
+            None
+            if self.limits.timeout_seconds is None
+            else started_at + self.limits.timeout_seconds
+        )
+        memory_limit = _memory_bytes(self.limits) if watch_rss else None
+        status = None
+        try:
+            connection.send((path, edition))
+            while True:
+                wait = None
+                if expires_at is not None:
+                    wait = max(0.0, expires_at - time.monotonic())
+                if watch_rss and (wait is None or wait > RSS_POLL_SECONDS):
+                    wait = RSS_POLL_SECONDS
+                if connection.poll(wait):
+                    status = connection.recv()
+                    break
+                if watch_rss and (_rss_bytes(process.pid) or 0) > memory_limit:
+                    self.close(kill=True)
+                    return "memory"
+                if expires_at is not None and time.monotonic() >= expires_at:
+                    self.close(kill=True)
+                    return "timeout"
+        except (EOFError, OSError):
+            pass
+
+        if status is None:
+            self.close(kill=True)
+            if process.exitcode == -getattr(signal, "SIGXCPU", 0):
+                return "cpu"
+            return "crashed"
+        kind, message = status
+        if kind == "error":
+            raise RuntimeError(f"Rendering the PDF failed: {message}")
+        if kind != "ok":
+            self.close(kill=True)
+            return kind
+        if watch_rss and (_rss_bytes(process.pid) or 0) > memory_limit / 2:
+            self.close()
+        return None
+
+    def close(self, kill: bool = False) -> None:
+        """
+        Stop the worker: ask it to exit, or with `kill`, kill it.
+        """
+        process, connection = self._process, self._connection
+        self._process = self._connection = None
+        if process is None:
+            return
+        if kill:
+            process.kill()
+        else:
+            try:
+                connection.send(None)
+            except OSError:
+                process.kill()
+        connection.close()
+        process.join()
+
+    def _start(self) -> None:
+        context = multiprocessing.get_context("spawn")
+        connection, child = context.Pipe()
+        process = context.Process(
+            target=_serve,
+            args=(
+                child,
+                self.render,
+                self.style_dirs,
+                self.settings,
+                self.fonts_dir,
+                self.limits,
+            ),
+            name="goosepaper-render",
+            daemon=True,
+        )
+        process.start()
+        child.close()
+        self._process, self._connection = process, connection
+
+
+def _serve(connection, render, style_dirs, settings, fonts_dir, limits) -> None:
+    """
+    The worker's loop: lay out each `(path, edition)` job it is sent, and
+    answer with how it went, until it is sent None.
+    """
+    setup_error = None
+    try:
+        _limit_memory(limits)
+    except Exception as err:
+        setup_error = f"{type(err).__name__}: {err}"
+    try:
+        while True:
+            try:
+                job = connection.recv()
+            except EOFError:
+                return
+            if job is None:
+                return
+            if setup_error is not None:
+                connection.send(("error", setup_error))
+                continue
+            path, edition = job
+            try:
+                _limit_cpu(limits)
+                render(path, edition, style_dirs, settings, fonts_dir)
+            except MemoryError:
+                connection.send(("memory", None))
+                return
+            except Exception as err:
+                connection.send(("error", f"{type(err).__name__}: {err}"))
+            else:
+                connection.send(("ok", None))
+    finally:
+        connection.close()
+
+
+def _limit_memory(limits: RenderLimits) -> None:
+    if resource is None:
+        return
+    if limits.memory_mb is not None and _rss_bytes(os.getpid()) is None:
+        size = _memory_bytes(limits)
+        resource.setrlimit(resource.RLIMIT_AS, (size, size))
+
+
+def _limit_cpu(limits: RenderLimits) -> None:
+    """
+    Allow the next job `cpu_seconds` of CPU time on top of what the worker
+    has used so far, since RLIMIT_CPU counts the whole process.
+    """
+    if resource is None or limits.cpu_seconds is None:
+        return
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    seconds = math.ceil(usage.ru_utime + usage.ru_stime) + max(
+        1, int(limits.cpu_seconds)
+    )
+    _soft, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    if hard != resource.RLIM_INFINITY:
+        seconds = min(seconds, hard)
+    resource.setrlimit(resource.RLIMIT_CPU, (seconds, hard))
+
+
+def _memory_bytes(limits: RenderLimits) -> int:
+    return int(limits.memory_mb * 1024 * 1024)
+
+
+def _rss_bytes(pid: int) -> Optional[int]:
+    """
+    The resident memory of process `pid`, or None where /proc can't tell.
+    """
+    try:
+        with open(f"/proc/{pid}/statm", encoding="ascii") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _render_pdf(path, edition, style_dirs, settings, fonts_dir=None) -> None:
+    from .goosepaper import Goosepaper
+
+    Goosepaper([], style_dirs=style_dirs, fonts_dir=fonts_dir).to_pdf(
+        path, edition=edition, **settings
+    )
@@ -0,0 +1,234 @@
+"""
+Timing spans and counters for one Goosepaper run.
+
+Nothing is recorded unless a MetricsRecorder is active (see `recording`), so
+instrumented code costs next to nothing in normal runs. Worker threads started
+with `deadline.run_in_context` record into the same recorder as their caller.
+
+"""
+
+import contextlib
+import contextvars
+import functools
+import json
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+_current_recorder: contextvars.ContextVar[Optional["MetricsRecorder"]] = (
+    contextvars.ContextVar("goosepaper_metrics", default=None)
+)
+
+
+class Span:
+    def __init__(self, name: str, attributes: Dict[str, Any]):
+        self.name = name
+        self.attributes = dict(attributes)
+        self.offset = 0.0
+        self.seconds = 0.0
+        self._started = time.perf_counter()
+
+    def set(self, **attributes) -> None:
+        self.attributes.update(attributes)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "start": round(self.offset, 6),
+            "seconds": round(self.seconds, 6),
+            **({"attributes": self.attributes} if self.attributes else {}),
+        }
+
+
+class MetricsRecorder:
+    """
+    Collects the spans, counters, per-source results and dropped stories of
+    one run.
+    """
+
+    def __init__(self):
+        self.started_at = time.time()
+        self._started = time.perf_counter()
+        self._lock = threading.Lock()
+        self.spans: List[Span] = []
+        self.counters: Dict[str, float] = {}
+        self.sources: List[Dict[str, Any]] = []
+        self.dropped_stories: List[Dict[str, Any]] = []
+
+    def add_span(self, span: Span) -> None:
+        span.offset = span._started - self._started
+        with self._lock:
+            self.spans.append(span)
+
+    def increment(self, name: str, amount: float = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def add_source(self, **info) -> None:
+        with self._lock:
+            self.sources.append(info)
+
+    def add_dropped_story(self, **info) -> None:
+        with self._lock:
+            self.dropped_stories.append(info)
+
+    def stages(self) -> Dict[str, Dict[str, float]]:
+        """
+        Total time and number of spans for each span name.
+        """
+        totals: Dict[str, Dict[str, float]] = {}
+        with self._lock:
+            spans = list(self.spans)
+        for span in spans:
+            stage = totals.setdefault(span.name, {"count": 0, "seconds": 0.0})
+            stage["count"] += 1
+            stage["seconds"] = round(stage["seconds"] + span.seconds, 6)
+        return totals
+
+    def report(self) -> Dict[str, Any]:
+        with self._lock:
+            spans = sorted(self.spans, key=lambda span: span.offset)
+            counters = dict(self.counters)
+            sources = list(self.sources)
+            dropped_stories = list(self.dropped_stories)
+        return {
+            "started_at": self.started_at,
+            "total_seconds": round(time.perf_counter() - self._started, 6),
+            "stages": self.stages(),
+            "counters": counters,
+            "sources": sources,
+            "dropped_stories": dropped_stories,
+            "spans": [span.to_dict() for span in spans],
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.report(), indent=2, default=str)
+
+    def format_table(self) -> str:
+        report = self.report()
+        lines = [f"{'stage':<24} {'count':>6} {'seconds':>9}"]
+        for name, stage in sorted(
+            report["stages"].items(), key=lambda item: -item[1]["seconds"]
+        ):
+            lines.append(f"{name:<24} {stage['count']:>6} {stage['seconds']:>9.3f}")
+        for name, value in sorted(report["counters"].items()):
+            lines.append(f"{name:<24} {value:>16,.0f}")
+        for source in report["sources"]:
+            lines.append(
+                f"{source.get('source', '?')}: {source.get('stories', 0)} "
+                f"stories ({source.get('status', '?')})"
+            )
+        for story in report["dropped_stories"]:
+            lines.append(
+                f"dropped {story.get('headline', '?')!r} from "
+                f"{story.get('output', '?')} ({story.get('reason', '?')})"
+            )
+        lines.append(f"{'total':<24} {'':>6} {report['total_seconds']:>9.3f}")
+        return "\n".join(lines)
+
+
+def current_recorder() -> Optional[MetricsRecorder]:
+    return _current_recorder.get()
+
+
+@contextlib.contextmanager
+def recording(
+    recorder: Optional[MetricsRecorder] = None,
+) -> Iterator[MetricsRecorder]:
+    recorder = recorder if recorder is not None else MetricsRecorder()
+    token = _current_recorder.set(recorder)
+    try:
+        yield recorder
+    finally:
+        _current_recorder.reset(token)
+
+
+@contextlib.contextmanager
+def span(name: str, **attributes) -> Iterator[Span]:
+    """
+    Time the enclosed block as a span called `name`.
+
+    The yielded Span accepts extra attributes with `set`. It is only kept if
+    a recorder is active.
+    """
+    current = Span(name, attributes)
+    try:
+        yield current
+    except BaseException as err:
+        current.set(error=type(err).__name__)
+        raise
+    finally:
+        current.seconds = time.perf_counter() - current._started
+        recorder = _current_recorder.get()
+        if recorder is not None:
+            recorder.add_span(current)
+
+
+def record_span(name: str, seconds: float, **attributes) -> None:
+    """
+    Record a span that was timed elsewhere, e.g. in a worker process, as
+    having just finished.
+    """
+    recorder = _current_recorder.get()
+    if recorder is None:
+        return
+    finished = Span(name, attributes)
+    finished.seconds = seconds
+    finished._started -= seconds
+    recorder.add_span(finished)
+
+
+def replay(report: Dict[str, Any]) -> None:
+    """
+    Record the spans, counters and dropped stories of a `MetricsRecorder.report`
+    made elsewhere, e.g. in a worker process, as having just finished.
+    """
+    recorder = _current_recorder.get()
+    if recorder is None:
+        return
+    finished_at = time.perf_counter()
+    for span_info in report.get("spans", []):
+        replayed = Span(span_info["name"], span_info.get("attributes", {}))
+        replayed.seconds = span_info["seconds"]
+        replayed._started = finished_at - (
+            report["total_seconds"] - span_info["start"]
+        )
+        recorder.add_span(replayed)
+    for name, amount in report.get("counters", {}).items():
+        recorder.increment(name, amount)
+    for story in report.get("dropped_stories", []):
+        recorder.add_dropped_story(**story)
+
+
+def timed(name: str):
+    """
+    Decorate a function so every call is recorded as a span called `name`.
+    """
+
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+def increment(name: str, amount: float = 1) -> None:
+    recorder = _current_recorder.get()
+    if recorder is not None:
+        recorder.increment(name, amount)
+
+
+def add_source(**info) -> None:
+    recorder = _current_recorder.get()
+    if recorder is not None:
+        recorder.add_source(**info)
+
+
+def add_dropped_story(**info) -> None:
+    recorder = _current_recorder.get()
+    if recorder is not None:
+        recorder.add_dropped_story(**info)
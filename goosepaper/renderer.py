@@ -0,0 +1,170 @@
+"""
+WeasyPrint state that can be reused from one PDF render to the next.
+
+Setting up a render is not free: a `FontConfiguration` loads fontconfig, and
+each `CSS` object parses its stylesheet (and, for remote stylesheets,
+downloads it and the fonts it declares). A `Renderer` keeps those around, so
+a long-lived process rendering many editions only pays for them once. Styles
+themselves are cached by `styles.get_style`.
+
+"""
+
+import pathlib
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple, Type, Union
+
+from . import metrics
+from .styles import Style, get_style
+
+CssKey = Tuple[str, Tuple[str, ...], Optional[tuple], int, Optional[str], str, str]
+
+
+class Renderer:
+    """
+    Caches the font configuration and parsed stylesheets used to render PDFs.
+
+    Arguments:
+        base_url: The base URL relative links in the paper are resolved
+            against. Default: the current working directory
+        fonts_dir: Where `goosepaper fonts sync` put the local copies of the
+            styles' web fonts. Default: `fonts.default_fonts_dir()`
+        style_dirs: Extra directories to look for styles named by string in,
+            before the built-in styles. Default: none
+
+    """
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        fonts_dir: Optional[str] = None,
+        style_dirs: Iterable[str] = (),
+    ):
+        self.base_url = base_url or str(pathlib.Path.cwd())
+        self.fonts_dir = fonts_dir
+        self.style_dirs = tuple(str(path) for path in style_dirs)
+        self._lock = threading.RLock()
+        self._font_config = None
+        self._css: Dict[CssKey, object] = {}
+        self._stylesheets: Dict[str, object] = {}
+
+    @property
+    def font_config(self):
+        with self._lock:
+            if self._font_config is None:
+                from weasyprint.text.fonts import FontConfiguration
+
+                self._font_config = FontConfiguration()
+            return self._font_config
+
+    def style(self, style: Union[str, Type[Style], Style] = "") -> Style:
+        """
+        The Style called `style`, from the style registry (looking in the
+        renderer's `style_dirs` first). Style instances are passed through,
+        and style classes are instantiated.
+        """
+        if isinstance(style, Style):
+            return style
+        if not isinstance(style, str):
+            try:
+                return style()
+            except Exception as err:
+                raise ValueError(f"Invalid style {style}") from err
+        return get_style(style, self.style_dirs)
+
+    def css(
+        self,
+        style: Union[str, Type[Style], Style] = "",
+        font_size: int = 14,
+        body_font: Optional[str] = None,
+        layout: str = "auto",
+        page_profile: str = "remarkable2",
+    ):
+        """
+        The parsed print stylesheet for these settings.
+        """
+        style_obj = self.style(style)
+        # Styles of the same name from different directories are different
+        # stylesheets, so the directories a style was looked up in are part
+        # of the key.
+        key = (
+            style_obj.style_name,
+            tuple(getattr(style_obj, "style_dirs", ())),
+            getattr(style_obj, "revision", None),
+            font_size,
+            body_font,
+            layout,
+            page_profile,
+        )
+        with self._lock:
+            if key not in self._css:
+                metrics.increment("render.css_parsed")
+                self._css[key] = self._parse_css(
+                    string=style_obj.get_css(
+                        font_size=font_size,
+                        body_font=body_font,
+                        layout=layout,
+                        page_profile=page_profile,
+                    )
+                )
+            return self._css[key]
+
+    def stylesheets(self, style: Union[str, Type[Style], Style] = "") -> List[object]:
+        """
+        The parsed extra stylesheets (usually web fonts) the style links to.
+        """
+        parsed = []
+        for url in self.style(style).get_stylesheets(fonts_dir=self.fonts_dir):
+            with self._lock:
+                if url not in self._stylesheets:
+                    metrics.increment("render.css_parsed")
+                    self._stylesheets[url] = self._parse_css(url=url)
+                parsed.append(self._stylesheets[url])
+        return parsed
+
+    def render(
+        self,
+        html: str,
+        style: Union[str, Type[Style], Style] = "",
+        font_size: int = 14,
+        body_font: Optional[str] = None,
+        layout: str = "auto",
+        page_profile: str = "remarkable2",
+    ):
+        """
+        Lay out an HTML document, returning a WeasyPrint `Document`.
+        """
+        from weasyprint import HTML
+
+        stylesheets = [
+            self.css(
+                style,
+                font_size=font_size,
+                body_font=body_font,
+                layout=layout,
+                page_profile=page_profile,
+            ),
+            *self.stylesheets(style),
+        ]
+        return HTML(string=html, base_url=self.base_url).render(
+            stylesheets=stylesheets,
+            font_config=self.font_config,
+        )
+
+    def clear(self) -> None:
+        """
+        Forget every cached object, e.g. after installing new fonts.
+        """
+        with self._lock:
+            self._font_config = None
+            self._css.clear()
+            self._stylesheets.clear()
+
+    def _parse_css(self, **source):
+        from weasyprint import CSS
+
+        # Stylesheets loaded by URL resolve their own url() references (such
+        # as the fonts `goosepaper fonts sync` keeps next to them) against
+        # that URL, so only the paper's own CSS gets the paper's base URL.
+        if "string" in source:
+            source["base_url"] = self.base_url
+        return CSS(**source, font_config=self.font_config)
@@ -0,0 +1,239 @@
+"""
+Render one fetched edition into every requested output and page profile.
+
+Each output file in each rendition (see `config.Rendition`) is an independent
+job. When there is more than one PDF to lay out, the PDFs are laid out in a
+process pool, so rendering for three devices takes about as long as the
+slowest of them rather than all three in turn. HTML and EPUB outputs are
+quick to write and are rendered in this process, with the paper's own
+Renderer. Every job renders the same `Edition`, so the renditions contain
+exactly the same stories.
+
+The spans and counters a worker records are sent back with its result and
+replayed into this run's metrics.
+
+EPUB outputs reflow on the device, so they are rendered once whatever the
+renditions.
+
+With an `images.ImagePipeline`, the images of PDF jobs are prepared once per
+page profile, before any job is laid out. With `config.RenderLimits`, each PDF
+is laid out in its own limited worker process (see `goosepaper.isolation`),
+so the jobs are driven from threads rather than a process pool.
+
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from . import metrics
+from .config import PaperSettings, RenderLimits, Rendition
+from .deadline import run_in_context
+
+_WORKER_PAPERS: Dict[Tuple[Tuple[str, ...], Optional[str]], object] = {}
+
+
+@dataclass(frozen=True)
+class RenderJob:
+    output: str
+    settings: PaperSettings
+
+
+def rendition_output(output: str, rendition: Rendition) -> str:
+    """
+    The file name of `output` in a rendition: "paper.pdf" rendered for
+    paper_pro becomes "paper-paper_pro.pdf".
+    """
+    path = Path(output)
+    return str(path.with_name(f"{path.stem}-{rendition.name}{path.suffix}"))
+
+
+def plan_renders(outputs: Sequence[str], settings: PaperSettings) -> List[RenderJob]:
+    jobs = []
+    for output in outputs:
+        if not settings.renditions or output.endswith(".epub"):
+            jobs.append(RenderJob(output, settings))
+            continue
+        for rendition in settings.renditions:
+            jobs.append(
+                RenderJob(
+                    rendition_output(output, rendition),
+                    replace(
+                        settings,
+                        page_profile=rendition.page_profile,
+                        layout=rendition.layout or settings.layout,
+                        renditions=(),
+                    ),
+                )
+            )
+    return jobs
+
+
+def render_edition(
+    paper,
+    edition,
+    outputs: Sequence[str],
+    settings: PaperSettings,
+    max_workers: Optional[int] = None,
+    images=None,
+    limits: Optional[RenderLimits] = None,
+) -> List[str]:
+    """
+    Render `edition` to every output in every rendition of `settings`.
+
+    Arguments:
+        paper: The Goosepaper that fetched the edition. Used for renders that
+            run in this process.
+        edition: The Edition to render.
+        outputs: The output file names, as given on the command line.
+        settings: The paper settings, including the renditions.
+        max_workers: How many render processes to start at most. Default:
+            one per CPU, up to the number of files to render
+        images: An ImagePipeline to prepare the images of PDF outputs with.
+            Default: leave images alone
+        limits: Limits to lay out each PDF under, in its own worker process.
+            Default: no limits
+
+    Returns:
+        The names of the files written, in order.
+
+    """
+    jobs = plan_renders(outputs, settings)
+    prepared: Dict[str, object] = {}
+    editions = [_job_edition(edition, job, images, prepared) for job in jobs]
+    if limits is not None and limits.enabled:
+        return _render_in_threads(paper, jobs, editions, limits, max_workers)
+    pooled = [job.output.endswith(".pdf") for job in jobs]
+    executor = _render_executor(sum(pooled), max_workers)
+    if executor is None:
+        return [
+            render_output(paper, job.output, job.settings, edition=job_edition)
+            for job, job_edition in zip(jobs, editions)
+        ]
+
+    with executor:
+        futures = [
+            executor.submit(_render_job, job_edition, job)
+            for job, job_edition, in_pool in zip(jobs, editions, pooled)
+            if in_pool
+        ]
+        for job, job_edition, in_pool in zip(jobs, editions, pooled):
+            if not in_pool:
+                render_output(paper, job.output, job.settings, edition=job_edition)
+        for future in futures:
+            metrics.replay(future.result())
+    return [job.output for job in jobs]
+
+
+def _job_edition(edition, job: RenderJob, images, prepared: Dict[str, object]):
+    if images is None or not job.output.endswith(".pdf"):
+        return edition
+    profile = job.settings.page_profile
+    if profile not in prepared:
+        prepared[profile] = images.prepare(edition, profile)
+    return prepared[profile]
+
+
+def render_output(paper, output, settings, edition=None, limits=None):
+    with metrics.span("render", output=output) as span:
+        _render_output(paper, output, settings, edition=edition, limits=limits)
+        size = _file_size(output)
+        if size is not None:
+            span.set(bytes=size)
+    return output
+
+
+def _render_output(paper, output, settings, edition=None, limits=None):
+    if output.endswith(".html"):
+        paper.write_html(
+            output,
+            font_size=settings.font_size,
+            style=settings.style,
+            body_font=settings.body_font,
+            table_of_contents=settings.table_of_contents,
+            layout=settings.layout,
+            page_profile=settings.page_profile,
+            edition=edition,
+        )
+    elif output.endswith(".pdf"):
+        paper.to_pdf(
+            output,
+            font_size=settings.font_size,
+            style=settings.style,
+            body_font=settings.body_font,
+            table_of_contents=settings.table_of_contents,
+            layout=settings.layout,
+            page_profile=settings.page_profile,
+            edition=edition,
+            limits=limits,
+            chunked=settings.chunked,
+        )
+    elif output.endswith(".epub"):
+        paper.to_epub(
+            output,
+            font_size=settings.font_size,
+            style=settings.style,
+            body_font=settings.body_font,
+            edition=edition,
+        )
+    else:
+        raise ValueError(f"Unknown file extension '{output.split('.')[-1]}'.")
+
+
+def _render_in_threads(paper, jobs, editions, limits, max_workers) -> List[str]:
+    workers = max(1, min(len(jobs), max_workers or os.cpu_count() or 1))
+    render = run_in_context(render_output)
+    with ThreadPoolExecutor(
+        max_workers=workers, thread_name_prefix="goosepaper-render"
+    ) as executor:
+        futures = [
+            executor.submit(
+                render, paper, job.output, job.settings, job_edition, limits
+            )
+            for job, job_edition in zip(jobs, editions)
+        ]
+        return [future.result() for future in futures]
+
+
+def _render_executor(
+    job_count: int, max_workers: Optional[int]
+) -> Optional[ProcessPoolExecutor]:
+    workers = min(job_count, max_workers or os.cpu_count() or 1)
+    if workers <= 1:
+        return None
+    try:
+        return ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    except (OSError, NotImplementedError, ValueError):
+        return None
+
+
+def _render_job(edition, job: RenderJob):
+    """
+    Render one job in a worker process, and return the report of the metrics
+    it recorded. The worker keeps its Goosepaper, and so its Renderer, for
+    every job it is given.
+    """
+    key = (job.settings.style_dirs, job.settings.fonts_dir)
+    paper = _WORKER_PAPERS.get(key)
+    if paper is None:
+        from .goosepaper import Goosepaper
+
+        paper = _WORKER_PAPERS[key] = Goosepaper(
+            [], style_dirs=key[0], fonts_dir=key[1]
+        )
+    with metrics.recording() as recorder:
+        render_output(paper, job.output, job.settings, edition=edition)
+    return recorder.report()
+
+
+def _file_size(output: str) -> Optional[int]:
+    try:
+        return Path(output).stat().st_size
+    except OSError:
+        return None
@@ -2,12 +2,28 @@ import datetime
 from html import escape
 from typing import List, Optional, Union
 
-import bs4
-
+from .cache import content_hash
 from .util import PlacementPreference, htmlize, StoryPriority
 
 
 class Story:
+    __slots__ = (
+        "headline",
+        "priority",
+        "byline",
+        "date",
+        "include_in_toc",
+        "section_title",
+        "short_form",
+        "stale",
+        "url",
+        "placement_preference",
+        "_body_html",
+        "_plain_text",
+        "_word_count",
+        "_content_hash",
+    )
+
     def __init__(
         self,
         headline: Optional[str],
@@ -20,9 +36,19 @@ class Story:
         include_in_toc: bool = True,
         section_title: Optional[str] = None,
         short_form: bool = False,
+        stale: bool = False,
+        url: Optional[str] = None,
     ) -> None:
         """
         Create a new Story with headline and body text.
+
+        A `stale` story was reused from an earlier edition because its source
+        could not be fetched this time. `url` is the story's original link, if
+        it has one.
+
+        Text derived from the body (`plain_text`, `word_count` and
+        `content_hash`) is computed on first use and kept until `body_html`
+        is reassigned.
         """
         self.headline = headline
         self.priority = priority
@@ -31,6 +57,8 @@ class Story:
         self.include_in_toc = include_in_toc
         self.section_title = section_title
         self.short_form = short_form
+        self.stale = stale
+        self.url = url
         if body_html is not None:
             self.body_html = body_html
         elif body_text is not None:
@@ -42,6 +70,17 @@ class Story:
             )
         self.placement_preference = placement_preference
 
+    @property
+    def body_html(self) -> str:
+        return self._body_html
+
+    @body_html.setter
+    def body_html(self, value: str) -> None:
+        self._body_html = value
+        self._plain_text = None
+        self._word_count = None
+        self._content_hash = None
+
     def priority_class(self) -> str:
         return {
             StoryPriority.DEFAULT: "",
@@ -62,10 +101,26 @@ class Story:
         }[self.placement_preference]
 
     def plain_text(self) -> str:
-        return bs4.BeautifulSoup(self.body_html, "lxml").get_text(" ", strip=True)
+        if self._plain_text is None:
+            import bs4
+
+            self._plain_text = bs4.BeautifulSoup(self._body_html, "lxml").get_text(
+                " ", strip=True
+            )
+        return self._plain_text
 
     def word_count(self) -> int:
-        return len(self.plain_text().split())
+        if self._word_count is None:
+            self._word_count = len(self.plain_text().split())
+        return self._word_count
+
+    def content_hash(self) -> str:
+        """
+        A stable digest of `body_html`, for telling whether two bodies match.
+        """
+        if self._content_hash is None:
+            self._content_hash = content_hash(self._body_html)
+        return self._content_hash
 
     def to_html(
         self,
@@ -83,6 +138,8 @@ class Story:
             classes.append(placement_class)
         if self.short_form:
             classes.append("story-short")
+        if self.stale:
+            classes.append("story-stale")
         if extra_classes:
             classes.extend(extra_classes)
         headline = (
@@ -95,12 +152,18 @@ class Story:
             if self.byline
             else ""
         )
+        stale_p = (
+            "<p class='stale-note'>From an earlier edition</p>"
+            if self.stale
+            else ""
+        )
         anchor_attr = f' id="{escape(anchor_id)}"' if anchor_id else ""
         return f"""
         <article{anchor_attr} class="{' '.join(filter(None, classes))}">
             {prefix_html}
             {headline}
             {byline_p}
+            {stale_p}
             <div class="story-body">{self.body_html}</div>
         </article>
         """
@@ -3,11 +3,9 @@ import re
 from html import escape
 from typing import List, Optional
 
-import requests
-
+from .. import fetch
 from .storyprovider import StoryProvider
 from ..story import Story
-from ..version import __version__
 
 _PUBLIC_APPVIEW_URL = "https://public.api.bsky.app"
 _AUTHOR_FEED_PATH = "/xrpc/app.bsky.feed.getAuthorFeed"
@@ -36,15 +34,13 @@ class BlueskyStoryProvider(StoryProvider):
         )
 
     def get_stories(self, limit: int = 5, **kwargs) -> List[Story]:
-        response = requests.get(
+        response = fetch.get(
             self.feed_url,
             params={
                 "actor": self.username,
                 "filter": self.feed_filter,
                 "limit": min(self.limit, limit),
             },
-            headers={"User-Agent": f"goosepaper/{__version__}"},
-            timeout=20,
         )
         response.raise_for_status()
         payload = response.json()
@@ -2,6 +2,7 @@ import datetime
 import feedparser
 from typing import List
 
+from .. import fetch
 from .storyprovider import StoryProvider
 from ..story import Story
 
@@ -24,7 +25,7 @@ class MastodonStoryProvider(StoryProvider):
         )
 
     def get_stories(self, limit: int = 5, **kwargs) -> List[Story]:
-        feed = feedparser.parse(self.feed_url)
+        feed = fetch.get_feed(self.feed_url, feedparser.parse)
         limit = min(limit, self.limit, len(feed.entries))
         if limit == 0:
             print(f"Sad honk :/ No entries found for feed {self.feed_url}...")
@@ -44,6 +45,7 @@ class MastodonStoryProvider(StoryProvider):
                 body_html=entry["summary"],
                 byline=self.username,
                 date=date,
+                url=entry.get("link"),
             )
 
             stories.append(story)
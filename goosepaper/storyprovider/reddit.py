@@ -1,12 +1,11 @@
 from typing import List
 import datetime
 import feedparser
-import requests
 
+from .. import fetch
 from ..util import PlacementPreference
 from .storyprovider import StoryProvider
 from ..story import Story
-from ..version import __version__
 
 
 class RedditHeadlineStoryProvider(StoryProvider):
@@ -22,13 +21,9 @@ class RedditHeadlineStoryProvider(StoryProvider):
         self.subreddit = subreddit
 
     def get_stories(self, limit: int = 20, **kwargs) -> List[Story]:
-        response = requests.get(
-            f"https://www.reddit.com/r/{self.subreddit}.rss",
-            headers={"User-Agent": f"goosepaper/{__version__}"},
-            timeout=20,
+        feed = fetch.get_feed(
+            f"https://www.reddit.com/r/{self.subreddit}.rss", feedparser.parse
         )
-        response.raise_for_status()
-        feed = feedparser.parse(response.content)
         limit = min(self.limit, len(feed.entries), limit)
         stories = []
         for entry in feed.entries:
@@ -1,17 +1,24 @@
 import datetime
+import multiprocessing
+import os
+import threading
 import urllib.parse
-from typing import List, Optional
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import List, Optional, Tuple
 
 import feedparser
-import requests
 from readability import Document
 
+from .. import fetch, metrics
+from ..cache import content_hash, get_article_cache
+from ..deadline import remaining_time, run_in_context
 from .storyprovider import StoryProvider
 from ..story import Story
-from ..version import __version__
 
 RSS_BYLINE_MODES = {"all", "none", "first"}
 RSS_BODY_SOURCES = {"auto", "content", "summary", "article"}
+DEFAULT_ARTICLE_CONCURRENCY = 4
 
 
 class RSSFeedStoryProvider(StoryProvider):
@@ -22,6 +29,7 @@ class RSSFeedStoryProvider(StoryProvider):
         since_days_ago: int = None,
         byline: str = "all",
         body_source: str = "auto",
+        article_concurrency: int = DEFAULT_ARTICLE_CONCURRENCY,
     ) -> None:
         if byline not in RSS_BYLINE_MODES:
             raise ValueError(
@@ -36,6 +44,7 @@ class RSSFeedStoryProvider(StoryProvider):
         self.feed_url = rss_path
         self.byline_mode = byline
         self.body_source = body_source
+        self.article_concurrency = max(1, int(article_concurrency))
         self._since = (
             datetime.datetime.now() - datetime.timedelta(days=since_days_ago)
             if since_days_ago
@@ -43,44 +52,82 @@ class RSSFeedStoryProvider(StoryProvider):
         )
 
     def get_stories(self, limit: int = 5, **kwargs) -> List[Story]:
-        feed = feedparser.parse(self.feed_url)
+        feed = fetch.get_feed(self.feed_url, feedparser.parse)
         limit = min(limit, self.limit, len(feed.entries))
         if limit == 0:
             print(f"Sad honk :/ No entries found for feed {self.feed_url}...")
 
-        stories = []
+        selected = []
         for entry in feed.entries:
+            if len(selected) >= limit:
+                break
             date = datetime.datetime(*entry.updated_parsed[:6])
             if self._since is not None and date < self._since:
                 continue
+            selected.append((entry, date))
+
+        links = [_article_link(entry, self.body_source) for entry, _ in selected]
+        articles = self._load_articles(
+            links, [_entry_content_hash(entry) for entry, _ in selected]
+        )
 
-            source = _entry_source(entry, self.feed_url)
+        stories = []
+        for (entry, date), article in zip(selected, articles):
             story = _story_from_entry(
                 entry,
-                source,
+                _entry_source(entry, self.feed_url),
                 date,
                 body_source=self.body_source,
+                article=article,
             )
 
             if story is None:
                 continue
+            story.url = entry.get("link") or None
             if self.byline_mode == "none":
                 story.byline = None
             elif self.byline_mode == "first" and stories:
                 story.byline = None
 
             stories.append(story)
-            if len(stories) >= limit:
-                break
 
         return list(filter(None, stories))
 
+    def _load_articles(
+        self, links: List[Optional[str]], entry_hashes: List[str]
+    ) -> List[Optional[Tuple[str, str]]]:
+        """
+        Get the extracted (headline, body_html) for every link, reusing the
+        article cache where possible and downloading the rest.
+        """
+        cache = get_article_cache()
+        articles = [
+            cache.get(link, entry_hash) if cache is not None and link else None
+            for link, entry_hash in zip(links, entry_hashes)
+        ]
+        missing = [
+            link if article is None else None
+            for link, article in zip(links, articles)
+        ]
+        extracted = _extract_articles(
+            _fetch_article_pages(missing, self.article_concurrency)
+        )
+        for index, article in enumerate(extracted):
+            if article is None:
+                continue
+            articles[index] = article
+            if cache is not None:
+                cache.put(missing[index], entry_hashes[index], *article)
+        return articles
+
 
+@metrics.timed("rss.story")
 def _story_from_entry(
     entry,
     source: str,
     date: datetime.datetime,
     body_source: str = "auto",
+    article: Optional[Tuple[str, str]] = None,
 ) -> Optional[Story]:
     if body_source == "summary":
         return Story(
@@ -99,18 +146,8 @@ def _story_from_entry(
             date=date,
         )
 
-    link = entry.get("link")
     fallback_body_html = _entry_feed_body(entry, preferred="content")
-
-    if body_source == "content":
-        return Story(
-            entry["title"],
-            body_html=fallback_body_html,
-            byline=source,
-            date=date,
-        )
-
-    if not link:
+    if article is None:
         return Story(
             entry["title"],
             body_html=fallback_body_html,
@@ -118,54 +155,186 @@ def _story_from_entry(
             date=date,
         )
 
-    req = requests.get(
-        link,
-        headers={"User-Agent": f"goosepaper/{__version__}"},
+    headline, body_html = article
+    return Story(
+        headline or entry["title"],
+        body_html=body_html or fallback_body_html,
+        byline=source,
+        date=date,
     )
-    if not req.ok:
-        return Story(
-            entry["title"],
-            body_html=fallback_body_html,
-            byline=source,
-            date=date,
-        )
 
-    return _story_from_response(
-        entry,
-        req,
-        source,
-        date,
-        fallback_body_html=fallback_body_html,
+
+def _article_link(entry, body_source: str) -> Optional[str]:
+    """
+    Return the link to download for this entry, or None if the story body
+    should come from the feed itself.
+    """
+    if body_source in {"summary", "content"}:
+        return None
+    if _entry_embedded_content(entry) and body_source != "article":
+        return None
+    return entry.get("link") or None
+
+
+@metrics.timed("rss.download")
+def _fetch_article_pages(
+    links: List[Optional[str]], concurrency: int
+) -> List[Optional[str]]:
+    """
+    Download every linked article page, at most `concurrency` at a time.
+
+    Returns the page text for each link, in order, or None where there was
+    no link, the server did not answer with a successful response, or the
+    edition deadline passed before the page arrived.
+    """
+    pending = [link for link in links if link]
+    if not pending:
+        return [None] * len(links)
+    workers = max(1, min(concurrency, len(pending)))
+    executor = ThreadPoolExecutor(
+        max_workers=workers, thread_name_prefix="goosepaper-article"
     )
+    try:
+        fetch_page = run_in_context(_fetch_article_page)
+        futures = [executor.submit(fetch_page, link) for link in links]
+        wait(futures, timeout=remaining_time())
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    return [
+        future.result() if future.done() and not future.cancelled() else None
+        for future in futures
+    ]
 
 
-def _story_from_response(
-    entry,
-    response,
-    source: str,
-    date: datetime.datetime,
-    fallback_body_html: str = "",
-) -> Story:
+def _fetch_article_page(link: Optional[str]) -> Optional[str]:
+    if not link:
+        return None
+    try:
+        req = fetch.get(link)
+    except fetch.TIMEOUT_ERRORS:
+        return None
+    if not req.ok:
+        return None
+    return _response_text(req)
+
+
+def _response_text(response) -> str:
     page_text = response.text
     if not page_text:
         page_text = response.content.decode(
             response.encoding or "utf-8",
             errors="replace",
         )
+    return page_text
+
+
+@metrics.timed("rss.extract")
+def _extract_articles(
+    page_texts: List[Optional[str]],
+) -> List[Optional[Tuple[str, str]]]:
+    """
+    Run readability over every downloaded page.
+
+    Pages are extracted in the calling thread, unless `use_extraction_processes`
+    has turned on the shared process pool: extraction is CPU-bound, so then
+    more than one page is spread over it. If the pool is unavailable (or the
+    document class can't be sent to it), pages are extracted in this process
+    instead. Pages still waiting on the pool when the edition deadline passes
+    are left as None so their stories fall back to the feed body.
+    """
+    results: List[Optional[Tuple[str, str]]] = [None] * len(page_texts)
+    jobs = [(index, text) for index, text in enumerate(page_texts) if text]
+    executor = _extraction_executor() if len(jobs) > 1 else None
 
+    futures = {}
+    if executor is not None:
+        for index, text in jobs:
+            try:
+                futures[index] = executor.submit(_readable_parts, Document, text)
+            except Exception:
+                _reset_extraction_executor(executor)
+                break
+
+    for index, text in jobs:
+        future = futures.get(index)
+        if future is not None:
+            try:
+                results[index] = future.result(timeout=remaining_time())
+                continue
+            except FutureTimeoutError:
+                continue
+            except Exception:
+                pass
+        results[index] = _readable_parts(Document, text)
+    return results
+
+
+def _readable_parts(document_class, page_text: str) -> Optional[Tuple[str, str]]:
     try:
-        doc = Document(page_text)
-        headline = doc.title() or entry["title"]
-        body_html = doc.summary() or fallback_body_html
+        doc = document_class(page_text)
+        return doc.title(), doc.summary()
     except Exception:
-        headline = entry["title"]
-        body_html = fallback_body_html
+        return None
 
-    return Story(
-        headline,
-        body_html=body_html,
-        byline=source,
-        date=date,
+
+_EXTRACTION_EXECUTOR: Optional[ProcessPoolExecutor] = None
+_EXTRACTION_PROCESSES = False
+_EXTRACTION_LOCK = threading.Lock()
+
+
+def use_extraction_processes(enabled: bool = True) -> bool:
+    """
+    Turn the process pool for readability extraction on or off. Returns the
+    previous setting.
+
+    It is off by default, so using Goosepaper as a library never starts
+    processes. The CLI turns it on. The pool's workers are started with
+    "spawn", which re-imports the `__main__` module in every worker, so a
+    script that turns it on must keep its work under an
+    `if __name__ == "__main__":` guard.
+    """
+    global _EXTRACTION_PROCESSES
+    with _EXTRACTION_LOCK:
+        previous = _EXTRACTION_PROCESSES
+        _EXTRACTION_PROCESSES = bool(enabled)
+    if not enabled:
+        executor = _EXTRACTION_EXECUTOR
+        if executor is not None:
+            _reset_extraction_executor(executor)
+    return previous
+
+
+def _extraction_executor() -> Optional[ProcessPoolExecutor]:
+    global _EXTRACTION_EXECUTOR
+    with _EXTRACTION_LOCK:
+        if not _EXTRACTION_PROCESSES:
+            return None
+        if _EXTRACTION_EXECUTOR is None:
+            try:
+                _EXTRACTION_EXECUTOR = ProcessPoolExecutor(
+                    max_workers=os.cpu_count() or 1,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            except (OSError, NotImplementedError, ValueError):
+                return None
+        return _EXTRACTION_EXECUTOR
+
+
+def _reset_extraction_executor(executor: ProcessPoolExecutor) -> None:
+    global _EXTRACTION_EXECUTOR
+    with _EXTRACTION_LOCK:
+        if _EXTRACTION_EXECUTOR is executor:
+            _EXTRACTION_EXECUTOR = None
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _entry_content_hash(entry) -> str:
+    return content_hash(
+        entry.get("title"),
+        entry.get("link"),
+        entry.get("updated") or entry.get("published"),
+        _entry_summary(entry),
+        _entry_embedded_content(entry),
     )
 
 
@@ -1,15 +1,15 @@
+import json
+import urllib.parse
+
 from . import bluesky
 
 
-class _FakeResponse:
-    def __init__(self, payload):
-        self._payload = payload
+def _respond_with(payload):
+    return lambda request: json.dumps(payload)
 
-    def raise_for_status(self):
-        return None
 
-    def json(self):
-        return self._payload
+def _query(request):
+    return dict(urllib.parse.parse_qsl(urllib.parse.urlsplit(request.url).query))
 
 
 def _feed_item(
@@ -37,29 +37,25 @@ def _feed_item(
     return item
 
 
-def test_bluesky_provider_uses_public_author_feed(monkeypatch):
-    seen = {}
-
-    def fake_get(url, *, params, headers, timeout):
-        seen["url"] = url
-        seen["params"] = params
-        seen["headers"] = headers
-        seen["timeout"] = timeout
-        return _FakeResponse({"feed": [_feed_item(text="Hello\nworld")]})
-
-    monkeypatch.setattr(bluesky.requests, "get", fake_get)
+def test_bluesky_provider_uses_public_author_feed(use_transport):
+    transport = use_transport(
+        _respond_with({"feed": [_feed_item(text="Hello\nworld")]})
+    )
 
     provider = bluesky.BlueskyStoryProvider("jordan.matelsky.com", limit=4)
     stories = provider.get_stories(limit=2)
 
-    assert seen["url"] == "https://public.api.bsky.app/xrpc/app.bsky.feed.getAuthorFeed"
-    assert seen["params"] == {
+    request = transport.requests[0]
+    assert request.url.split("?")[0] == (
+        "https://public.api.bsky.app/xrpc/app.bsky.feed.getAuthorFeed"
+    )
+    assert _query(request) == {
         "actor": "jordan.matelsky.com",
         "filter": "posts_with_replies",
-        "limit": 2,
+        "limit": "2",
     }
-    assert seen["timeout"] == 20
-    assert seen["headers"]["User-Agent"].startswith("goosepaper/")
+    assert transport.timeouts[0] == 20
+    assert request.headers["User-Agent"].startswith("goosepaper/")
     assert len(stories) == 1
     assert stories[0].headline == "Jordan Matelsky at 2026-04-24 15:30"
     assert stories[0].byline == "@jordan.matelsky.com"
@@ -68,14 +64,8 @@ def test_bluesky_provider_uses_public_author_feed(monkeypatch):
     assert stories[0].short_form is True
 
 
-def test_bluesky_provider_can_exclude_replies(monkeypatch):
-    seen = {}
-
-    def fake_get(url, *, params, headers, timeout):
-        seen["params"] = params
-        return _FakeResponse({"feed": [_feed_item(text="Hello")]})
-
-    monkeypatch.setattr(bluesky.requests, "get", fake_get)
+def test_bluesky_provider_can_exclude_replies(use_transport):
+    transport = use_transport(_respond_with({"feed": [_feed_item(text="Hello")]}))
 
     provider = bluesky.BlueskyStoryProvider(
         "jordan.matelsky.com",
@@ -83,15 +73,13 @@ def test_bluesky_provider_can_exclude_replies(monkeypatch):
     )
     stories = provider.get_stories(limit=2)
 
-    assert seen["params"]["filter"] == "posts_no_replies"
+    assert _query(transport.requests[0])["filter"] == "posts_no_replies"
     assert len(stories) == 1
 
 
-def test_bluesky_provider_skips_reposts(monkeypatch):
-    monkeypatch.setattr(
-        bluesky.requests,
-        "get",
-        lambda *args, **kwargs: _FakeResponse(
+def test_bluesky_provider_skips_reposts(use_transport):
+    use_transport(
+        _respond_with(
             {
                 "feed": [
                     _feed_item(
@@ -101,7 +89,7 @@ def test_bluesky_provider_skips_reposts(monkeypatch):
                     _feed_item(text="An original post"),
                 ]
             }
-        ),
+        )
     )
 
     provider = bluesky.BlueskyStoryProvider("jordan.matelsky.com")
@@ -112,11 +100,9 @@ def test_bluesky_provider_skips_reposts(monkeypatch):
     assert stories[0].section_title == "Bluesky"
 
 
-def test_bluesky_provider_honors_since_days_ago(monkeypatch):
-    monkeypatch.setattr(
-        bluesky.requests,
-        "get",
-        lambda *args, **kwargs: _FakeResponse(
+def test_bluesky_provider_honors_since_days_ago(use_transport):
+    use_transport(
+        _respond_with(
             {
                 "feed": [
                     _feed_item(
@@ -129,7 +115,7 @@ def test_bluesky_provider_honors_since_days_ago(monkeypatch):
                     ),
                 ]
             }
-        ),
+        )
     )
 
     provider = bluesky.BlueskyStoryProvider(
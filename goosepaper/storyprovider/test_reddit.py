@@ -27,28 +27,14 @@ def _feed_entry(
     )
 
 
-class _FakeResponse:
-    def __init__(self, *, content=b"<feed></feed>"):
-        self.content = content
-
-    def raise_for_status(self):
-        return None
-
-
-def test_reddit_provider_fetches_feed_with_requests_and_user_agent(monkeypatch):
-    seen = {}
-
-    def fake_get(url, *, headers, timeout):
-        seen["url"] = url
-        seen["headers"] = headers
-        seen["timeout"] = timeout
-        return _FakeResponse(content=b"<feed>reddit</feed>")
-
-    monkeypatch.setattr(reddit.requests, "get", fake_get)
+def test_reddit_provider_fetches_feed_with_shared_client_and_user_agent(
+    monkeypatch, use_transport
+):
+    transport = use_transport(lambda request: b"<feed>reddit</feed>")
     monkeypatch.setattr(
         reddit.feedparser,
         "parse",
-        lambda payload: SimpleNamespace(
+        lambda payload, **kwargs: SimpleNamespace(
             entries=[_feed_entry(title="Top story", author="poster")]
         ),
     )
@@ -56,9 +42,9 @@ def test_reddit_provider_fetches_feed_with_requests_and_user_agent(monkeypatch):
     provider = reddit.RedditHeadlineStoryProvider("/r/news", limit=3)
     stories = provider.get_stories(limit=2)
 
-    assert seen["url"] == "https://www.reddit.com/r/news.rss"
-    assert seen["timeout"] == 20
-    assert seen["headers"]["User-Agent"].startswith("goosepaper/")
+    assert transport.requests[0].url == "https://www.reddit.com/r/news.rss"
+    assert transport.timeouts[0] == 20
+    assert transport.requests[0].headers["User-Agent"].startswith("goosepaper/")
     assert len(stories) == 1
     assert stories[0].plain_text() == "Top story"
     assert stories[0].byline == "poster in r/news"
@@ -67,16 +53,12 @@ def test_reddit_provider_fetches_feed_with_requests_and_user_agent(monkeypatch):
     assert stories[0].short_form is True
 
 
-def test_reddit_provider_filters_old_entries(monkeypatch):
-    monkeypatch.setattr(
-        reddit.requests,
-        "get",
-        lambda *args, **kwargs: _FakeResponse(content=b"<feed>reddit</feed>"),
-    )
+def test_reddit_provider_filters_old_entries(monkeypatch, use_transport):
+    use_transport(lambda request: b"<feed>reddit</feed>")
     monkeypatch.setattr(
         reddit.feedparser,
         "parse",
-        lambda payload: SimpleNamespace(
+        lambda payload, **kwargs: SimpleNamespace(
             entries=[
                 _feed_entry(
                     title="Old story",
@@ -1,7 +1,11 @@
 import datetime
+import threading
+from concurrent.futures import Future
 from types import SimpleNamespace
 
 from . import rss
+from ..cache import ArticleCache
+from ..deadline import Deadline, deadline_scope
 
 
 def _feed_entry(
@@ -31,26 +35,22 @@ def _feed_entry(
     return rss.feedparser.FeedParserDict(payload)
 
 
-class _FakeResponse:
-    def __init__(
-        self,
-        *,
-        ok=True,
-        text="<html></html>",
-        content=b"<html></html>",
-        encoding="utf-8",
-    ):
-        self.ok = ok
-        self.text = text
-        self.content = content
-        self.encoding = encoding
+def _feed_handler(article_handler=None):
+    def handler(request):
+        if request.url == "https://example.com/feed.xml":
+            return b"<rss></rss>"
+        if article_handler is None:
+            raise AssertionError(f"article page {request.url} should not be fetched")
+        return article_handler(request)
 
+    return handler
 
-def test_rss_provider_prefers_embedded_feed_content(monkeypatch):
+
+def test_rss_provider_prefers_embedded_feed_content(monkeypatch, use_transport):
     monkeypatch.setattr(
         rss.feedparser,
         "parse",
-        lambda _: SimpleNamespace(
+        lambda _, **kwargs: SimpleNamespace(
             entries=[
                 _feed_entry(
                     content=[
@@ -63,10 +63,7 @@ def test_rss_provider_prefers_embedded_feed_content(monkeypatch):
         ),
     )
 
-    def fail_get(*args, **kwargs):
-        raise AssertionError("requests.get should not run when feed content exists")
-
-    monkeypatch.setattr(rss.requests, "get", fail_get)
+    use_transport(_feed_handler())
 
     provider = rss.RSSFeedStoryProvider("https://example.com/feed.xml")
     stories = provider.get_stories(limit=1)
@@ -76,11 +73,11 @@ def test_rss_provider_prefers_embedded_feed_content(monkeypatch):
     assert stories[0].byline == "example.com"
 
 
-def test_rss_provider_summary_mode_uses_feed_summary(monkeypatch):
+def test_rss_provider_summary_mode_uses_feed_summary(monkeypatch, use_transport):
     monkeypatch.setattr(
         rss.feedparser,
         "parse",
-        lambda _: SimpleNamespace(
+        lambda _, **kwargs: SimpleNamespace(
             entries=[
                 _feed_entry(
                     summary="<p>Feed summary only</p>",
@@ -94,10 +91,7 @@ def test_rss_provider_summary_mode_uses_feed_summary(monkeypatch):
         ),
     )
 
-    def fail_get(*args, **kwargs):
-        raise AssertionError("requests.get should not run in summary mode")
-
-    monkeypatch.setattr(rss.requests, "get", fail_get)
+    use_transport(_feed_handler())
 
     provider = rss.RSSFeedStoryProvider(
         "https://example.com/feed.xml",
@@ -109,12 +103,12 @@ def test_rss_provider_summary_mode_uses_feed_summary(monkeypatch):
 
 
 def test_rss_provider_content_mode_uses_feed_content_without_article_fetch(
-    monkeypatch,
+    monkeypatch, use_transport
 ):
     monkeypatch.setattr(
         rss.feedparser,
         "parse",
-        lambda _: SimpleNamespace(
+        lambda _, **kwargs: SimpleNamespace(
             entries=[
                 _feed_entry(
                     summary="<p>Feed summary only</p>",
@@ -128,10 +122,7 @@ def test_rss_provider_content_mode_uses_feed_content_without_article_fetch(
         ),
     )
 
-    def fail_get(*args, **kwargs):
-        raise AssertionError("requests.get should not run in content mode")
-
-    monkeypatch.setattr(rss.requests, "get", fail_get)
+    use_transport(_feed_handler())
 
     provider = rss.RSSFeedStoryProvider(
         "https://example.com/feed.xml",
@@ -142,19 +133,16 @@ def test_rss_provider_content_mode_uses_feed_content_without_article_fetch(
     assert stories[0].body_html == "<p>Embedded story body</p>"
 
 
-def test_rss_provider_content_mode_falls_back_to_summary(monkeypatch):
+def test_rss_provider_content_mode_falls_back_to_summary(monkeypatch, use_transport):
     monkeypatch.setattr(
         rss.feedparser,
         "parse",
-        lambda _: SimpleNamespace(
+        lambda _, **kwargs: SimpleNamespace(
             entries=[_feed_entry(summary="<p>Feed summary only</p>", content=None)]
         ),
     )
 
-    def fail_get(*args, **kwargs):
-        raise AssertionError("requests.get should not run in content mode")
-
-    monkeypatch.setattr(rss.requests, "get", fail_get)
+    use_transport(_feed_handler())
 
     provider = rss.RSSFeedStoryProvider(
         "https://example.com/feed.xml",
@@ -165,7 +153,7 @@ def test_rss_provider_content_mode_falls_back_to_summary(monkeypatch):
     assert stories[0].body_html == "<p>Feed summary only</p>"
 
 
-def test_rss_provider_passes_text_to_readability(monkeypatch):
+def test_rss_provider_passes_text_to_readability(monkeypatch, use_transport):
     seen = {}
 
     class FakeDocument:
@@ -181,17 +169,9 @@ def test_rss_provider_passes_text_to_readability(monkeypatch):
     monkeypatch.setattr(
         rss.feedparser,
         "parse",
-        lambda _: SimpleNamespace(entries=[_feed_entry(summary=None)]),
-    )
-    monkeypatch.setattr(
-        rss.requests,
-        "get",
-        lambda *args, **kwargs: _FakeResponse(
-            ok=True,
-            text="<html><body>decoded</body></html>",
-            content=b"<html><body>bytes</body></html>",
-        ),
+        lambda _, **kwargs: SimpleNamespace(entries=[_feed_entry(summary=None)]),
     )
+    use_transport(_feed_handler(lambda request: "<html><body>decoded</body></html>"))
     monkeypatch.setattr(rss, "Document", FakeDocument)
 
     provider = rss.RSSFeedStoryProvider("https://example.com/feed.xml")
@@ -203,9 +183,9 @@ def test_rss_provider_passes_text_to_readability(monkeypatch):
 
 
 def test_rss_provider_article_mode_fetches_article_even_when_feed_has_content(
-    monkeypatch,
+    monkeypatch, use_transport
 ):
-    seen = {"requests": 0}
+    seen = {"articles": 0}
 
     class FakeDocument:
         def __init__(self, html):
@@ -220,7 +200,7 @@ def test_rss_provider_article_mode_fetches_article_even_when_feed_has_content(
     monkeypatch.setattr(
         rss.feedparser,
         "parse",
-        lambda _: SimpleNamespace(
+        lambda _, **kwargs: SimpleNamespace(
             entries=[
                 _feed_entry(
                     content=[
@@ -233,11 +213,11 @@ def test_rss_provider_article_mode_fetches_article_even_when_feed_has_content(
         ),
     )
 
-    def fake_get(*args, **kwargs):
-        seen["requests"] += 1
-        return _FakeResponse(ok=True, text="<html><body>decoded</body></html>")
+    def fake_article(request):
+        seen["articles"] += 1
+        return "<html><body>decoded</body></html>"
 
-    monkeypatch.setattr(rss.requests, "get", fake_get)
+    use_transport(_feed_handler(fake_article))
     monkeypatch.setattr(rss, "Document", FakeDocument)
 
     provider = rss.RSSFeedStoryProvider(
@@ -246,12 +226,14 @@ def test_rss_provider_article_mode_fetches_article_even_when_feed_has_content(
     )
     stories = provider.get_stories(limit=1)
 
-    assert seen["requests"] == 1
+    assert seen["articles"] == 1
     assert stories[0].headline == "Readable title"
     assert stories[0].body_html == "<p>Readable summary</p>"
 
 
-def test_rss_provider_falls_back_to_feed_summary_when_readability_fails(monkeypatch):
+def test_rss_provider_falls_back_to_feed_summary_when_readability_fails(
+    monkeypatch, use_transport
+):
     class BrokenDocument:
         def __init__(self, html):
             raise TypeError("boom")
@@ -259,13 +241,9 @@ def test_rss_provider_falls_back_to_feed_summary_when_readability_fails(monkeypa
     monkeypatch.setattr(
         rss.feedparser,
         "parse",
-        lambda _: SimpleNamespace(entries=[_feed_entry()]),
-    )
-    monkeypatch.setattr(
-        rss.requests,
-        "get",
-        lambda *args, **kwargs: _FakeResponse(ok=True, text="<html></html>"),
+        lambda _, **kwargs: SimpleNamespace(entries=[_feed_entry()]),
     )
+    use_transport(_feed_handler(lambda request: "<html></html>"))
     monkeypatch.setattr(rss, "Document", BrokenDocument)
 
     provider = rss.RSSFeedStoryProvider("https://example.com/feed.xml")
@@ -276,11 +254,12 @@ def test_rss_provider_falls_back_to_feed_summary_when_readability_fails(monkeypa
     assert stories[0].byline == "example.com"
 
 
-def test_rss_provider_can_hide_all_bylines(monkeypatch):
+def test_rss_provider_can_hide_all_bylines(monkeypatch, use_transport):
+    use_transport(_feed_handler())
     monkeypatch.setattr(
         rss.feedparser,
         "parse",
-        lambda _: SimpleNamespace(
+        lambda _, **kwargs: SimpleNamespace(
             entries=[
                 _feed_entry(
                     title="One",
@@ -304,11 +283,12 @@ def test_rss_provider_can_hide_all_bylines(monkeypatch):
     assert stories[1].byline is None
 
 
-def test_rss_provider_can_show_only_first_byline(monkeypatch):
+def test_rss_provider_can_show_only_first_byline(monkeypatch, use_transport):
+    use_transport(_feed_handler())
     monkeypatch.setattr(
         rss.feedparser,
         "parse",
-        lambda _: SimpleNamespace(
+        lambda _, **kwargs: SimpleNamespace(
             entries=[
                 _feed_entry(
                     title="One",
@@ -330,3 +310,224 @@ def test_rss_provider_can_show_only_first_byline(monkeypatch):
 
     assert stories[0].byline == "example.com"
     assert stories[1].byline is None
+
+
+def test_rss_provider_downloads_articles_concurrently_with_cap(
+    monkeypatch, use_transport
+):
+    barrier = threading.Barrier(2, timeout=5)
+    active = {"now": 0, "peak": 0}
+    lock = threading.Lock()
+
+    monkeypatch.setattr(
+        rss.feedparser,
+        "parse",
+        lambda _, **kwargs: SimpleNamespace(
+            entries=[
+                _feed_entry(title=f"Story {index}", link=f"https://example.com/{index}")
+                for index in range(4)
+            ]
+        ),
+    )
+
+    def fake_article(request):
+        with lock:
+            active["now"] += 1
+            active["peak"] = max(active["peak"], active["now"])
+        barrier.wait()
+        with lock:
+            active["now"] -= 1
+        return f"<html><body>{request.url}</body></html>"
+
+    use_transport(_feed_handler(fake_article))
+    monkeypatch.setattr(rss, "_extract_articles", lambda pages: [None] * len(pages))
+
+    provider = rss.RSSFeedStoryProvider(
+        "https://example.com/feed.xml",
+        body_source="article",
+        limit=4,
+        article_concurrency=2,
+    )
+    stories = provider.get_stories(limit=4)
+
+    assert [story.headline for story in stories] == [
+        "Story 0",
+        "Story 1",
+        "Story 2",
+        "Story 3",
+    ]
+    assert active["peak"] == 2
+
+
+def test_library_calls_never_start_the_extraction_pool(monkeypatch, use_transport):
+    def no_processes(**kwargs):
+        raise AssertionError("the extraction process pool was started")
+
+    monkeypatch.setattr(rss, "ProcessPoolExecutor", no_processes)
+    monkeypatch.setattr(
+        rss.feedparser,
+        "parse",
+        lambda _, **kwargs: SimpleNamespace(
+            entries=[
+                _feed_entry(title=f"Story {index}", link=f"https://example.com/{index}")
+                for index in range(2)
+            ]
+        ),
+    )
+    use_transport(
+        _feed_handler(
+            lambda request: "<html><head><title>Article</title></head>"
+            f"<body><p>The article at {request.url}</p></body></html>"
+        )
+    )
+
+    provider = rss.RSSFeedStoryProvider(
+        "https://example.com/feed.xml", body_source="article", limit=2
+    )
+    stories = provider.get_stories(limit=2)
+
+    assert [story.headline for story in stories] == ["Article", "Article"]
+    assert "https://example.com/1" in stories[1].body_html
+
+
+def test_extraction_process_pool_is_opt_in(monkeypatch):
+    events = []
+
+    class FakePool:
+        def __init__(self, **kwargs):
+            events.append("started")
+
+        def shutdown(self, **kwargs):
+            events.append("shut down")
+
+    monkeypatch.setattr(rss, "ProcessPoolExecutor", FakePool)
+    assert rss._extraction_executor() is None
+
+    previous = rss.use_extraction_processes()
+    try:
+        pool = rss._extraction_executor()
+        assert isinstance(pool, FakePool)
+        assert rss._extraction_executor() is pool
+    finally:
+        rss.use_extraction_processes(previous)
+
+    assert events == ["started", "shut down"]
+    assert rss._extraction_executor() is None
+
+
+def test_extract_articles_uses_process_pool_for_multiple_pages(monkeypatch):
+    submitted = []
+
+    class RecordingExecutor:
+        def submit(self, fn, *args):
+            submitted.append(args[1])
+            future = Future()
+            future.set_result(fn(*args))
+            return future
+
+    monkeypatch.setattr(rss, "_extraction_executor", lambda: RecordingExecutor())
+
+    pages = [
+        "<html><head><title>One</title></head><body><p>First page</p></body></html>",
+        None,
+        "<html><head><title>Two</title></head><body><p>Second page</p></body></html>",
+    ]
+    results = rss._extract_articles(pages)
+
+    assert submitted == [pages[0], pages[2]]
+    assert results[0][0] == "One"
+    assert results[1] is None
+    assert results[2][0] == "Two"
+
+
+def test_extract_articles_falls_back_inline_when_pool_fails(monkeypatch):
+    class FailingExecutor:
+        def submit(self, fn, *args):
+            future = Future()
+            future.set_exception(RuntimeError("pool is broken"))
+            return future
+
+    class FakeDocument:
+        def __init__(self, html):
+            self.html = html
+
+        def title(self):
+            return "Inline title"
+
+        def summary(self):
+            return self.html
+
+    monkeypatch.setattr(rss, "_extraction_executor", lambda: FailingExecutor())
+    monkeypatch.setattr(rss, "Document", FakeDocument)
+
+    results = rss._extract_articles(["<p>a</p>", "<p>b</p>"])
+
+    assert results == [("Inline title", "<p>a</p>"), ("Inline title", "<p>b</p>")]
+
+
+def test_rss_provider_reuses_cached_article_extraction(
+    monkeypatch, tmp_path, use_transport
+):
+    seen = {"articles": 0}
+
+    class FakeDocument:
+        def __init__(self, html):
+            self.html = html
+
+        def title(self):
+            return "Readable title"
+
+        def summary(self):
+            return "<p>Readable summary</p>"
+
+    def fake_article(request):
+        seen["articles"] += 1
+        return "<html><body>decoded</body></html>"
+
+    monkeypatch.setattr(
+        rss.feedparser,
+        "parse",
+        lambda _, **kwargs: SimpleNamespace(entries=[_feed_entry(summary=None)]),
+    )
+    monkeypatch.setattr(rss, "Document", FakeDocument)
+    monkeypatch.setattr(rss, "get_article_cache", lambda: ArticleCache(tmp_path))
+    use_transport(_feed_handler(fake_article))
+
+    provider = rss.RSSFeedStoryProvider("https://example.com/feed.xml")
+    first = provider.get_stories(limit=1)
+    second = provider.get_stories(limit=1)
+
+    assert seen["articles"] == 1
+    assert first[0].headline == second[0].headline == "Readable title"
+    assert second[0].body_html == "<p>Readable summary</p>"
+
+
+def test_rss_provider_falls_back_to_summary_when_article_misses_deadline(
+    monkeypatch, use_transport
+):
+    release = threading.Event()
+
+    def slow_article(request):
+        release.wait(5)
+        return "<html><body>late</body></html>"
+
+    monkeypatch.setattr(
+        rss.feedparser,
+        "parse",
+        lambda _, **kwargs: SimpleNamespace(entries=[_feed_entry()]),
+    )
+    transport = use_transport(_feed_handler(slow_article))
+
+    provider = rss.RSSFeedStoryProvider(
+        "https://example.com/feed.xml",
+        body_source="article",
+    )
+    try:
+        with deadline_scope(Deadline(0.2)):
+            stories = provider.get_stories(limit=1)
+    finally:
+        release.set()
+
+    assert stories[0].headline == "Feed title"
+    assert stories[0].body_html == "<p>Feed summary</p>"
+    assert transport.timeouts[0] <= 0.2
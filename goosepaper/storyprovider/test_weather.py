@@ -1,19 +1,17 @@
 import datetime
+import json
+import urllib.parse
 
 from . import weather
 from ..util import PlacementPreference
 
 
-class _FakeResponse:
-    def __init__(self, payload, seen=None):
-        self._payload = payload
-        self._seen = seen
+def _forecast_response(request):
+    return json.dumps(_forecast_payload())
 
-    def raise_for_status(self):
-        return None
 
-    def json(self):
-        return self._payload
+def _query(request):
+    return dict(urllib.parse.parse_qsl(urllib.parse.urlsplit(request.url).query))
 
 
 def _forecast_payload():
@@ -46,23 +44,16 @@ def _forecast_payload():
     }
 
 
-def test_weather_summary_defaults_to_ear(monkeypatch):
-    seen = {}
-
-    def fake_get(url, *, params, timeout):
-        seen["url"] = url
-        seen["params"] = params
-        seen["timeout"] = timeout
-        return _FakeResponse(_forecast_payload())
-
-    monkeypatch.setattr(weather.requests, "get", fake_get)
+def test_weather_summary_defaults_to_ear(use_transport):
+    transport = use_transport(_forecast_response)
 
     provider = weather.OpenMeteoWeatherStoryProvider(36.5, -75.1)
     stories = provider.get_stories()
 
-    assert seen["url"] == "https://api.open-meteo.com/v1/forecast"
-    assert seen["params"]["daily"] == "weather_code,temperature_2m_max,temperature_2m_min"
-    assert seen["timeout"] == 20
+    request = transport.requests[0]
+    assert request.url.startswith("https://api.open-meteo.com/v1/forecast?")
+    assert _query(request)["daily"] == "weather_code,temperature_2m_max,temperature_2m_min"
+    assert transport.timeouts[0] == 20
     assert len(stories) == 1
     assert stories[0].placement_preference == PlacementPreference.EAR
     assert stories[0].include_in_toc is False
@@ -70,14 +61,8 @@ def test_weather_summary_defaults_to_ear(monkeypatch):
     assert stories[0].plain_text() == "Overcast"
 
 
-def test_weather_hourly_breakdown_promotes_to_utility_strip(monkeypatch):
-    seen = {}
-
-    def fake_get(url, *, params, timeout):
-        seen["params"] = params
-        return _FakeResponse(_forecast_payload())
-
-    monkeypatch.setattr(weather.requests, "get", fake_get)
+def test_weather_hourly_breakdown_promotes_to_utility_strip(monkeypatch, use_transport):
+    transport = use_transport(_forecast_response)
 
     provider = weather.OpenMeteoWeatherStoryProvider(
         36.5,
@@ -93,7 +78,7 @@ def test_weather_hourly_breakdown_promotes_to_utility_strip(monkeypatch):
     )
     stories = provider.get_stories()
 
-    assert seen["params"]["hourly"] == "weather_code,temperature_2m"
+    assert _query(transport.requests[0])["hourly"] == "weather_code,temperature_2m"
     assert len(stories) == 1
     assert stories[0].placement_preference == PlacementPreference.UTILITY
     assert stories[0].include_in_toc is False
@@ -105,12 +90,8 @@ def test_weather_hourly_breakdown_promotes_to_utility_strip(monkeypatch):
     assert stories[0].body_html.count('class="weather-table__cell"') == 4
 
 
-def test_weather_hourly_breakdown_can_use_24h_clock(monkeypatch):
-    monkeypatch.setattr(
-        weather.requests,
-        "get",
-        lambda *args, **kwargs: _FakeResponse(_forecast_payload()),
-    )
+def test_weather_hourly_breakdown_can_use_24h_clock(monkeypatch, use_transport):
+    use_transport(_forecast_response)
 
     provider = weather.OpenMeteoWeatherStoryProvider(
         36.5,
@@ -133,12 +114,8 @@ def test_weather_hourly_breakdown_can_use_24h_clock(monkeypatch):
     assert "12pm" not in stories[0].body_html
 
 
-def test_weather_daily_breakdown_promotes_to_utility_strip(monkeypatch):
-    monkeypatch.setattr(
-        weather.requests,
-        "get",
-        lambda *args, **kwargs: _FakeResponse(_forecast_payload()),
-    )
+def test_weather_daily_breakdown_promotes_to_utility_strip(use_transport):
+    use_transport(_forecast_response)
 
     provider = weather.OpenMeteoWeatherStoryProvider(
         36.5,
@@ -154,14 +131,10 @@ def test_weather_daily_breakdown_promotes_to_utility_strip(monkeypatch):
     assert stories[0].body_html.count('class="weather-table__cell"') == 4
 
 
-def test_weather_hourly_daily_combined_mode_renders_both_sections(monkeypatch):
-    seen = {}
-
-    def fake_get(url, *, params, timeout):
-        seen["params"] = params
-        return _FakeResponse(_forecast_payload())
-
-    monkeypatch.setattr(weather.requests, "get", fake_get)
+def test_weather_hourly_daily_combined_mode_renders_both_sections(
+    monkeypatch, use_transport
+):
+    transport = use_transport(_forecast_response)
 
     provider = weather.OpenMeteoWeatherStoryProvider(
         36.5,
@@ -178,8 +151,8 @@ def test_weather_hourly_daily_combined_mode_renders_both_sections(monkeypatch):
     )
     stories = provider.get_stories()
 
-    assert seen["params"]["hourly"] == "weather_code,temperature_2m"
-    assert seen["params"]["daily"] == "weather_code,temperature_2m_max,temperature_2m_min"
+    assert _query(transport.requests[0])["hourly"] == "weather_code,temperature_2m"
+    assert _query(transport.requests[0])["daily"] == "weather_code,temperature_2m_max,temperature_2m_min"
     assert len(stories) == 1
     assert stories[0].placement_preference == PlacementPreference.UTILITY
     assert "Next 12 Hours" in stories[0].body_html
@@ -188,12 +161,8 @@ def test_weather_hourly_daily_combined_mode_renders_both_sections(monkeypatch):
     assert stories[0].body_html.count('class="weather-module__section"') == 2
 
 
-def test_weather_single_day_daily_mode_stays_compact(monkeypatch):
-    monkeypatch.setattr(
-        weather.requests,
-        "get",
-        lambda *args, **kwargs: _FakeResponse(_forecast_payload()),
-    )
+def test_weather_single_day_daily_mode_stays_compact(use_transport):
+    use_transport(_forecast_response)
 
     provider = weather.OpenMeteoWeatherStoryProvider(
         36.5,
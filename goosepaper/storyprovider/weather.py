@@ -3,8 +3,7 @@ from html import escape
 from typing import List
 from zoneinfo import ZoneInfo
 
-import requests
-
+from .. import fetch
 from ..util import PlacementPreference
 from .storyprovider import StoryProvider
 from ..story import Story
@@ -19,7 +18,7 @@ class MetaWeatherStoryProvider(StoryProvider):
         return (temp * 9 / 5) + 32
 
     def get_stories(self, limit: int = 1, **kwargs) -> List[Story]:
-        weatherReq = requests.get(
+        weatherReq = fetch.get(
             f"https://www.metaweather.com/api/location/{self.woe}/"
         ).json()
         weather = weatherReq["consolidated_weather"][0]
@@ -337,10 +336,9 @@ class OpenMeteoWeatherStoryProvider(StoryProvider):
         return f"{hour}:{point_time.minute:02d}{suffix}"
 
     def get_stories(self, limit: int = 1, **kwargs) -> List[Story]:
-        response = requests.get(
+        response = fetch.get(
             "https://api.open-meteo.com/v1/forecast",
             params=self._build_params(),
-            timeout=20,
         )
         response.raise_for_status()
         payload = response.json()
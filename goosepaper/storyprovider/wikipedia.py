@@ -2,9 +2,12 @@ import feedparser
 import bs4
 from typing import List
 
+from .. import fetch
 from .storyprovider import StoryProvider
 from ..story import Story
 
+WIKIPEDIA_CURRENT_EVENTS_FEED_URL = "https://www.to-rss.xyz/wikipedia/current_events/"
+
 
 class WikipediaCurrentEventsStoryProvider(StoryProvider):
     """
@@ -18,7 +21,7 @@ class WikipediaCurrentEventsStoryProvider(StoryProvider):
         """
         Get a list of current stories from Wikipedia.
         """
-        feed = feedparser.parse("https://www.to-rss.xyz/wikipedia/current_events/")
+        feed = fetch.get_feed(WIKIPEDIA_CURRENT_EVENTS_FEED_URL, feedparser.parse)
         # title = feed.entries[0].title
         title = "Today's Current Events"
         content = bs4.BeautifulSoup(feed.entries[0].summary, "lxml")
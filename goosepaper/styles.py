@@ -1,7 +1,15 @@
 from __future__ import annotations
 
 import importlib.resources as resources
+import os
+import re
+import threading
 from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+from .cache import content_hash
+from .fonts import local_stylesheet
 
 
 @dataclass(frozen=True)
@@ -14,6 +22,53 @@ class PageProfile:
     margin_left: str
     max_auto_columns: int
 
+    @property
+    def width_inches(self) -> float:
+        return length_in_inches(self.size.split()[0])
+
+    @property
+    def height_inches(self) -> float:
+        return length_in_inches(self.size.split()[-1])
+
+    @property
+    def content_width_inches(self) -> float:
+        """
+        The width of the page between its left and right margins.
+        """
+        return self.width_inches - (
+            length_in_inches(self.margin_left) + length_in_inches(self.margin_right)
+        )
+
+    @property
+    def content_height_inches(self) -> float:
+        """
+        The height of the page between its top and bottom margins.
+        """
+        return self.height_inches - (
+            length_in_inches(self.margin_top) + length_in_inches(self.margin_bottom)
+        )
+
+
+_LENGTH_RE = re.compile(r"^\s*([0-9.]+)\s*(in|mm|cm|pt|px)\s*$")
+_INCHES_PER_UNIT = {
+    "in": 1.0,
+    "mm": 1 / 25.4,
+    "cm": 1 / 2.54,
+    "pt": 1 / 72,
+    "px": 1 / 96,
+}
+
+
+def length_in_inches(length: str) -> float:
+    """
+    Convert a CSS length in absolute units, such as "0.24in" or "9mm", to
+    inches.
+    """
+    match = _LENGTH_RE.match(length)
+    if match is None:
+        raise ValueError(f"Unsupported length {length!r}")
+    return float(match.group(1)) * _INCHES_PER_UNIT[match.group(2)]
+
 
 _PAGE_PROFILES = {
     "rm1": PageProfile(
@@ -84,6 +139,17 @@ _PAGE_PROFILES = {
 
 PAGE_PROFILE_CHOICES = tuple(_PAGE_PROFILES)
 
+
+def get_page_profile(page_profile: str = "remarkable2") -> PageProfile:
+    profile_name = page_profile or "remarkable2"
+    if profile_name not in _PAGE_PROFILES:
+        print(
+            f"Oops! {profile_name} page profile not found or broken. Use default page profile."
+        )
+        profile_name = "remarkable2"
+    return _PAGE_PROFILES[profile_name]
+
+
 _THEME_FONTS = {
     "Academy": {
         "body": 'Georgia, "Times New Roman", serif',
@@ -126,7 +192,17 @@ def read_css(path):
 
 
 class Style:
-    def __init__(self, style: str = ""):
+    def __init__(self, style: str = "", style_dirs: Iterable[str] = ()):
+        """
+        Load a style by name.
+
+        `style_dirs` are extra directories searched for the style, before the
+        built-in styles. Each holds styles laid out like the built-in ones
+        (`<name>.css`, or a `<name>/` directory with a CSS file and an optional
+        `stylesheets.txt`).
+        """
+        self.style_dirs = tuple(str(path) for path in style_dirs)
+        self.revision: Optional[tuple] = None
         self.style_name = style or "FifthAvenue"
         if not self.read_style(self.style_name):
             if style:
@@ -134,17 +210,33 @@ class Style:
             self.style_name = "FifthAvenue"
             self.read_style(self.style_name)
 
-    def get_stylesheets(self) -> list[str]:
-        return list(getattr(self, "_stylesheets", []))
+    def get_stylesheets(
+        self, prefer_local: bool = True, fonts_dir: Optional[str] = None
+    ) -> list[str]:
+        """
+        The style's extra stylesheet URLs. With `prefer_local`, remote
+        stylesheets that `goosepaper fonts sync` has downloaded (to
+        `fonts_dir`, or by default `fonts.default_fonts_dir()`) are replaced
+        by their local `file://` copies.
+        """
+        stylesheets = list(getattr(self, "_stylesheets", []))
+        if not prefer_local:
+            return stylesheets
+        return [local_stylesheet(url, fonts_dir) or url for url in stylesheets]
+
+    def digest(self) -> str:
+        """
+        A hash of the style's CSS and stylesheet URLs. It changes when the
+        files the style was read from are edited.
+        """
+        return content_hash(
+            self.style_name,
+            getattr(self, "_css", ""),
+            *self.get_stylesheets(prefer_local=False),
+        )
 
     def get_page_profile(self, page_profile: str = "remarkable2") -> PageProfile:
-        profile_name = page_profile or "remarkable2"
-        if profile_name not in _PAGE_PROFILES:
-            print(
-                f"Oops! {profile_name} page profile not found or broken. Use default page profile."
-            )
-            profile_name = "remarkable2"
-        return _PAGE_PROFILES[profile_name]
+        return get_page_profile(page_profile)
 
     def get_css(
         self,
@@ -187,7 +279,7 @@ class Style:
         """
 
     def read_style(self, style: str) -> bool:
-        for root in _style_roots():
+        for root in _style_roots(getattr(self, "style_dirs", ())):
             css, stylesheets = _read_style_from_root(root, style)
             if css is not None:
                 self._stylesheets = stylesheets
@@ -205,10 +297,86 @@ class Style:
         return {"1col": 1, "2col": 2, "3col": 3}.get(layout, profile.max_auto_columns)
 
 
-def _style_roots():
+def available_styles(style_dirs: Iterable[str] = ()) -> list[str]:
+    names = []
+    for root in _style_roots(style_dirs):
+        if not root.is_dir():
+            continue
+        for entry in root.iterdir():
+            name = entry.name[:-4] if entry.name.endswith(".css") else entry.name
+            if (entry.is_dir() or entry.name.endswith(".css")) and name not in names:
+                names.append(name)
+    return sorted(names)
+
+
+class StyleRegistry:
+    """
+    Loads each style once and hands out the same Style object until one of
+    the files it could be read from is added, removed or modified.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._styles: Dict[Tuple[str, Tuple[str, ...]], Style] = {}
+
+    def get(self, style: str = "", style_dirs: Iterable[str] = ()) -> Style:
+        style_dirs = tuple(str(path) for path in style_dirs)
+        key = (style, style_dirs)
+        revision = _style_revision(style or "FifthAvenue", style_dirs)
+        with self._lock:
+            cached = self._styles.get(key)
+            if cached is not None and cached.revision == revision:
+                return cached
+        loaded = Style(style, style_dirs=style_dirs)
+        loaded.revision = revision
+        with self._lock:
+            self._styles[key] = loaded
+        return loaded
+
+    def clear(self) -> None:
+        with self._lock:
+            self._styles.clear()
+
+
+_REGISTRY = StyleRegistry()
+
+
+def get_style(style: str = "", style_dirs: Iterable[str] = ()) -> Style:
+    """
+    The Style called `style` from the process-wide registry.
+    """
+    return _REGISTRY.get(style, style_dirs)
+
+
+def _style_roots(style_dirs: Iterable[str] = ()):
+    for path in style_dirs:
+        yield Path(path).expanduser()
     yield resources.files("goosepaper").joinpath("assets", "styles")
 
 
+def _style_revision(style: str, style_dirs: Tuple[str, ...]) -> tuple:
+    """
+    The modification times of every file a style could be read from, so a
+    changed, added or deleted file gives a different revision.
+    """
+    stamps = []
+    for root in _style_roots(style_dirs):
+        directory = root.joinpath(style)
+        stamps.append(_mtime(root.joinpath(f"{style}.css")))
+        stamps.append(_mtime(directory))
+        if directory.is_dir():
+            for entry in sorted(directory.iterdir(), key=lambda entry: entry.name):
+                stamps.append((entry.name, _mtime(entry)))
+    return tuple(stamps)
+
+
+def _mtime(path) -> Optional[int]:
+    try:
+        return os.stat(path).st_mtime_ns
+    except (OSError, TypeError):
+        return None
+
+
 def _read_style_from_root(root, style):
     path = root.joinpath(style)
     if path.is_dir():
@@ -348,6 +516,13 @@ def _base_print_css(
         line-height: 1.25;
     }}
 
+    .edition-note {{
+        margin: 0.2rem 0 0;
+        font-size: 0.7em;
+        font-style: italic;
+        opacity: 0.7;
+    }}
+
     .table-of-contents {{
         margin: 0 0 0.85rem;
         padding: 0.15rem 0 0.45rem;
@@ -381,6 +556,10 @@ def _base_print_css(
         content: leader(dotted) target-counter(attr(href), page);
     }}
 
+    .table-of-contents__link[data-page]::after {{
+        content: leader(dotted) attr(data-page);
+    }}
+
     .utility-strip {{
         margin: 0 0 0.85rem;
         padding: 0.15rem 0 0.5rem;
@@ -588,6 +767,13 @@ def _base_print_css(
         font-size: 0.75em;
     }}
 
+    article > .stale-note {{
+        margin: 0 0 0.55rem;
+        font-size: 0.7em;
+        font-style: italic;
+        opacity: 0.7;
+    }}
+
     article.story-short > .story-headline {{
         font-size: 1.16em;
         line-height: 1.12;
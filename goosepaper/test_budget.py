@@ -0,0 +1,171 @@
+import re
+
+from .budget import PageBudget, fit_to_budget, trim_to_pages
+from .goosepaper import Goosepaper
+from .renderer import Renderer
+from .story import Story
+from .storyprovider.storyprovider import StoryProvider
+from .util import PlacementPreference, StoryPriority
+
+
+def _story(headline, words=300, priority=StoryPriority.DEFAULT, **kwargs):
+    return Story(
+        headline=headline,
+        body_text=" ".join(["word"] * words),
+        priority=priority,
+        **kwargs,
+    )
+
+
+class _ListProvider(StoryProvider):
+    def __init__(self, stories):
+        self.stories = stories
+
+    def get_stories(self, limit: int = 10, **kwargs):
+        return list(self.stories)
+
+
+def test_page_estimate_grows_with_words_and_font_size():
+    small = PageBudget(font_size=10)
+    large = PageBudget(font_size=18)
+    stories = [_story("a", 1000), _story("b", 1000)]
+
+    assert small.estimate_pages(stories) < large.estimate_pages(stories)
+    assert large.estimate_pages(stories[:1]) < large.estimate_pages(stories)
+    assert PageBudget(page_profile="paper_pro_move").estimate_pages(
+        stories
+    ) > PageBudget(page_profile="letter").estimate_pages(stories)
+
+
+def test_sources_take_turns_and_order_is_kept():
+    prolific = [_story(f"prolific {n}") for n in range(6)]
+    quiet = [_story(f"quiet {n}") for n in range(2)]
+    budget = PageBudget(max_words=1200)
+
+    result = fit_to_budget(prolific + quiet, [0] * 6 + [1] * 2, budget)
+
+    assert [story.headline for story in result.stories] == [
+        "prolific 0",
+        "prolific 1",
+        "quiet 0",
+        "quiet 1",
+    ]
+    assert len(result.dropped) == 4
+
+
+def test_priority_wins_over_fairness_and_small_stories_fill_gaps():
+    stories = [
+        _story("filler", 300),
+        _story("long", 900, StoryPriority.LOW),
+        _story("lead", 600, StoryPriority.BANNER),
+        _story("brief", 100, StoryPriority.LOW),
+        _story("weather", 50, placement_preference=PlacementPreference.EAR),
+    ]
+
+    result = fit_to_budget(stories, [0, 1, 2, 3, 4], PageBudget(max_words=1000))
+
+    assert [story.headline for story in result.stories] == [
+        "filler",
+        "lead",
+        "brief",
+        "weather",
+    ]
+
+
+def test_the_lead_story_is_kept_even_when_over_budget():
+    result = fit_to_budget([_story("huge", 5000)], [0], PageBudget(max_pages=1))
+
+    assert [story.headline for story in result.stories] == ["huge"]
+    assert result.estimated_pages > 1
+
+
+def test_trimming_leaves_out_the_stories_picked_last():
+    stories = [_story(f"story {n}", 400) for n in range(40)]
+    stories[39] = _story("lead", 400, StoryPriority.BANNER)
+    budget = PageBudget(max_pages=6)
+
+    result = trim_to_pages(stories, list(range(40)), budget, pages=12)
+
+    assert result.estimated_pages <= 6
+    assert (
+        budget.estimator.fitted_to(stories, 12).estimate_pages(result.stories)
+        == result.estimated_pages
+    )
+    assert result.stories[-1].headline == "lead"
+    assert result.dropped[-1].headline == "story 38"
+    assert [story.headline for story in result.stories][:2] == ["story 0", "story 1"]
+
+
+def test_fetch_edition_records_stories_over_budget():
+    paper = Goosepaper(
+        [
+            _ListProvider([_story("a1"), _story("a2"), _story("a3")]),
+            _ListProvider([_story("b1")]),
+        ]
+    )
+
+    edition = paper.fetch_edition(budget=PageBudget(max_words=600))
+
+    assert [story.headline for story in edition.stories] == ["a1", "b1"]
+    assert [story.headline for story in edition.over_budget] == ["a2", "a3"]
+
+
+class _PageCountingRenderer(Renderer):
+    """Lays each story out on a page of its own."""
+
+    def __init__(self):
+        super().__init__()
+        self.layouts = []
+
+    def render(self, html, style="", **settings):
+        stories = sorted(set(re.findall(r"Story-\d+", html)))
+        self.layouts.append(stories)
+        return _PagedDocument(len(stories))
+
+
+class _PagedDocument:
+    def __init__(self, pages):
+        self.pages = [None] * pages
+
+    def write_pdf(self, target):
+        with open(target, "wb") as fh:
+            fh.write(b"%PDF-")
+
+
+def _paged_paper(stories):
+    return Goosepaper([_ListProvider(stories)], renderer=_PageCountingRenderer())
+
+
+def test_max_pages_leaves_fetching_to_the_layout():
+    paper = _paged_paper([_story(f"Story-{n}", 900) for n in range(5)])
+
+    edition = paper.fetch_edition(budget=PageBudget(max_pages=2))
+
+    assert len(edition.stories) == 5
+    assert not edition.over_budget
+    assert paper.renderer.layouts == []
+
+
+def test_a_pdf_within_max_pages_is_laid_out_once(tmp_path):
+    paper = _paged_paper([_story(f"Story-{n}") for n in range(3)])
+    edition = paper.fetch_edition(budget=PageBudget(max_pages=3))
+
+    paper.to_pdf(str(tmp_path / "paper.pdf"), edition=edition)
+
+    assert len(paper.renderer.layouts) == 1
+    assert len(paper.renderer.layouts[0]) == 3
+
+
+def test_a_pdf_over_max_pages_is_trimmed_and_laid_out_once_more(tmp_path):
+    stories = [_story(f"Story-{n}") for n in range(8)]
+    stories[7] = _story("Story-7", priority=StoryPriority.BANNER)
+    paper = _paged_paper(stories)
+    edition = paper.fetch_edition(budget=PageBudget(max_pages=4))
+
+    paper.to_pdf(str(tmp_path / "paper.pdf"), edition=edition)
+
+    first, second = paper.renderer.layouts
+    assert len(first) == 8
+    assert 0 < len(second) <= 4
+    assert "Story-7" in second
+    assert (tmp_path / "paper.pdf").exists()
@@ -0,0 +1,146 @@
+import json
+import os
+import time
+
+from .cache import ArticleCache, FeedCache, LastGoodStore, canonical_url, main
+from .story import Story
+
+
+def test_canonical_url_drops_tracking_noise():
+    assert canonical_url(
+        "HTTPS://Example.com:443/story?utm_source=rss&b=2&a=1#comments"
+    ) == canonical_url("https://example.com/story?a=1&b=2")
+
+
+def test_article_cache_round_trips_by_url_and_entry_hash(tmp_path):
+    cache = ArticleCache(tmp_path)
+    cache.put("https://example.com/a?utm_medium=feed", "v1", "Headline", "<p>Body</p>")
+
+    assert cache.get("https://example.com/a", "v1") == ("Headline", "<p>Body</p>")
+    assert cache.get("https://example.com/a", "v2") is None
+
+
+def test_article_cache_ignores_and_prunes_expired_entries(tmp_path):
+    cache = ArticleCache(tmp_path, ttl_seconds=60)
+    cache.put("https://example.com/a", "v1", "Headline", "<p>Body</p>")
+    record = next(tmp_path.glob("*.json"))
+    payload = json.loads(record.read_text())
+    payload["stored_at"] = time.time() - 120
+    record.write_text(json.dumps(payload))
+
+    assert cache.get("https://example.com/a", "v1") is None
+    assert cache.prune() == 1
+    assert list(tmp_path.glob("*.json")) == []
+
+
+def test_article_cache_evicts_least_recently_used_over_budget(tmp_path):
+    cache = ArticleCache(tmp_path)
+    for index in range(3):
+        cache.put(f"https://example.com/{index}", "v1", "H", "x" * 500)
+    paths = {entry["url"]: entry["path"] for entry in cache.entries()}
+    now = time.time()
+    for age, index in enumerate([1, 0, 2]):
+        os.utime(paths[f"https://example.com/{index}"], (now - age, now - age))
+
+    newest_two = sum(entry["size"] for entry in cache.entries()[:2])
+    removed = cache.prune(max_bytes=newest_two)
+
+    assert removed == 1
+    assert cache.get("https://example.com/2", "v1") is None
+    assert cache.get("https://example.com/1", "v1") is not None
+
+
+
+def test_article_cache_enforces_its_size_on_writes_every_few_puts(tmp_path):
+    cache = ArticleCache(tmp_path, max_bytes=1, prune_every=3)
+
+    cache.put("https://example.com/0", "v1", "H", "x" * 500)
+    assert list(tmp_path.glob("*.json")) == []
+
+    cache.max_bytes = 10_000
+    for index in range(1, 4):
+        cache.put(f"https://example.com/{index}", "v1", "H", "x" * 500)
+    cache.max_bytes = 1
+    for index in range(4, 6):
+        cache.put(f"https://example.com/{index}", "v1", "H", "x" * 500)
+    assert len(list(tmp_path.glob("*.json"))) == 5
+    cache.put("https://example.com/6", "v1", "H", "x" * 500)
+    assert list(tmp_path.glob("*.json")) == []
+
+
+def test_feed_cache_prunes_unused_and_least_recently_used_feeds(tmp_path):
+    cache = FeedCache(tmp_path, prune_every=100)
+    for index in range(3):
+        cache.store(f"https://example.com/{index}.xml", {"n": index}, etag="x")
+    now = time.time()
+    for index, age in [(0, 200), (1, 50), (2, 100)]:
+        path = cache._path(f"https://example.com/{index}.xml")
+        os.utime(path, (now - age, now - age))
+
+    assert cache.load("https://example.com/2.xml") == {"n": 2}
+    assert cache.prune(max_age_seconds=150) == 1
+    assert cache.load("https://example.com/0.xml") is None
+
+    newest = cache._path("https://example.com/2.xml").stat().st_size
+    assert cache.prune(max_bytes=newest) == 1
+    assert cache.load("https://example.com/1.xml") is None
+    assert cache.load("https://example.com/2.xml") == {"n": 2}
+
+
+def test_feed_cache_prunes_on_writes(tmp_path):
+    stale = FeedCache(tmp_path)
+    stale.store("https://example.com/old.xml", {}, etag="x")
+    os.utime(stale._path("https://example.com/old.xml"), (0, 0))
+
+    FeedCache(tmp_path).store("https://example.com/new.xml", {}, etag="y")
+
+    assert [path.name for path in tmp_path.iterdir()] == [
+        FeedCache(tmp_path)._path("https://example.com/new.xml").name
+    ]
+
+
+def test_last_good_store_prunes_entries_too_old_to_use(tmp_path):
+    store = LastGoodStore(tmp_path, max_age_seconds=60, prune_every=100)
+    store.store("old", [Story(headline="Old", body_text="body")])
+    store.store("new", [Story(headline="New", body_text="body")])
+    os.utime(store._path("old"), (time.time() - 120, time.time() - 120))
+
+    assert store.prune() == 1
+    assert store.load("old") is None
+    assert store.load("new") is not None
+    assert store.prune(max_bytes=0) == 1
+    assert list(tmp_path.iterdir()) == []
+
+def test_last_good_store_returns_fresh_stories_only(tmp_path):
+    store = LastGoodStore(tmp_path, max_age_seconds=60)
+    store.store('{"type": "rss"}', [Story(headline="Kept", body_text="body")])
+
+    stories, _stored_at = store.load('{"type": "rss"}')
+    assert [story.headline for story in stories] == ["Kept"]
+    assert store.load('{"type": "reddit"}') is None
+
+    store.max_age_seconds = 0
+    time.sleep(0.01)
+    assert store.load('{"type": "rss"}') is None
+
+
+def test_cache_cli_prunes_and_clears(tmp_path, capsys):
+    cache = ArticleCache(tmp_path / "articles")
+    cache.put("https://example.com/a", "v1", "Headline", "<p>Body</p>")
+
+    assert main(["--cache-dir", str(tmp_path), "stats"]) == 0
+    assert "Articles: 1" in capsys.readouterr().out
+    assert main(["--cache-dir", str(tmp_path), "prune", "--max-age-hours", "0"]) == 0
+    assert "Pruned 1" in capsys.readouterr().out
+    (tmp_path / "notes.txt").write_text("mine")
+    assert main(["--cache-dir", str(tmp_path), "clear"]) == 0
+    assert not (tmp_path / "articles").exists()
+    assert (tmp_path / "notes.txt").read_text() == "mine"
+
+
+def test_cache_clear_refuses_directories_that_are_not_caches(tmp_path, capsys):
+    (tmp_path / "thesis.tex").write_text("years of work")
+
+    assert main(["--cache-dir", str(tmp_path), "clear"]) == 1
+    assert "doesn't look like a Goosepaper cache" in capsys.readouterr().out
+    assert (tmp_path / "thesis.tex").exists()
@@ -0,0 +1,192 @@
+import io
+import re
+from dataclasses import replace
+
+import pytest
+
+from .budget import PageBudget
+from .chunked import ChunkLayout, page_numbers, plan_chunks, render_chunked
+from .edition import Edition
+from .goosepaper import Goosepaper
+from .story import Story
+from .util import PlacementPreference
+
+
+def _edition():
+    def story(headline, section=None, placement=PlacementPreference.NONE):
+        return Story(
+            headline,
+            body_text="text",
+            section_title=section,
+            placement_preference=placement,
+        )
+
+    return Edition(
+        title="Weekly",
+        subtitle="",
+        stories=[
+            story("Weather", placement=PlacementPreference.UTILITY),
+            story("First"),
+            story("Second"),
+            story("Election", "World"),
+            story("Summit", "World"),
+            story("Third"),
+            story("Final", "Sports"),
+            story("Brief", placement=PlacementPreference.SIDEBAR),
+        ],
+    )
+
+
+def _plan(table_of_contents=True):
+    return Goosepaper([])._plan_html_document(
+        table_of_contents=table_of_contents, embed_styles=False, edition=_edition()
+    )
+
+
+def _headlines(chunk):
+    return [
+        item.headline
+        for item in chunk.utility_items + chunk.main_items + chunk.sidebar_items
+        if isinstance(item, Story)
+    ]
+
+
+def test_chunks_are_the_masthead_each_section_and_the_sidebar():
+    front, *chunks = plan_chunks(_plan())
+
+    assert "masthead" in front.header_html
+    assert _headlines(front) == ["Weather"]
+    assert front.toc_entries
+    assert [_headlines(chunk) for chunk in chunks] == [
+        ["First", "Second"],
+        ["Election", "Summit"],
+        ["Third"],
+        ["Final"],
+        ["Brief"],
+    ]
+    assert all(not chunk.header_html and not chunk.toc_entries for chunk in chunks)
+    assert "story-section-title" in chunks[1].main_items[0]
+
+
+def test_without_contents_the_first_chunk_shares_the_masthead_page():
+    front, *chunks = plan_chunks(_plan(table_of_contents=False))
+
+    assert _headlines(front) == ["Weather", "First", "Second"]
+    assert len(chunks) == 4
+
+
+def test_page_numbers_continue_across_chunks():
+    chunks = [
+        ChunkLayout("a.pdf", 2, {"a": (0, 0, 0), "b": (1, 0, 0)}),
+        ChunkLayout("b.pdf", 3, {"c": (2, 0, 0)}),
+    ]
+
+    assert page_numbers(chunks, first_page=2) == {"a": 2, "b": 3, "c": 6}
+
+
+def test_contents_print_explicit_page_numbers():
+    paper = Goosepaper([])
+    plan = _plan()
+    anchor = plan.toc_entries[1][1]
+
+    html = "".join(paper._iter_planned_html(plan))
+    numbered = "".join(
+        paper._iter_planned_html(replace(plan, page_numbers={anchor: 7}))
+    )
+
+    assert "data-page" not in html
+    assert f'href="#{anchor}" data-page="7"' in numbered
+
+
+class _Page:
+    height = 1000
+
+    def __init__(self, anchors=None, links=None):
+        self.anchors = anchors or {}
+        self.links = links or []
+
+
+class _Document:
+    """
+    Stands in for a WeasyPrint Document: every element with an id starts a
+    page, and the masthead needs a page per three contents entries.
+    """
+
+    def __init__(self, html):
+        anchors = re.findall(r'id="([^"]+)"', html)
+        targets = re.findall(r'href="#([^"]+)"', html)
+        links = [
+            ("internal", target, (10, 20 * index, 110, 20 * index + 15), None)
+            for index, target in enumerate(targets)
+        ]
+        self.pages = [_Page(links=links)] if 'class="masthead"' in html else []
+        self.pages += [_Page() for _ in range(len(targets) // 3)]
+        self.pages += [_Page({anchor: (5, 100, 50, 120)}) for anchor in anchors]
+
+    def write_pdf(self, path):
+        from pypdf import PdfWriter
+
+        writer = PdfWriter()
+        for _page in self.pages:
+            writer.add_blank_page(450, 750)
+        writer.write(path)
+
+
+def test_chunks_are_merged_with_links_to_their_pages():
+    pypdf = pytest.importorskip("pypdf")
+    paper = Goosepaper([])
+    plan = _plan()
+    rendered = []
+
+    def to_html(chunk):
+        rendered.append("".join(paper._iter_planned_html(chunk)))
+        return rendered[-1]
+
+    target = io.BytesIO()
+    pages = render_chunked(target, plan, to_html, _Document)
+
+    reader = pypdf.PdfReader(io.BytesIO(target.getvalue()))
+    assert len(reader.pages) == pages
+    # The masthead, two pages of contents and the utility story, then a page
+    # per section heading and story.
+    assert pages == 4 + 2 + 3 + 1 + 2 + 1
+    front_html = rendered[-1]
+    world = next(anchor for title, anchor in plan.toc_entries if title == "World")
+    assert f'href="#{world}" data-page="7"' in front_html
+
+    links = [
+        annotation.get_object()
+        for annotation in reader.pages[0]["/Annots"]
+        if annotation.get_object()["/Subtype"] == "/Link"
+    ]
+    link = next(
+        link
+        for link in links
+        if reader.get_page_number(link["/Dest"][0].get_object()) == 6
+    )
+    assert [float(value) for value in link["/Rect"]] == [7.5, 693.75, 82.5, 705]
+    assert [float(value) for value in link["/Dest"][2:4]] == [3.75, 675]
+
+
+def test_chunked_pdfs_over_max_pages_are_trimmed_before_they_are_written():
+    pypdf = pytest.importorskip("pypdf")
+
+    class Renderer:
+        def __init__(self):
+            self.mastheads = 0
+
+        def render(self, html, **settings):
+            self.mastheads += 'class="masthead"' in html
+            return _Document(html)
+
+    paper = Goosepaper([], renderer=Renderer())
+    untrimmed = io.BytesIO()
+    paper.to_pdf(untrimmed, edition=_edition(), chunked=True)
+    pages = len(pypdf.PdfReader(io.BytesIO(untrimmed.getvalue())).pages)
+    budget = PageBudget(max_pages=pages - 3)
+
+    target = io.BytesIO()
+    paper.to_pdf(target, edition=replace(_edition(), budget=budget), chunked=True)
+
+    assert paper.renderer.mastheads == 3
+    assert len(pypdf.PdfReader(io.BytesIO(target.getvalue())).pages) < pages
@@ -1,12 +1,16 @@
+import datetime
 import json
 import os
 import tempfile
 from pathlib import Path
 
 from .config import (
+    CacheSettings,
     ConfigError,
     DeliveryIntent,
     DeliverySettings,
+    RenderLimits,
+    Rendition,
     load_paper_config,
     load_user_config,
     resolve_delivery_settings,
@@ -237,6 +241,144 @@ def test_resolve_runtime_config_requires_output_for_nostory():
     )
 
 
+def test_resolve_runtime_config_accepts_repeated_outputs():
+    with _TempWorkspace() as tmp_path:
+        _write_json(
+            tmp_path / "goosepaper.json",
+            {"version": 2, "sources": [{"type": "text", "headline": "hello"}]},
+        )
+
+        config = resolve_runtime_config(["-o", "paper.pdf", "-o", "paper.epub"])
+
+        assert config.outputs == ["paper.pdf", "paper.epub"]
+        assert config.output == "paper.pdf"
+
+
+def test_resolve_runtime_config_deadline_flag_overrides_paper_setting():
+    with _TempWorkspace() as tmp_path:
+        os.environ["XDG_CONFIG_HOME"] = str(tmp_path / "xdg")
+        _write_json(
+            tmp_path / "goosepaper.json",
+            {
+                "version": 2,
+                "paper": {"deadline_seconds": 90},
+                "sources": [{"type": "text", "headline": "hello"}],
+            },
+        )
+
+        assert resolve_runtime_config([]).paper.deadline_seconds == 90
+        config = resolve_runtime_config(["--deadline", "30"])
+        assert config.paper.deadline_seconds == 30
+
+        _assert_config_error(
+            lambda: resolve_runtime_config(["--deadline", "0"]),
+            "--deadline",
+        )
+
+
+def test_renditions_come_from_paper_config_or_page_profile_flags():
+    with _TempWorkspace() as tmp_path:
+        os.environ["XDG_CONFIG_HOME"] = str(tmp_path / "xdg")
+        _write_json(
+            tmp_path / "goosepaper.json",
+            {
+                "version": 2,
+                "paper": {
+                    "renditions": [
+                        "remarkable2",
+                        {"page_profile": "paper_pro", "layout": "2col"},
+                    ]
+                },
+                "sources": [{"type": "text", "headline": "hello"}],
+            },
+        )
+
+        config = resolve_runtime_config([])
+        assert config.paper.renditions == (
+            Rendition("remarkable2"),
+            Rendition("paper_pro", "2col"),
+        )
+        assert [r.name for r in config.paper.renditions] == [
+            "remarkable2",
+            "paper_pro-2col",
+        ]
+
+        config = resolve_runtime_config(
+            ["--page-profile", "paper_pro_move", "--page-profile", "a4"]
+        )
+        assert config.paper.renditions == (
+            Rendition("paper_pro_move"),
+            Rendition("a4"),
+        )
+
+        _write_json(
+            tmp_path / "goosepaper.json",
+            {
+                "version": 2,
+                "paper": {"renditions": [{"layout": "2col"}]},
+                "sources": [],
+            },
+        )
+        _assert_config_error(
+            lambda: resolve_runtime_config([]), "must set a page_profile"
+        )
+
+
+def test_edition_time_comes_from_flag_or_source_date_epoch(monkeypatch):
+    with _TempWorkspace() as tmp_path:
+        os.environ["XDG_CONFIG_HOME"] = str(tmp_path / "xdg")
+        _write_json(
+            tmp_path / "goosepaper.json",
+            {"version": 2, "sources": [{"type": "text", "headline": "hello"}]},
+        )
+        monkeypatch.delenv("SOURCE_DATE_EPOCH", raising=False)
+
+        assert resolve_runtime_config([]).edition_time is None
+
+        monkeypatch.setenv("SOURCE_DATE_EPOCH", "1769839200")
+        assert resolve_runtime_config([]).edition_time == datetime.datetime(
+            2026, 1, 31, 6, 0, tzinfo=datetime.timezone.utc
+        )
+
+        config = resolve_runtime_config(["--edition-time", "2026-02-01T07:30:00Z"])
+        assert config.edition_time == datetime.datetime(
+            2026, 2, 1, 7, 30, tzinfo=datetime.timezone.utc
+        )
+
+        _assert_config_error(
+            lambda: resolve_runtime_config(["--edition-time", "tomorrow"]),
+            "--edition-time",
+        )
+        monkeypatch.setenv("SOURCE_DATE_EPOCH", "yesterday")
+        _assert_config_error(lambda: resolve_runtime_config([]), "SOURCE_DATE_EPOCH")
+
+
+def test_style_dirs_are_resolved_relative_to_the_paper_config():
+    with _TempWorkspace() as tmp_path:
+        config_path = tmp_path / "papers" / "paper.json"
+        _write_json(
+            config_path,
+            {
+                "version": 2,
+                "paper": {"style_dirs": ["styles", "/opt/goosepaper/styles"]},
+                "sources": [],
+            },
+        )
+
+        paper = load_paper_config(config_path).paper
+
+        assert paper.style_dirs == (
+            str(tmp_path / "papers" / "styles"),
+            "/opt/goosepaper/styles",
+        )
+
+        _write_json(
+            config_path,
+            {"version": 2, "paper": {"style_dirs": "styles"}, "sources": []},
+        )
+        _assert_config_error(lambda: load_paper_config(config_path), "style_dirs")
+
+
 def test_load_paper_config_rejects_invalid_rss_byline_mode():
     with _TempWorkspace() as tmp_path:
         config_path = tmp_path / "paper.json"
@@ -444,3 +586,150 @@ def test_load_paper_config_rejects_invalid_weather_clock_format():
             lambda: load_paper_config(config_path),
             'clock_format must be either "12h" or "24h"',
         )
+
+
+def test_paper_images_mode_is_validated():
+    with _TempWorkspace() as tmp_path:
+        config_path = tmp_path / "paper.json"
+        _write_json(
+            config_path,
+            {"version": 2, "paper": {"images": "dither"}, "sources": []},
+        )
+        assert load_paper_config(config_path).paper.images == "dither"
+
+        _write_json(
+            config_path,
+            {"version": 2, "paper": {"images": "sepia"}, "sources": []},
+        )
+        _assert_config_error(lambda: load_paper_config(config_path), "images")
+
+
+def test_paper_page_budget_is_validated():
+    with _TempWorkspace() as tmp_path:
+        config_path = tmp_path / "paper.json"
+        _write_json(
+            config_path,
+            {"version": 2, "paper": {"max_pages": 12}, "sources": []},
+        )
+        paper = load_paper_config(config_path).paper
+        assert (paper.max_pages, paper.max_words) == (12, None)
+
+        _write_json(
+            config_path,
+            {"version": 2, "paper": {"max_words": 0}, "sources": []},
+        )
+        _assert_config_error(lambda: load_paper_config(config_path), "max_words")
+
+
+def test_paper_chunked_is_validated():
+    with _TempWorkspace() as tmp_path:
+        config_path = tmp_path / "paper.json"
+        _write_json(
+            config_path,
+            {"version": 2, "paper": {"chunked": True}, "sources": []},
+        )
+        assert load_paper_config(config_path).paper.chunked is True
+
+        _write_json(
+            config_path,
+            {"version": 2, "paper": {"chunked": "yes"}, "sources": []},
+        )
+        _assert_config_error(lambda: load_paper_config(config_path), "chunked")
+
+
+def test_fonts_dir_comes_from_paper_config_or_flag():
+    with _TempWorkspace() as tmp_path:
+        os.environ["XDG_CONFIG_HOME"] = str(tmp_path / "xdg")
+        _write_json(
+            tmp_path / "goosepaper.json",
+            {
+                "version": 2,
+                "paper": {"fonts_dir": "fonts"},
+                "sources": [{"type": "text", "headline": "hello"}],
+            },
+        )
+
+        assert resolve_runtime_config([]).paper.fonts_dir == str(
+            tmp_path.resolve() / "fonts"
+        )
+        config = resolve_runtime_config(["--fonts-dir", str(tmp_path / "other")])
+        assert config.paper.fonts_dir == str(tmp_path / "other")
+
+        _write_json(
+            tmp_path / "goosepaper.json",
+            {"version": 2, "paper": {"fonts_dir": 3}, "sources": []},
+        )
+        _assert_config_error(lambda: resolve_runtime_config([]), "fonts_dir")
+
+
+def test_render_limits_apply_with_and_without_the_cache():
+    with _TempWorkspace() as tmp_path:
+        os.environ["XDG_CONFIG_HOME"] = str(tmp_path / "xdg")
+        _write_json(
+            tmp_path / "paper.json",
+            {"version": 2, "sources": [{"type": "text", "headline": "hello"}]},
+        )
+        _write_json(
+            tmp_path / "xdg" / "goosepaper" / "config.json",
+            {"version": 2, "render": {"memory_mb": 512}},
+        )
+
+        assert resolve_runtime_config(["-c", "paper.json"]).render.memory_mb == 512
+        config = resolve_runtime_config(["-c", "paper.json", "--no-cache"])
+        assert config.render.memory_mb == 512
+
+
+def test_render_only_runs_survive_a_bad_user_config():
+    with _TempWorkspace() as tmp_path:
+        os.environ["XDG_CONFIG_HOME"] = str(tmp_path / "xdg")
+        user_config = tmp_path / "xdg" / "goosepaper" / "config.json"
+        _write_json(
+            tmp_path / "paper.json",
+            {"version": 2, "sources": [{"type": "text", "headline": "hello"}]},
+        )
+
+        _write_json(user_config, {"upload": True, "folder": "News"})
+        assert resolve_runtime_config(["-c", "paper.json"]).render == RenderLimits()
+        _assert_config_error(
+            lambda: resolve_runtime_config(["-c", "paper.json", "--deliver"]),
+            "user config format has changed",
+        )
+
+        user_config.write_text("{not json", encoding="utf-8")
+        config = resolve_runtime_config(["-c", "paper.json", "--no-cache"])
+        assert config.render == RenderLimits()
+
+        _write_json(
+            user_config,
+            {
+                "version": 2,
+                "delivery_defaults": {"replace_mode": "sometimes"},
+                "cache": {"article_ttl_hours": -1},
+                "render": {"memory_mb": 512},
+            },
+        )
+        config = resolve_runtime_config(["-c", "paper.json"])
+        assert config.render.memory_mb == 512
+        assert config.cache == CacheSettings()
+        _assert_config_error(
+            lambda: resolve_runtime_config(["-c", "paper.json", "--showconfig"]),
+            "replace_mode",
+        )
+
+
+def test_user_config_render_limits():
+    with _TempWorkspace() as tmp_path:
+        config_path = tmp_path / "user.json"
+        _write_json(
+            config_path,
+            {"version": 2, "render": {"memory_mb": 1536, "timeout_seconds": 120}},
+        )
+
+        render = load_user_config(config_path).render
+
+        assert render == RenderLimits(memory_mb=1536, timeout_seconds=120)
+        assert render.enabled
+        assert not RenderLimits().enabled
+
+        _write_json(config_path, {"version": 2, "render": {"cpu_seconds": -1}})
+        _assert_config_error(lambda: load_user_config(config_path), "cpu_seconds")
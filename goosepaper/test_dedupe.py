@@ -0,0 +1,96 @@
+import datetime
+import random
+
+from . import dedupe
+from .dedupe import deduplicate, minhash, similarity
+from .story import Story
+
+WIRE_COPY = (
+    "The city council voted on Tuesday night to approve a new budget that "
+    "expands the number of bus routes, repairs three aging bridges across the "
+    "river, and adds funding for public libraries to stay open on weekends "
+    "through the end of next year, officials said after the meeting."
+)
+
+
+def _random_text(rng, vocabulary, words=80):
+    return " ".join(rng.choice(vocabulary) for _ in range(words))
+
+
+def test_exact_duplicates_match_on_canonical_url_and_normalized_headline():
+    first = Story("Bridge Repairs Approved!", body_text="one", url="https://a.example/x")
+    same_url = Story(
+        "Different headline",
+        body_text="two",
+        url="https://A.example/x?utm_source=rss",
+    )
+    same_headline = Story("bridge repairs approved", body_text="three")
+    other = Story("Weather", body_text="four")
+
+    result = deduplicate([first, same_url, same_headline, other])
+
+    assert result.stories == (first, other)
+    assert len(result.clusters) == 1
+    assert result.clusters[0].kept is first
+    assert result.clusters[0].dropped == (same_url, same_headline)
+    assert result.clusters[0].reasons == ("url", "headline")
+
+
+def test_recurring_headlines_from_different_dates_are_kept():
+    monday = datetime.datetime(2026, 10, 12)
+    tuesday = datetime.datetime(2026, 10, 13)
+    stories = [
+        Story("Today's Current Events", body_text="one", date=monday),
+        Story("Today's Current Events", body_text="two", date=tuesday),
+        Story("today's current events", body_text="three", date=tuesday),
+    ]
+
+    result = deduplicate(stories)
+
+    assert result.stories == tuple(stories[:2])
+    assert result.clusters[0].dropped == (stories[2],)
+
+
+def test_near_duplicates_are_clustered_by_text_similarity():
+    original = Story("Council passes budget", body_text=WIRE_COPY)
+    edited = Story(
+        "Budget approved by city council",
+        body_text=WIRE_COPY.replace("Tuesday night", "Tuesday evening"),
+    )
+    unrelated = Story(
+        "Local team wins",
+        body_text=(
+            "The home team scored twice in the final minutes to win the "
+            "championship game in front of a sold out crowd on Saturday."
+        ),
+    )
+
+    assert similarity(minhash(original.plain_text()), minhash(edited.plain_text())) > 0.5
+
+    result = deduplicate([original, edited, unrelated])
+
+    assert result.stories == (original, unrelated)
+    assert result.clusters[0].reasons == ("similar text",)
+    assert "Kept \"Council passes budget\"" in result.clusters[0].describe()
+
+
+def test_near_duplicate_search_only_compares_candidates(monkeypatch):
+    rng = random.Random(7)
+    vocabulary = [f"word{index}" for index in range(5000)]
+    stories = [
+        Story(f"Story {index}", body_text=_random_text(rng, vocabulary))
+        for index in range(1500)
+    ]
+    comparisons = {"count": 0}
+    real_similarity = dedupe.similarity
+
+    def counting_similarity(left, right):
+        comparisons["count"] += 1
+        return real_similarity(left, right)
+
+    monkeypatch.setattr(dedupe, "similarity", counting_similarity)
+
+    result = deduplicate(stories)
+
+    assert len(result.stories) == 1500
+    assert comparisons["count"] < len(stories)
@@ -0,0 +1,113 @@
+import json
+import math
+from pathlib import Path
+
+import pytest
+
+from .__main__ import main
+from .estimate import PageEstimator, calibration_for
+from .story import Story
+from .styles import get_page_profile
+from .util import PlacementPreference
+
+PARAGRAPH = "<p>" + " ".join(["council budget bridge"] * 30) + "</p>"
+
+
+def _stories(count, paragraphs=4):
+    return [
+        Story(f"Story {index}", body_html=PARAGRAPH * paragraphs)
+        for index in range(count)
+    ]
+
+
+def test_columns_and_font_size_set_the_measure():
+    profile = get_page_profile("remarkable2")
+
+    one = PageEstimator(profile, font_size=14, columns=1)
+    two = PageEstimator(profile, font_size=14, columns=2)
+    large = PageEstimator(profile, font_size=20, columns=1)
+
+    assert two.chars_per_line < one.chars_per_line / 2 < two.chars_per_line + 2
+    assert large.chars_per_line < one.chars_per_line
+    assert two.lines_per_page > one.lines_per_page
+
+
+def test_story_height_grows_with_text_and_masthead_stories_are_free():
+    estimator = PageEstimator(get_page_profile("letter"), font_size=12, columns=2)
+    short, long = _stories(1, 1)[0], _stories(1, 6)[0]
+    ear = Story(
+        "Weather", body_text="Sunny", placement_preference=PlacementPreference.EAR
+    )
+
+    assert estimator.story_lines(short) < estimator.story_lines(long)
+    assert estimator.story_height_inches(long) > 1
+    assert estimator.story_lines(ear) == 0
+
+
+def test_page_estimate_scales_with_the_edition():
+    estimator = PageEstimator(
+        get_page_profile("remarkable2"), calibration=calibration_for("FifthAvenue")
+    )
+
+    ten = estimator.estimate_pages(_stories(10))
+    twenty = estimator.estimate_pages(_stories(20))
+
+    assert 1 < ten < twenty < 2.2 * ten
+
+
+
+def test_fitted_estimator_reproduces_the_real_page_count():
+    estimator = PageEstimator(
+        get_page_profile("remarkable2"), calibration=calibration_for("Autumn")
+    )
+    stories = _stories(12)
+
+    fitted = estimator.fitted_to(stories, 9)
+
+    assert fitted.estimate_pages(stories) == pytest.approx(9)
+    assert fitted.chars_per_line == estimator.chars_per_line
+    assert fitted.estimate_pages(stories[:6]) < 5
+
+
+RECORDING = Path(__file__).parents[1] / "benchmarks" / "page_counts.json"
+
+
+@pytest.mark.skipif(
+    not RECORDING.is_file(),
+    reason="record real page counts with "
+    "'python -m benchmarks.page_estimate --record benchmarks/page_counts.json'",
+)
+def test_calibrations_are_within_a_page_of_recorded_renders():
+    from benchmarks.page_estimate import estimate, load_recording
+
+    misses = []
+    for case, pages in load_recording(RECORDING):
+        estimated = math.ceil(estimate(case)[0])
+        if abs(estimated - pages) > 1:
+            misses.append(f"{case}: estimated {estimated}, rendered {pages}")
+
+    assert not misses, "\n".join(misses)
+
+def test_cli_estimate_prints_page_counts_without_rendering(
+    tmp_path, monkeypatch, capsys
+):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("XDG_CONFIG_HOME", str(tmp_path / "config"))
+    (tmp_path / "goosepaper.json").write_text(
+        json.dumps(
+            {
+                "version": 2,
+                "sources": [{"type": "text", "headline": "Hello", "text": "Hi"}],
+            }
+        ),
+        encoding="utf-8",
+    )
+
+    args = ["-o", "paper.pdf", "-o", "paper.epub", "--estimate", "--no-cache"]
+    assert main(args) == 0
+
+    output = capsys.readouterr().out
+    assert "paper.pdf: about 1 page(s) in 2 column(s)" in output
+    assert "rough previews" in output
+    assert "paper.epub" not in output
+    assert not (tmp_path / "paper.pdf").exists()
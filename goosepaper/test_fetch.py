@@ -0,0 +1,155 @@
+import threading
+import time
+
+import pytest
+
+from . import fetch
+from .cache import FeedCache
+from .deadline import Deadline, DeadlineExceeded, deadline_scope
+from .version import __version__
+
+
+def test_client_sends_goosepaper_user_agent_and_default_timeout():
+    transport = fetch.MockTransport(lambda request: "hello")
+    client = fetch.HttpClient(transport=transport)
+
+    response = client.get("https://example.com/feed.xml")
+
+    assert response.text == "hello"
+    assert transport.requests[0].headers["User-Agent"] == f"goosepaper/{__version__}"
+    assert transport.timeouts[0] == fetch.DEFAULT_TIMEOUT
+
+
+def test_client_pools_connections_per_host():
+    client = fetch.HttpClient(pool_connections=3, pool_maxsize=2)
+
+    adapter = client.session.get_adapter("https://example.com/")
+
+    assert adapter is client.transport
+    assert adapter._pool_connections == 3
+    assert adapter._pool_maxsize == 2
+    assert adapter._pool_block is False
+
+
+def test_waiting_for_a_busy_host_stops_at_the_deadline():
+    release = threading.Event()
+    started = threading.Event()
+
+    def handler(request):
+        if request.url.endswith("/a"):
+            started.set()
+            release.wait(5)
+        return b"done"
+
+    client = fetch.HttpClient(transport=fetch.MockTransport(handler), pool_maxsize=1)
+    busy = threading.Thread(target=client.get, args=("https://example.com/a",))
+    busy.start()
+    try:
+        started.wait(5)
+        with deadline_scope(Deadline(0.2)):
+            began = time.monotonic()
+            with pytest.raises(DeadlineExceeded, match="example.com"):
+                client.get("https://example.com/b")
+            assert time.monotonic() - began < 2
+        assert client.get("https://other.example.com/").content == b"done"
+    finally:
+        release.set()
+        busy.join()
+
+
+def test_mock_response_can_report_errors():
+    transport = fetch.MockTransport(
+        lambda request: fetch.mock_response(request, status_code=404)
+    )
+    client = fetch.HttpClient(transport=transport)
+
+    assert client.get("https://example.com/missing").status_code == 404
+
+
+def test_set_client_replaces_the_shared_client():
+    transport = fetch.MockTransport(lambda request: b"shared")
+    previous = fetch.set_client(fetch.HttpClient(transport=transport))
+    try:
+        assert fetch.get("https://example.com/").content == b"shared"
+    finally:
+        fetch.set_client(previous)
+
+
+def test_get_feed_reuses_parsed_feed_on_not_modified(tmp_path):
+    cache = FeedCache(tmp_path)
+    parsed = []
+
+    def handler(request):
+        if request.headers.get("If-None-Match") == '"v1"':
+            assert request.headers["If-Modified-Since"] == "Sat, 17 Oct 2026 10:00:00 GMT"
+            return fetch.mock_response(request, status_code=304)
+        return fetch.mock_response(
+            request,
+            content=b"<rss>v1</rss>",
+            headers={"ETag": '"v1"', "Last-Modified": "Sat, 17 Oct 2026 10:00:00 GMT"},
+        )
+
+    def parse(content, response_headers):
+        parsed.append(content)
+        return {"entries": [content.decode("utf-8")]}
+
+    transport = fetch.MockTransport(handler)
+    previous = fetch.set_client(fetch.HttpClient(transport=transport))
+    try:
+        first = fetch.get_feed("https://example.com/feed.xml", parse, cache=cache)
+        second = fetch.get_feed("https://example.com/feed.xml", parse, cache=cache)
+    finally:
+        fetch.set_client(previous)
+
+    assert first == second == {"entries": ["<rss>v1</rss>"]}
+    assert parsed == [b"<rss>v1</rss>"]
+    assert [r.headers.get("If-None-Match") for r in transport.requests] == [None, '"v1"']
+
+
+def test_get_feed_skips_cache_without_validators(tmp_path):
+    cache = FeedCache(tmp_path)
+    transport = fetch.MockTransport(lambda request: b"<rss></rss>")
+    previous = fetch.set_client(fetch.HttpClient(transport=transport))
+    try:
+        fetch.get_feed("https://example.com/feed.xml", lambda c, response_headers: c, cache=cache)
+        fetch.get_feed("https://example.com/feed.xml", lambda c, response_headers: c, cache=cache)
+    finally:
+        fetch.set_client(previous)
+
+    assert list(tmp_path.iterdir()) == []
+    assert "If-None-Match" not in transport.requests[1].headers
+
+
+def test_get_feed_resolves_relative_links_against_the_final_url():
+    feedparser = pytest.importorskip("feedparser")
+    feed = (
+        b'<?xml version="1.0"?><rss version="2.0"><channel><title>News</title>'
+        b"<item><title>Story</title><link>/stories/1</link>"
+        b'<description>&lt;a href="/more"&gt;More&lt;/a&gt;</description>'
+        b"</item></channel></rss>"
+    )
+
+    def handler(request):
+        if request.url.endswith("/old.xml"):
+            return fetch.mock_response(
+                request,
+                status_code=301,
+                headers={"Location": "https://news.example.com/feed.xml"},
+            )
+        return fetch.mock_response(
+            request,
+            content=feed,
+            headers={"Content-Type": "application/rss+xml; charset=utf-8"},
+        )
+
+    transport = fetch.MockTransport(handler)
+    previous = fetch.set_client(fetch.HttpClient(transport=transport))
+    try:
+        parsed = fetch.get_feed("https://example.com/old.xml", feedparser.parse)
+    finally:
+        fetch.set_client(previous)
+
+    entry = parsed.entries[0]
+    assert entry.link == "https://news.example.com/stories/1"
+    assert 'href="https://news.example.com/more"' in entry.description
+    assert parsed.headers["content-type"].startswith("application/rss+xml")
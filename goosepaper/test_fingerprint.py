@@ -0,0 +1,88 @@
+import json
+
+from .__main__ import UNCHANGED_EXIT_CODE, main
+from .edition import Edition
+from .fingerprint import edition_fingerprint, fingerprint_path
+from .story import Story
+
+
+def _edition(*headlines):
+    return Edition(
+        title="Paper",
+        subtitle="now",
+        stories=[Story(headline=headline, body_text="body") for headline in headlines],
+    )
+
+
+def test_fingerprint_depends_on_stories_order_and_settings():
+    first = edition_fingerprint(_edition("a", "b"), {"font_size": 14})
+
+    assert first == edition_fingerprint(_edition("a", "b"), {"font_size": 14})
+    assert first != edition_fingerprint(_edition("b", "a"), {"font_size": 14})
+    assert first != edition_fingerprint(_edition("a", "b"), {"font_size": 12})
+
+    stale = _edition("a", "b")
+    stale.stories[0].stale = True
+    assert first != edition_fingerprint(stale, {"font_size": 14})
+
+
+def test_cli_skips_unchanged_editions(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("XDG_CONFIG_HOME", str(tmp_path / "config"))
+
+    def write_config(font_size):
+        (tmp_path / "goosepaper.json").write_text(
+            json.dumps(
+                {
+                    "version": 2,
+                    "paper": {"font_size": font_size},
+                    "sources": [{"type": "text", "headline": "Hello"}],
+                }
+            ),
+            encoding="utf-8",
+        )
+
+    write_config(14)
+    args = ["-o", "paper.html", "--no-cache"]
+
+    assert main(args) == 0
+    assert fingerprint_path("paper.html").is_file()
+    (tmp_path / "paper.html").write_text("untouched", encoding="utf-8")
+
+    assert main(args) == UNCHANGED_EXIT_CODE
+    assert (tmp_path / "paper.html").read_text() == "untouched"
+
+    assert main([*args, "--force"]) == 0
+    assert (tmp_path / "paper.html").read_text() != "untouched"
+
+    write_config(16)
+    assert main(args) == 0
+
+    (tmp_path / "paper.html").unlink()
+    assert main(args) == 0
+
+
+def test_cli_renders_again_after_a_style_is_edited(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("XDG_CONFIG_HOME", str(tmp_path / "config"))
+    style_path = tmp_path / "styles" / "Mine.css"
+    style_path.parent.mkdir()
+    style_path.write_text("body { color: black; }", encoding="utf-8")
+    (tmp_path / "goosepaper.json").write_text(
+        json.dumps(
+            {
+                "version": 2,
+                "paper": {"style": "Mine", "style_dirs": ["styles"]},
+                "sources": [{"type": "text", "headline": "Hello"}],
+            }
+        ),
+        encoding="utf-8",
+    )
+    args = ["-o", "paper.html", "--no-cache"]
+
+    assert main(args) == 0
+    assert main(args) == UNCHANGED_EXIT_CODE
+
+    style_path.write_text("body { color: navy; }", encoding="utf-8")
+    assert main(args) == 0
+    assert "navy" in (tmp_path / "paper.html").read_text()
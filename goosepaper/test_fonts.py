@@ -0,0 +1,137 @@
+import json
+import re
+import sys
+import types
+import urllib.parse
+
+from . import fonts
+from .cache import main as cache_main
+from .renderer import Renderer
+from .styles import Style
+
+STYLESHEET_URL = "https://fonts.googleapis.com/css?family=Oswald"
+FONT_URL = "https://fonts.gstatic.com/s/oswald/v1/oswald.ttf"
+
+
+def _serve_fonts(request):
+    if request.url == STYLESHEET_URL:
+        return (
+            "@font-face { font-family: 'Oswald'; "
+            f"src: url({FONT_URL}) format('truetype'); }}"
+        )
+    if request.url == FONT_URL:
+        return b"\x00\x01font-bytes"
+    raise AssertionError(f"unexpected request for {request.url}")
+
+
+def test_sync_vendors_stylesheet_and_fonts(tmp_path, use_transport):
+    use_transport(_serve_fonts)
+
+    path = fonts.sync_stylesheet(STYLESHEET_URL, tmp_path)
+
+    css = path.read_text()
+    assert "fonts.gstatic.com" not in css
+    font_files = list((tmp_path / "files").iterdir())
+    assert len(font_files) == 1
+    assert font_files[0].suffix == ".ttf"
+    assert f"url(files/{font_files[0].name})" in css
+    assert fonts.local_stylesheet(STYLESHEET_URL, tmp_path) == path.resolve().as_uri()
+
+
+def test_style_prefers_synced_stylesheets(monkeypatch, tmp_path, use_transport):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    remote = Style("Autumn").get_stylesheets()
+    assert all(url.startswith("https://") for url in remote)
+
+    use_transport(_serve_fonts)
+    fonts.sync_stylesheet(STYLESHEET_URL)
+
+    stylesheets = Style("Autumn").get_stylesheets()
+    assert stylesheets[0].startswith("file://")
+    assert stylesheets[1:] == remote[1:]
+    assert Style("Autumn").get_stylesheets(prefer_local=False) == remote
+
+
+def test_fonts_synced_to_a_custom_directory_are_used(
+    monkeypatch, tmp_path, use_transport
+):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    monkeypatch.delenv("GOOSEPAPER_FONTS_DIR", raising=False)
+    use_transport(_serve_fonts)
+    fonts_dir = tmp_path / "fonts"
+    path = fonts.sync_stylesheet(STYLESHEET_URL, fonts_dir)
+    monkeypatch.setattr(Renderer, "_parse_css", lambda self, url: url)
+
+    assert Style("Autumn").get_stylesheets()[0] == STYLESHEET_URL
+    assert Style("Autumn").get_stylesheets(fonts_dir=str(fonts_dir))[0] == (
+        path.resolve().as_uri()
+    )
+    assert Renderer(fonts_dir=str(fonts_dir)).stylesheets("Autumn")[0] == (
+        path.resolve().as_uri()
+    )
+
+
+def test_synced_font_urls_resolve_in_the_fonts_directory(
+    monkeypatch, tmp_path, use_transport
+):
+    class CSS:
+        def __init__(self, url=None, string=None, base_url=None, font_config=None):
+            # Like WeasyPrint, a stylesheet loaded by URL is its own base.
+            self.base_url = base_url or url
+
+    monkeypatch.setitem(sys.modules, "weasyprint", types.SimpleNamespace(CSS=CSS))
+    use_transport(_serve_fonts)
+    fonts_dir = tmp_path / "fonts"
+    path = fonts.sync_stylesheet(STYLESHEET_URL, fonts_dir)
+    reference = re.search(r"url\((files/[^)]+)\)", path.read_text()).group(1)
+    renderer = Renderer(base_url=str(tmp_path / "paper"), fonts_dir=str(fonts_dir))
+    renderer._font_config = object()
+
+    stylesheet = renderer.stylesheets("Autumn")[0]
+    font = urllib.parse.urljoin(stylesheet.base_url, reference)
+
+    assert font == (fonts_dir / reference).resolve().as_uri()
+    assert (fonts_dir / reference).is_file()
+    assert renderer.css("Autumn").base_url == str(tmp_path / "paper")
+
+
+def test_cache_clear_keeps_synced_fonts(monkeypatch, tmp_path, use_transport):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    monkeypatch.setenv("XDG_CONFIG_HOME", str(tmp_path / "config"))
+    monkeypatch.delenv("GOOSEPAPER_FONTS_DIR", raising=False)
+    use_transport(_serve_fonts)
+    path = fonts.sync_stylesheet(STYLESHEET_URL)
+    (tmp_path / "cache" / "goosepaper" / "feeds").mkdir()
+
+    assert cache_main(["clear"]) == 0
+    assert path.is_file()
+    assert not (tmp_path / "cache" / "goosepaper" / "feeds").exists()
+    assert cache_main(["clear"]) == 0
+    assert fonts.local_stylesheet(STYLESHEET_URL) == path.resolve().as_uri()
+
+
+def test_fonts_commands_use_the_paper_configs_style_dirs(
+    monkeypatch, tmp_path, capsys, use_transport
+):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("GOOSEPAPER_FONTS_DIR", raising=False)
+    use_transport(_serve_fonts)
+    (tmp_path / "styles" / "Inkjet").mkdir(parents=True)
+    (tmp_path / "styles" / "Inkjet" / "inkjet.css").write_text(".inkjet {}")
+    (tmp_path / "styles" / "Inkjet" / "stylesheets.txt").write_text(STYLESHEET_URL)
+    (tmp_path / "goosepaper.json").write_text(
+        json.dumps(
+            {
+                "version": 2,
+                "paper": {"style_dirs": ["styles"], "fonts_dir": "fonts"},
+                "sources": [],
+            }
+        )
+    )
+
+    assert STYLESHEET_URL not in fonts.remote_stylesheets(["Inkjet"])
+    assert fonts.main(["sync", "Inkjet"]) == 0
+    assert fonts.local_stylesheet(STYLESHEET_URL, tmp_path / "fonts") is not None
+
+    assert fonts.main(["status"]) == 0
+    assert f"synced  {STYLESHEET_URL}" in capsys.readouterr().out
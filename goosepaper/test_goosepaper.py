@@ -1,6 +1,19 @@
+import datetime
+import io
+import os
+import subprocess
+import sys
+import textwrap
+import threading
+import time
+import zipfile
+
+from . import goosepaper as goosepaper_module
+from .cache import LastGoodStore
+from .edition import Edition
 from .goosepaper import Goosepaper
 from .story import Story
-from .styles import Style
+from .styles import Style, StyleRegistry, available_styles
 from .util import PlacementPreference
 
 from .storyprovider.storyprovider import LoremStoryProvider
@@ -33,6 +46,295 @@ def test_skips_failing_providers_and_keeps_rendering():
     assert len(stories) == 2
 
 
+def test_failed_provider_falls_back_to_last_good_stories(monkeypatch, tmp_path):
+    monkeypatch.setattr(
+        goosepaper_module, "get_last_good_store", lambda: LastGoodStore(tmp_path)
+    )
+
+    class FlakyProvider:
+        def __init__(self, fail):
+            self.fail = fail
+            self.source_key = '{"type": "flaky"}'
+
+        def get_stories(self):
+            if self.fail:
+                raise RuntimeError("upstream is down")
+            return [Story(headline="Yesterday's news", body_text="body")]
+
+    Goosepaper([FlakyProvider(fail=False)]).fetch_edition()
+    g = Goosepaper([FlakyProvider(fail=True)])
+    edition = g.fetch_edition()
+
+    assert [story.headline for story in edition.stories] == ["Yesterday's news"]
+    assert edition.stories[0].stale is True
+    assert edition.stale_sources == ("FlakyProvider",)
+    assert "story-stale" in g.to_html(edition=edition)
+
+
+def test_fetches_providers_concurrently_in_configured_order():
+    barrier = threading.Barrier(3, timeout=5)
+
+    class SlowProvider:
+        def __init__(self, headline, delay):
+            self.headline = headline
+            self.delay = delay
+
+        def get_stories(self):
+            barrier.wait()
+            time.sleep(self.delay)
+            return [Story(headline=self.headline, body_text="body")]
+
+    g = Goosepaper(
+        [
+            SlowProvider("first", 0.05),
+            SlowProvider("second", 0.0),
+            SlowProvider("third", 0.02),
+        ]
+    )
+
+    stories = g.get_stories()
+
+    assert [story.headline for story in stories] == ["first", "second", "third"]
+
+
+def test_fetch_worker_count_is_bounded():
+    active = {"now": 0, "peak": 0}
+    lock = threading.Lock()
+
+    class CountingProvider:
+        def get_stories(self):
+            with lock:
+                active["now"] += 1
+                active["peak"] = max(active["peak"], active["now"])
+            time.sleep(0.01)
+            with lock:
+                active["now"] -= 1
+            return [Story(headline="counted", body_text="body")]
+
+    g = Goosepaper([CountingProvider() for _ in range(6)], max_workers=2)
+
+    assert len(g.get_stories()) == 6
+    assert active["peak"] <= 2
+
+
+def test_deadline_cuts_slow_providers_and_keeps_the_rest():
+    release = threading.Event()
+
+    class StuckProvider:
+        feed_url = "https://slow.example.com/feed.xml"
+
+        def get_stories(self):
+            release.wait(5)
+            return [Story(headline="too late", body_text="body")]
+
+    g = Goosepaper([LoremStoryProvider(limit=1), StuckProvider()], deadline=0.2)
+    try:
+        started = time.monotonic()
+        edition = g.fetch_edition()
+        elapsed = time.monotonic() - started
+    finally:
+        release.set()
+
+    assert elapsed < 2
+    assert len(edition.stories) == 1
+    assert "too late" not in [story.headline for story in edition.stories]
+    assert edition.cut_sources == (
+        "StuckProvider (https://slow.example.com/feed.xml)",
+    )
+
+
+def test_sources_left_out_at_the_deadline_are_noted_in_the_edition():
+    edition = Edition(
+        title="Daily",
+        subtitle="",
+        stories=[Story(headline="On time", body_text="body")],
+        cut_sources=("Slow <feed>", "Stale feed"),
+        stale_sources=("Stale feed",),
+    )
+    paper = Goosepaper([])
+
+    html = paper.to_html(edition=edition)
+    stream = io.BytesIO()
+    paper.to_epub(stream, edition=edition)
+
+    assert edition.left_out_sources == ("Slow <feed>",)
+    assert '<p class="edition-note">Left out: Slow &lt;feed&gt;' in html
+    assert "Stale feed" not in html
+    with zipfile.ZipFile(stream) as book:
+        chapters = [name for name in book.namelist() if name.endswith(".xhtml")]
+        assert any(b"Left out: Slow &lt;feed&gt;" in book.read(n) for n in chapters)
+
+
+def test_epub_lists_each_headline_once_whatever_its_date():
+    edition = Edition(
+        title="Daily",
+        subtitle="",
+        stories=[
+            Story("Weather", body_text="Rain", date=datetime.datetime(2026, 1, 1)),
+            Story("Weather", body_text="Sun", date=datetime.datetime(2026, 1, 2)),
+            Story("Markets", body_text="Up"),
+        ],
+    )
+    stream = io.BytesIO()
+
+    Goosepaper([]).to_epub(stream, edition=edition)
+
+    with zipfile.ZipFile(stream) as book:
+        chapters = [name for name in book.namelist() if name.endswith(".xhtml")]
+        chapters.remove(next(name for name in chapters if "nav" in name))
+        assert len(chapters) == 2
+
+
+def test_providers_that_never_return_do_not_hold_up_exit():
+    script = textwrap.dedent(
+        """
+        import threading
+        from goosepaper.goosepaper import Goosepaper
+        from goosepaper.storyprovider.storyprovider import LoremStoryProvider
+
+        class HungProvider:
+            def get_stories(self):
+                threading.Event().wait()
+
+        paper = Goosepaper([LoremStoryProvider(limit=1), HungProvider()], deadline=0.2)
+        print(len(paper.fetch_edition().stories))
+        """
+    )
+
+    completed = subprocess.run(
+        [sys.executable, "-c", script],
+        capture_output=True,
+        text=True,
+        timeout=30,
+        check=True,
+    )
+
+    assert completed.stdout.strip().splitlines()[-1] == "1"
+
+
+def test_edition_is_fetched_once_and_rendered_many_times():
+    calls = {"count": 0}
+
+    class CountingProvider:
+        def get_stories(self):
+            calls["count"] += 1
+            return [Story(headline=f"Fetch {calls['count']}", body_text="body")]
+
+    g = Goosepaper([CountingProvider()], title="Snapshot")
+    edition = g.fetch_edition()
+
+    first = g.to_html(edition=edition)
+    second = g.to_html(edition=edition, style="Academy")
+
+    assert calls["count"] == 1
+    assert isinstance(edition.stories, tuple)
+    assert "Fetch 1" in first and "Fetch 1" in second
+    assert "<h1>Snapshot</h1>" in second
+
+
+class PipeWriter:
+    """A write-only, unseekable stream, like a pipe or a socket file."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+
+def test_epub_streams_into_unseekable_writers():
+    stream = PipeWriter()
+
+    result = Goosepaper([LoremStoryProvider(limit=2)]).to_epub(stream)
+
+    assert result is None
+    with zipfile.ZipFile(io.BytesIO(b"".join(stream.chunks))) as book:
+        assert book.read("mimetype") == b"application/epub+zip"
+
+
+def test_pdf_is_written_straight_into_file_objects():
+    class FakeDocument:
+        pages = [object()]
+        targets = []
+
+        def write_pdf(self, target):
+            self.targets.append(target)
+            target.write(b"%PDF-fake")
+
+    class FakeRenderer:
+        def style(self, style):
+            return Style(style)
+
+        def render(self, html, **settings):
+            return FakeDocument()
+
+    stream = PipeWriter()
+    g = Goosepaper([LoremStoryProvider(limit=1)], renderer=FakeRenderer())
+
+    assert g.to_pdf(stream) is None
+    assert FakeDocument.targets == [stream]
+    assert stream.chunks == [b"%PDF-fake"]
+
+
+def test_reproducible_editions_render_identical_files():
+    moment = datetime.datetime(2026, 1, 31, 6, 0, tzinfo=datetime.timezone.utc)
+
+    def render():
+        g = Goosepaper([LoremStoryProvider(limit=3)], edition_time=moment)
+        edition = g.fetch_edition()
+        epub, html = io.BytesIO(), g.to_html(edition=edition)
+        g.to_epub(epub, edition=edition)
+        return epub.getvalue(), html
+
+    first_epub, first_html = render()
+    second_epub, second_html = render()
+
+    assert first_epub == second_epub
+    assert first_html == second_html
+    assert "January 31, 2026 06:00" in first_html
+    assert 'name="dcterms.created" content="2026-01-31T06:00:00Z"' in first_html
+    with zipfile.ZipFile(io.BytesIO(first_epub)) as book:
+        assert {entry.date_time for entry in book.infolist()} == {
+            (2026, 1, 31, 6, 0, 0)
+        }
+        chapters = [
+            name for name in book.namelist() if name.endswith(".xhtml")
+        ]
+        assert len(set(chapters)) == len(chapters)
+
+
+def test_streamed_html_is_identical_to_to_html(tmp_path):
+    stories = [
+        Story("Forecast", body_text="sun", placement_preference=PlacementPreference.UTILITY),
+        Story("Lead", body_text="lead story"),
+        Story("Post one", body_text="one", section_title="Bluesky"),
+        Story("Post two", body_text="two", section_title="Bluesky"),
+        Story("Brief", body_text="brief", placement_preference=PlacementPreference.SIDEBAR),
+    ]
+    g = Goosepaper([])
+    edition = Edition(title="Streaming", subtitle="today", stories=stories)
+
+    expected = g.to_html(edition=edition, table_of_contents=True, style="Autumn")
+    chunks = list(g.iter_html(edition=edition, table_of_contents=True, style="Autumn"))
+    g.write_html(
+        str(tmp_path / "paper.html"),
+        edition=edition,
+        table_of_contents=True,
+        style="Autumn",
+    )
+    stream = PipeWriter()
+    g.write_html(stream, edition=edition, table_of_contents=True, style="Autumn")
+
+    assert "".join(chunks) == expected
+    assert len(chunks) > len(stories)
+    assert (tmp_path / "paper.html").read_text(encoding="utf-8") == expected
+    assert b"".join(stream.chunks) == expected.encode("utf-8")
+
+
 def test_can_create_html():
     g = Goosepaper([LoremStoryProvider()])
     assert "<html>" in g.to_html()
@@ -155,3 +457,36 @@ def test_graymaiden_style_loads_editorial_masthead_assets():
     assert "target-counter(attr(href), page)" in css
     assert "UnifrakturCook" not in css
     assert style.get_stylesheets()
+
+
+def test_style_registry_reuses_styles_until_their_files_change(tmp_path):
+    registry = StyleRegistry()
+    css = tmp_path / "Inkjet.css"
+    css.write_text("body { color: black; }", encoding="utf-8")
+
+    first = registry.get("Inkjet", style_dirs=[str(tmp_path)])
+    assert registry.get("Inkjet", style_dirs=[str(tmp_path)]) is first
+    assert first.style_name == "Inkjet"
+    assert "color: black" in first.get_css()
+
+    css.write_text("body { color: gray; }", encoding="utf-8")
+    stamp = css.stat().st_mtime_ns + 1_000_000_000
+    os.utime(css, ns=(stamp, stamp))
+    second = registry.get("Inkjet", style_dirs=[str(tmp_path)])
+
+    assert second is not first
+    assert "color: gray" in second.get_css()
+    assert registry.get("Autumn") is registry.get("Autumn")
+
+
+def test_user_style_dirs_are_searched_before_built_in_styles(tmp_path):
+    (tmp_path / "Academy.css").write_text(".custom-academy {}", encoding="utf-8")
+    (tmp_path / "Inkjet").mkdir()
+    (tmp_path / "Inkjet" / "inkjet.css").write_text(".inkjet {}", encoding="utf-8")
+
+    g = Goosepaper([LoremStoryProvider(limit=1)], style_dirs=[str(tmp_path)])
+
+    assert ".custom-academy" in g.to_html(style="Academy")
+    assert ".inkjet" in g.to_html(style="Inkjet")
+    assert "Inkjet" in available_styles([str(tmp_path)])
+    assert ".custom-academy" not in Goosepaper([]).to_html(style="Academy")
@@ -0,0 +1,151 @@
+import io
+import urllib.parse
+
+import pytest
+
+from . import fetch, metrics
+from .edition import Edition
+from .images import ImagePipeline, printable_width_px
+from .story import Story
+from .styles import Style
+
+Image = pytest.importorskip("PIL.Image")
+
+
+def _png(width=3000, height=1500, color=(200, 30, 30)):
+    out = io.BytesIO()
+    Image.new("RGB", (width, height), color).save(out, format="PNG")
+    return out.getvalue()
+
+
+@pytest.fixture
+def transport(monkeypatch):
+    payload = _png()
+    transport = fetch.MockTransport(
+        lambda request: payload
+        if urllib.parse.urlsplit(request.url).path.endswith(".png")
+        else fetch.mock_response(request, status_code=404)
+    )
+    previous = fetch.set_client(fetch.HttpClient(transport=transport))
+    yield transport
+    fetch.set_client(previous)
+
+
+def _edition():
+    return Edition(
+        title="Paper",
+        subtitle="now",
+        stories=[
+            Story(
+                headline="Pictures",
+                url="https://example.com/news/story.html",
+                body_html=(
+                    '<p>Look</p><img src="/photo.png" srcset="/photo-2x.png 2x">'
+                    '<img src="https://example.com/missing.jpg">'
+                    '<img src="data:image/gif;base64,R0lGOD">'
+                ),
+            ),
+            Story(headline="Words", body_text="No pictures here"),
+        ],
+    )
+
+
+def test_printable_width_excludes_margins():
+    profile = Style().get_page_profile("remarkable2")
+
+    assert printable_width_px(profile, dpi=100) < 100 * float(
+        profile.size.split()[0].rstrip("in")
+    )
+
+
+def test_images_are_downloaded_shrunk_and_made_gray(tmp_path, transport):
+    edition = _edition()
+    pipeline = ImagePipeline(tmp_path, mode="grayscale")
+
+    prepared = pipeline.prepare(edition, "remarkable2")
+
+    story = prepared.stories[0]
+    assert story is not edition.stories[0]
+    assert prepared.stories[1] is edition.stories[1]
+    assert 'src="/photo.png"' in edition.stories[0].body_html
+    assert "srcset" not in story.body_html
+    assert 'src="https://example.com/missing.jpg"' in story.body_html
+    assert 'src="data:image/gif;base64,R0lGOD"' in story.body_html
+
+    (local,) = tmp_path.iterdir()
+    assert local.as_uri() in story.body_html
+    with Image.open(local) as image:
+        assert image.mode == "L"
+        assert image.width == printable_width_px(
+            Style().get_page_profile("remarkable2")
+        )
+
+
+def test_lazy_placeholders_are_kept_and_entities_decoded(tmp_path, transport):
+    edition = Edition(
+        title="Paper",
+        subtitle="",
+        stories=[
+            Story(
+                headline="Lazy",
+                url="https://example.com/news/",
+                body_html='<img data-src="/lazy.png" src="/thumb.png?w=1&amp;h=2">',
+            )
+        ],
+    )
+
+    prepared = ImagePipeline(tmp_path).prepare(edition)
+
+    assert [request.url for request in transport.requests] == [
+        "https://example.com/thumb.png?w=1&h=2"
+    ]
+    body = prepared.stories[0].body_html
+    (local,) = tmp_path.iterdir()
+    assert f'data-src="/lazy.png" src="{local.as_uri()}"' in body
+
+
+def test_prepared_images_are_reused_from_the_cache(tmp_path, transport):
+    with metrics.recording() as recorder:
+        ImagePipeline(tmp_path).prepare(_edition())
+        ImagePipeline(tmp_path).prepare(_edition())
+
+    assert recorder.counters["images.downloaded"] == 1
+    assert recorder.counters["images.cached"] == 1
+    assert [request.url for request in transport.requests].count(
+        "https://example.com/photo.png"
+    ) == 1
+
+
+def test_dither_mode_produces_black_and_white_images(tmp_path, transport):
+    ImagePipeline(tmp_path, mode="dither").prepare(_edition(), "paper_pro_move")
+
+    (local,) = tmp_path.iterdir()
+    with Image.open(local) as image:
+        assert image.mode == "1"
+
+
+def test_undecodable_images_keep_their_source(tmp_path, use_transport):
+    use_transport(lambda request: b"<html>not an image</html>")
+    edition = _edition()
+
+    prepared = ImagePipeline(tmp_path).prepare(edition)
+
+    assert prepared is edition
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_unexpected_errors_are_not_swallowed(tmp_path, transport, monkeypatch):
+    def broken(payload, width, mode):
+        raise RuntimeError("bug")
+
+    monkeypatch.setattr("goosepaper.images._convert", broken)
+
+    with pytest.raises(RuntimeError):
+        ImagePipeline(tmp_path).prepare(_edition())
+
+
+def test_original_mode_leaves_the_edition_alone(tmp_path, transport):
+    edition = _edition()
+
+    assert ImagePipeline(tmp_path, mode="original").prepare(edition) is edition
+    assert transport.requests == []
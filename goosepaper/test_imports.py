@@ -0,0 +1,44 @@
+import json
+import subprocess
+import sys
+
+HEAVY_MODULES = (
+    "bs4",
+    "lxml",
+    "feedparser",
+    "readability",
+    "weasyprint",
+    "ebooklib",
+    "remarkapy",
+    "requests",
+)
+
+
+def _modules_loaded_by(statement: str):
+    script = (
+        f"import sys\n{statement}\n"
+        "import json\n"
+        f"print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+    )
+    completed = subprocess.run(
+        [sys.executable, "-c", script],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def test_cli_entrypoint_does_not_import_heavy_dependencies():
+    assert _modules_loaded_by("import goosepaper.__main__") == []
+
+
+def test_config_errors_do_not_import_heavy_dependencies(tmp_path):
+    missing = tmp_path / "missing.json"
+    statement = (
+        "import contextlib, io\n"
+        "from goosepaper.__main__ import main\n"
+        "with contextlib.redirect_stdout(io.StringIO()):\n"
+        f"    assert main(['-c', {str(missing)!r}]) == 1"
+    )
+    assert _modules_loaded_by(statement) == []
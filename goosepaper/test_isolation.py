@@ -0,0 +1,164 @@
+import io
+import os
+import time
+
+import pytest
+
+from . import isolation, metrics
+from .config import RenderLimits
+from .edition import Edition
+from .isolation import RenderLimitExceeded, find_offender, render_isolated
+from .story import Story
+
+
+def _fake_render(path, edition, style_dirs, settings, fonts_dir=None):
+    """
+    Stands in for WeasyPrint in the worker: "giant" stories keep allocating
+    memory well past the limit, "slow" ones spin past the timeout.
+    """
+    headlines = [story.headline for story in edition.stories]
+    if "giant" in headlines:
+        chunks = []
+        for _ in range(64):
+            chunks.append(bytearray(64 * 1024 * 1024))
+            time.sleep(0.01)
+    if "slow" in headlines:
+        time.sleep(60)
+    if "broken" in headlines:
+        raise ValueError("bad markup")
+    with open(path, "w", encoding="utf-8") as fh:
+        fh.write(",".join(headlines))
+
+
+def _pid_render(path, edition, style_dirs, settings, fonts_dir=None):
+    """
+    Like `_fake_render`, but writes the worker's process ID.
+    """
+    if "giant" in [story.headline for story in edition.stories]:
+        _fake_render(path, edition, style_dirs, settings, fonts_dir)
+    with open(path, "w", encoding="utf-8") as fh:
+        fh.write(str(os.getpid()))
+
+def _edition(*headlines):
+    return Edition(
+        title="Paper",
+        subtitle="",
+        stories=[Story(headline, body_text="text") for headline in headlines],
+    )
+
+
+def test_find_offender_bisects_to_the_failing_story():
+    stories = [Story(str(index), body_text="text") for index in range(13)]
+    probes = []
+
+    def fails(subset):
+        probes.append(len(subset))
+        return any(story.headline == "9" for story in subset)
+
+    assert find_offender(stories, fails) == 9
+    assert len(probes) <= 2 * 4 + 1
+
+
+def test_find_offender_gives_up_without_a_single_culprit():
+    stories = [Story(str(index), body_text="text") for index in range(4)]
+
+    assert find_offender(stories, lambda subset: len(subset) > 2) is None
+    assert find_offender(stories, lambda subset: True) is None
+
+
+def test_stories_over_the_memory_limit_are_dropped(tmp_path):
+    output = tmp_path / "paper.pdf"
+    limits = RenderLimits(memory_mb=1024)
+
+    with metrics.recording() as recorder:
+        dropped = render_isolated(
+            str(output),
+            _edition("one", "two", "giant", "three"),
+            limits,
+            render=_fake_render,
+        )
+
+    assert [story.headline for story in dropped] == ["giant"]
+    assert output.read_text() == "one,two,three"
+    assert recorder.counters["render.dropped_stories"] == 1
+    assert recorder.dropped_stories == [
+        {"headline": "giant", "url": None, "reason": "memory", "output": str(output)}
+    ]
+
+
+def test_renders_past_the_timeout_are_retried_and_streamed(tmp_path):
+    target = io.BytesIO()
+
+    dropped = render_isolated(
+        target,
+        _edition("slow", "fast"),
+        RenderLimits(timeout_seconds=2),
+        render=_fake_render,
+    )
+
+    assert [story.headline for story in dropped] == ["slow"]
+    assert target.getvalue() == b"fast"
+
+
+def test_other_render_errors_are_raised(tmp_path):
+    with pytest.raises(RuntimeError, match="bad markup"):
+        render_isolated(
+            str(tmp_path / "paper.pdf"),
+            _edition("broken"),
+            RenderLimits(memory_mb=1024),
+            render=_fake_render,
+        )
+
+
+def test_giving_up_after_max_dropped_stories(tmp_path):
+    with pytest.raises(RenderLimitExceeded, match="memory"):
+        render_isolated(
+            str(tmp_path / "paper.pdf"),
+            _edition("giant", "giant"),
+            RenderLimits(memory_mb=1024, max_dropped_stories=1),
+            render=_fake_render,
+        )
+    assert not (tmp_path / "paper.pdf").exists()
+
+
+def test_one_worker_lays_out_job_after_job(tmp_path):
+    worker = isolation._Worker(_pid_render, RenderLimits(timeout_seconds=60), (), {})
+    try:
+        for name in ("a", "b", "c"):
+            assert worker.run(str(tmp_path / name), _edition(name)) is None
+    finally:
+        worker.close()
+
+    pids = {(tmp_path / name).read_text() for name in ("a", "b", "c")}
+    assert len(pids) == 1
+    assert pids != {str(os.getpid())}
+
+
+def test_bisection_probes_reuse_the_worker(tmp_path, monkeypatch):
+    calls = {"_start": 0, "run": 0}
+
+    def counting(name):
+        method = getattr(isolation._Worker, name)
+
+        def count(worker, *args):
+            calls[name] += 1
+            return method(worker, *args)
+
+        monkeypatch.setattr(isolation._Worker, name, count)
+
+    counting("_start")
+    counting("run")
+    headlines = [str(index) for index in range(7)] + ["giant"]
+
+    dropped = render_isolated(
+        str(tmp_path / "paper.pdf"),
+        _edition(*headlines),
+        RenderLimits(memory_mb=1024),
+        render=_pid_render,
+    )
+
+    assert [story.headline for story in dropped] == ["giant"]
+    # The full render and three probes of the bisection fail, each taking its
+    # worker down; the other probes and the final render reuse the worker
+    # that is already running.
+    assert calls == {"_start": 5, "run": 9}
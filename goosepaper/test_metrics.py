@@ -0,0 +1,76 @@
+import json
+
+from . import fetch, metrics
+from .__main__ import main
+from .goosepaper import Goosepaper
+from .story import Story
+from .storyprovider.storyprovider import LoremStoryProvider
+
+
+def test_spans_are_only_recorded_while_recording():
+    with metrics.span("ignored"):
+        pass
+
+    with metrics.recording() as recorder:
+        with metrics.span("stage", kind="test") as span:
+            span.set(items=3)
+        metrics.increment("things", 2)
+        metrics.increment("things")
+
+    report = recorder.report()
+    assert [span["name"] for span in report["spans"]] == ["stage"]
+    assert report["spans"][0]["attributes"] == {"kind": "test", "items": 3}
+    assert report["stages"]["stage"]["count"] == 1
+    assert report["counters"] == {"things": 3}
+
+
+def test_fetch_and_render_are_timed_per_source(use_transport):
+    class BrokenProvider:
+        def get_stories(self):
+            raise RuntimeError("boom")
+
+    use_transport(lambda request: b"0123456789")
+
+    class FetchingProvider:
+        def get_stories(self):
+            fetch.get("https://example.com/data")
+            return [Story(headline="fetched", body_text="body")]
+
+    g = Goosepaper([LoremStoryProvider(limit=2), BrokenProvider(), FetchingProvider()])
+    with metrics.recording() as recorder:
+        edition = g.fetch_edition()
+        g.to_html(edition=edition)
+
+    report = recorder.report()
+    assert report["stages"]["fetch"]["count"] == 1
+    assert report["stages"]["fetch.source"]["count"] == 3
+    assert report["stages"]["html"]["count"] == 1
+    assert report["counters"]["http.bytes"] == 10
+    assert report["counters"]["stories"] == 3
+    assert report["sources"] == [
+        {"source": "CustomTextStoryProvider", "stories": 2, "status": "ok"},
+        {"source": "BrokenProvider", "stories": 0, "status": "failed"},
+        {"source": "FetchingProvider", "stories": 1, "status": "ok"},
+    ]
+
+
+def test_cli_writes_metrics_json(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("XDG_CONFIG_HOME", str(tmp_path / "config"))
+    (tmp_path / "goosepaper.json").write_text(
+        json.dumps(
+            {"version": 2, "sources": [{"type": "text", "headline": "Hello"}]}
+        ),
+        encoding="utf-8",
+    )
+
+    status = main(
+        ["-o", "paper.html", "--no-cache", "--metrics-json", "metrics.json"]
+    )
+
+    report = json.loads((tmp_path / "metrics.json").read_text())
+    assert status == 0
+    assert report["sources"][0]["stories"] == 5
+    render = next(span for span in report["spans"] if span["name"] == "render")
+    assert render["attributes"]["output"] == "paper.html"
+    assert render["attributes"]["bytes"] == (tmp_path / "paper.html").stat().st_size
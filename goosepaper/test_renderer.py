@@ -0,0 +1,79 @@
+from .goosepaper import Goosepaper
+from .renderer import Renderer
+from .storyprovider.storyprovider import LoremStoryProvider
+
+
+class CountingRenderer(Renderer):
+    def __init__(self, style_dirs=()):
+        super().__init__(base_url="/tmp", style_dirs=style_dirs)
+        self.parsed = []
+
+    def _parse_css(self, **source):
+        self.parsed.append(source)
+        return object()
+
+
+def test_renderer_parses_each_stylesheet_once():
+    renderer = CountingRenderer()
+
+    first = renderer.css("Autumn", font_size=14, page_profile="remarkable2")
+    again = renderer.css("Autumn", font_size=14, page_profile="remarkable2")
+    larger = renderer.css("Autumn", font_size=16, page_profile="remarkable2")
+
+    assert first is again
+    assert larger is not first
+    assert len(renderer.parsed) == 2
+
+
+def test_renderer_reuses_styles_and_linked_stylesheets():
+    renderer = CountingRenderer()
+
+    assert renderer.style("Autumn") is renderer.style("Autumn")
+    first = renderer.stylesheets("Autumn")
+    again = renderer.stylesheets("Autumn")
+
+    assert first and all(left is right for left, right in zip(first, again))
+    assert len(renderer.parsed) == len(first)
+
+
+def test_renderer_looks_up_styles_in_its_style_dirs(tmp_path):
+    (tmp_path / "Academy.css").write_text(".custom-academy {}", encoding="utf-8")
+    custom = CountingRenderer(style_dirs=[str(tmp_path)])
+    built_in = CountingRenderer()
+
+    assert ".custom-academy" in custom.style("Academy").get_css()
+    assert ".custom-academy" not in built_in.style("Academy").get_css()
+
+    custom.css(built_in.style("Academy"))
+    custom.css("Academy")
+    assert len(custom.parsed) == 2
+    assert ".custom-academy" in custom.parsed[1]["string"]
+
+
+def test_goosepaper_renders_pdfs_with_the_given_renderer(tmp_path):
+    class FakeDocument:
+        pages = [object()]
+
+        def write_pdf(self, target):
+            with open(target, "wb") as fh:
+                fh.write(b"%PDF-fake")
+
+    class RecordingRenderer(CountingRenderer):
+        def __init__(self):
+            super().__init__()
+            self.rendered = []
+
+        def render(self, html, style="", **settings):
+            self.rendered.append((self.style(style).style_name, settings))
+            return FakeDocument()
+
+    renderer = RecordingRenderer()
+    paper = Goosepaper([LoremStoryProvider(limit=1)], renderer=renderer)
+    edition = paper.fetch_edition()
+
+    for name in ("one.pdf", "two.pdf"):
+        paper.to_pdf(str(tmp_path / name), style="Autumn", edition=edition)
+
+    assert paper.renderer is renderer
+    assert [style for style, _ in renderer.rendered] == ["Autumn", "Autumn"]
+    assert (tmp_path / "two.pdf").read_bytes() == b"%PDF-fake"
@@ -0,0 +1,113 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from . import metrics, renditions
+from .config import PaperSettings, Rendition
+from .goosepaper import Goosepaper
+from .renditions import plan_renders, render_edition, rendition_output
+from .storyprovider.storyprovider import LoremStoryProvider
+
+
+def test_renditions_are_named_by_profile_and_layout():
+    assert rendition_output("out/paper.pdf", Rendition("paper_pro")) == (
+        "out/paper-paper_pro.pdf"
+    )
+    assert rendition_output("paper.html", Rendition("a4", "3col")) == (
+        "paper-a4-3col.html"
+    )
+
+
+def test_each_output_is_planned_once_per_rendition_except_epub():
+    settings = PaperSettings(
+        layout="1col",
+        renditions=(Rendition("remarkable2"), Rendition("paper_pro", "2col")),
+    )
+
+    jobs = plan_renders(["paper.pdf", "paper.epub"], settings)
+
+    assert [job.output for job in jobs] == [
+        "paper-remarkable2.pdf",
+        "paper-paper_pro-2col.pdf",
+        "paper.epub",
+    ]
+    assert [(job.settings.page_profile, job.settings.layout) for job in jobs[:2]] == [
+        ("remarkable2", "1col"),
+        ("paper_pro", "2col"),
+    ]
+
+
+def test_without_renditions_outputs_are_rendered_as_given(tmp_path):
+    paper = Goosepaper([LoremStoryProvider(limit=1)])
+    output = str(tmp_path / "paper.html")
+
+    assert render_edition(paper, paper.fetch_edition(), [output], PaperSettings()) == [
+        output
+    ]
+    assert "<html>" in (tmp_path / "paper.html").read_text()
+
+
+def test_renditions_render_one_edition(tmp_path):
+    paper = Goosepaper([LoremStoryProvider(limit=2)], title="Shared edition")
+    edition = paper.fetch_edition()
+    settings = PaperSettings(
+        renditions=(Rendition("paper_pro"), Rendition("paper_pro_move"))
+    )
+
+    outputs = render_edition(
+        paper, edition, [str(tmp_path / "paper.html")], settings, max_workers=2
+    )
+
+    assert outputs == [
+        str(tmp_path / "paper-paper_pro.html"),
+        str(tmp_path / "paper-paper_pro_move.html"),
+    ]
+    pro, move = [open(output, encoding="utf-8").read() for output in outputs]
+    assert "7.08in 9.44in" in pro and "3.58in 6.36in" in move
+    assert "Shared edition" in pro and "Shared edition" in move
+
+
+def test_html_and_epub_outputs_render_in_process_with_metrics(tmp_path, monkeypatch):
+    paper = Goosepaper([LoremStoryProvider(limit=1)])
+    edition = paper.fetch_edition()
+    outputs = [str(tmp_path / "paper.html"), str(tmp_path / "paper.epub")]
+
+    def no_pool(*args, **kwargs):
+        raise AssertionError("HTML and EPUB outputs shouldn't start a process pool")
+
+    monkeypatch.setattr(renditions, "ProcessPoolExecutor", no_pool)
+    with metrics.recording() as recorder:
+        render_edition(paper, edition, outputs, PaperSettings(), max_workers=2)
+
+    rendered = [span for span in recorder.spans if span.name == "render"]
+    assert [span.attributes["output"] for span in rendered] == outputs
+    assert all(span.attributes["bytes"] > 0 for span in rendered)
+
+
+def test_worker_spans_and_counters_reach_the_run_metrics(tmp_path, monkeypatch):
+    def fake_render(paper, output, settings, edition=None, limits=None):
+        with metrics.span("pdf.layout", pages=3):
+            metrics.increment("render.css_parsed")
+            Path(output).write_bytes(b"%PDF")
+
+    monkeypatch.setattr(renditions, "_render_output", fake_render)
+    monkeypatch.setattr(
+        renditions,
+        "_render_executor",
+        lambda jobs, max_workers: ThreadPoolExecutor(max_workers=jobs),
+    )
+    paper = Goosepaper([LoremStoryProvider(limit=1)])
+    settings = PaperSettings(
+        renditions=(Rendition("paper_pro"), Rendition("paper_pro_move"))
+    )
+
+    with metrics.recording() as recorder:
+        outputs = render_edition(
+            paper, paper.fetch_edition(), [str(tmp_path / "paper.pdf")], settings
+        )
+
+    stages = recorder.stages()
+    assert stages["render"]["count"] == stages["pdf.layout"]["count"] == 2
+    assert recorder.counters["render.css_parsed"] == 2
+    rendered = [span for span in recorder.spans if span.name == "render"]
+    assert sorted(span.attributes["output"] for span in rendered) == outputs
+    assert all(span.attributes["bytes"] == 4 for span in rendered)
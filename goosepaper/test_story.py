@@ -0,0 +1,49 @@
+import pickle
+
+import bs4
+import pytest
+
+from .story import Story
+
+
+def test_story_is_slotted():
+    story = Story("Headline", body_text="body")
+
+    assert not hasattr(story, "__dict__")
+    with pytest.raises(AttributeError):
+        story.unexpected = True
+
+
+def test_derived_text_is_computed_once_and_reset_with_body(monkeypatch):
+    story = Story("Headline", body_html="<p>One <b>two</b> three</p>")
+    parses = {"count": 0}
+    real_soup = bs4.BeautifulSoup
+
+    def counting_soup(*args, **kwargs):
+        parses["count"] += 1
+        return real_soup(*args, **kwargs)
+
+    monkeypatch.setattr(bs4, "BeautifulSoup", counting_soup)
+
+    assert story.plain_text() == "One two three"
+    assert story.word_count() == 3
+    assert story.plain_text() == "One two three"
+    first_hash = story.content_hash()
+    assert parses["count"] == 1
+
+    story.body_html = "<p>Just two</p>"
+
+    assert story.word_count() == 2
+    assert story.content_hash() != first_hash
+    assert parses["count"] == 2
+
+
+def test_story_survives_pickling():
+    story = Story("Headline", body_text="body", url="https://example.com/a")
+    story.plain_text()
+
+    restored = pickle.loads(pickle.dumps(story))
+
+    assert restored.headline == "Headline"
+    assert restored.url == "https://example.com/a"
+    assert restored.plain_text() == "body"
@@ -4,6 +4,7 @@ import os
 from pathlib import Path
 from typing import Optional
 
+from . import metrics
 from .auth import auth_client
 from .config import (
     ConfigError,
@@ -22,6 +23,7 @@ def _list_active_items(client):
     return [item for item in client.list_items() if item.parent != "trash"]
 
 
+@metrics.timed("upload")
 def upload(filepath, delivery_settings: Optional[DeliverySettings] = None, showconfig=False):
     filepath = Path(filepath)
     delivery = _coerce_delivery_settings(delivery_settings)
@@ -89,6 +89,7 @@ def construct_story_providers_from_source_configs(source_configs):
                         "since_days_ago",
                         "byline",
                         "body_source",
+                        "article_concurrency",
                     }
                 },
             },
@@ -146,10 +147,22 @@ def construct_story_providers_from_source_configs(source_configs):
         module_name, class_name, normalize = provider_specs[source_type]
         module = importlib.import_module(module_name)
         provider_class = getattr(module, class_name)
-        stories.append(provider_class(**normalize(options)))
+        provider = provider_class(**normalize(options))
+        provider.source_key = source_key(source_type, options)
+        stories.append(provider)
     return stories
 
 
+def source_key(source_type: str, options: dict) -> str:
+    """
+    A stable description of one configured source, used to find its stories
+    from earlier editions.
+    """
+    return json.dumps(
+        {"type": source_type, **options}, sort_keys=True, default=str
+    )
+
+
 def _source_config_parts(source_config):
     if hasattr(source_config, "type") and hasattr(source_config, "options"):
         return source_config.type, dict(source_config.options)